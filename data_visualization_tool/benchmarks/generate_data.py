@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+import argparse
+import os
+
+import numpy as np
+import pandas as pd
+
+# Rows generated and written per chunk, which bounds the generator's memory.
+CHUNK_ROWS = 1_000_000
+
+# Number of distinct labels in the categorical column.
+N_CATEGORIES = 50
+
+# Columns of the synthetic data, in file order.
+COLUMNS = ("id", "timestamp", "category", "value", "count")
+
+
+def generate_chunk(start: int, rows: int, rng: np.random.Generator) -> pd.DataFrame:
+    """
+    Generates rows start to start + rows of the synthetic dataset.
+
+    Columns:
+        id: Consecutive integers.
+        timestamp: One row per second from 2024-01-01, written as ISO datetimes.
+        category: One of N_CATEGORIES labels with a skewed (Zipf-like) frequency.
+        value: A random walk of normal steps, i.e. a noisy time series.
+        count: Poisson-distributed integers.
+    """
+    ids = np.arange(start, start + rows, dtype=np.int64)
+    weights = 1.0 / np.arange(1, N_CATEGORIES + 1)
+    labels = np.array([f"cat_{i:02d}" for i in range(N_CATEGORIES)])
+    return pd.DataFrame({
+        "id": ids,
+        "timestamp": np.datetime64("2024-01-01T00:00:00") + ids.astype("timedelta64[s]"),
+        "category": labels[rng.choice(N_CATEGORIES, size=rows, p=weights / weights.sum())],
+        "value": np.cumsum(rng.normal(size=rows)),
+        "count": rng.poisson(5, size=rows),
+    }, columns=list(COLUMNS))
+
+
+def generate_csv(file_path: str, rows: int, seed: int = 0) -> str:
+    """
+    Writes a synthetic CSV file with numeric, categorical and datetime columns.
+
+    The data is generated and written in chunks of CHUNK_ROWS rows, so files
+    of 1e8 rows can be produced with bounded memory. The same rows and seed
+    always produce the same file.
+
+    Args:
+        file_path: The path of the CSV file to write.
+        rows: The number of data rows.
+        seed: The random seed.
+
+    Returns:
+        file_path.
+    """
+    rng = np.random.default_rng(seed)
+    offset = 0.0
+    with open(file_path, "w", newline="") as f:
+        for start in range(0, max(rows, 1), CHUNK_ROWS):
+            chunk = generate_chunk(start, min(CHUNK_ROWS, rows - start), rng)
+            # Continue the random walk across chunk boundaries.
+            chunk["value"] += offset
+            if len(chunk):
+                offset = chunk["value"].iloc[-1]
+            chunk.to_csv(f, index=False, header=start == 0, float_format="%.6f")
+    return file_path
+
+
+def dataset_path(data_dir: str, rows: int, seed: int = 0) -> str:
+    """Returns the path of the synthetic dataset for rows and seed, generating it if needed."""
+    os.makedirs(data_dir, exist_ok=True)
+    file_path = os.path.join(data_dir, f"synthetic_{rows}_{seed}.csv")
+    if not os.path.exists(file_path):
+        # Written under a temporary name so an interrupted run leaves no partial dataset behind.
+        tmp_path = file_path + ".tmp"
+        generate_csv(tmp_path, rows, seed)
+        os.replace(tmp_path, file_path)
+    return file_path
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate a synthetic CSV file for benchmarks.")
+    parser.add_argument("output_path", type=str, help="Path of the CSV file to write.")
+    parser.add_argument("rows", type=float, help="Number of data rows, e.g. 1e6.")
+    parser.add_argument("--seed", type=int, default=0, help="Random seed. Defaults to 0.")
+    args = parser.parse_args()
+    generate_csv(args.output_path, int(args.rows), args.seed)
+    print(f"Wrote {int(args.rows)} rows to {args.output_path}.")
+
+
+if __name__ == "__main__":
+    main()
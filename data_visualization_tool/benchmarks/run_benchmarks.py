@@ -0,0 +1,229 @@
+#!/usr/bin/env python3
+import argparse
+import io
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+from typing import Dict, List, Optional
+
+BENCHMARKS_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(os.path.dirname(BENCHMARKS_DIR), "src"))
+sys.path.insert(0, BENCHMARKS_DIR)
+
+# Default dataset sizes in rows. Larger sizes (up to 1e8) can be passed with --sizes.
+DEFAULT_SIZES = (1_000, 10_000, 100_000, 1_000_000)
+
+# Pipeline stages, in order, timed for every case.
+STAGES = ("validate", "load", "render", "encode")
+
+# The plot measured for each plot type: its columns and options, chosen to
+# match how the tool is used on large data.
+CASES = {
+    "bar": {"x_column": "category", "y_column": "value", "options": {"agg": "sum"}},
+    "line": {"x_column": "id", "y_column": "value", "options": {"downsample": "lttb"}},
+    "scatter": {"x_column": "value", "y_column": "count", "options": {"mode": "density"}},
+}
+
+# A stage regresses if it is this much slower or larger than in the baseline...
+DEFAULT_THRESHOLD = 0.25
+# ...and the difference exceeds these absolute floors, which filter out noise.
+MIN_SECONDS_DELTA = 0.05
+MIN_RSS_DELTA_MB = 16.0
+
+
+def run_case(file_path: str, plot_type: str, parser: str = "auto") -> Dict[str, Dict[str, float]]:
+    """
+    Runs the validate → load → render → encode pipeline once for a plot type.
+
+    Meant to run in a fresh process (see measure_case), since the peak RSS
+    reported for each stage is the process's high-water mark after it. The
+    file is loaded with the given parser backend (see data_loader.load_csv).
+
+    Returns:
+        A mapping from stage name to {"seconds": ..., "peak_rss_mb": ...}.
+    """
+    from data_loader import load_csv
+    from plotter import render_figure, save_figure
+    from profiling import peak_rss_mb
+    from schema import check_schema, dtype_hints, probe_schema
+
+    case = CASES[plot_type]
+    columns = list(dict.fromkeys([case["x_column"], case["y_column"]]))
+    stages = {}
+    start = time.perf_counter()
+
+    def finish(stage):
+        nonlocal start
+        now = time.perf_counter()
+        stages[stage] = {"seconds": now - start, "peak_rss_mb": peak_rss_mb()}
+        start = now
+
+    schema = probe_schema(file_path)
+    check_schema(schema, file_path, columns)
+    finish("validate")
+    df = load_csv(file_path, columns=columns, dtype=dtype_hints(schema, columns), parser=parser)
+    finish("load")
+    fig = render_figure(plot_type, df, case["x_column"], case["y_column"], **case["options"])
+    finish("render")
+    save_figure(fig, io.BytesIO(), fmt="png")
+    finish("encode")
+    return stages
+
+
+def measure_case(file_path: str, plot_type: str, repeat: int = 1,
+                 parser: str = "auto") -> Dict[str, Dict[str, float]]:
+    """
+    Measures a case in fresh subprocesses and keeps the fastest run of each stage.
+
+    Each run starts a new interpreter, so import costs and memory of other
+    cases do not leak into the measurement.
+    """
+    best: Dict[str, Dict[str, float]] = {}
+    for _ in range(repeat):
+        result = subprocess.run([sys.executable, os.path.abspath(__file__), "--run_case", file_path, plot_type,
+                                 parser], capture_output=True, text=True)
+        if result.returncode != 0:
+            raise RuntimeError(f"Benchmark case {plot_type} on '{file_path}' failed:\n{result.stderr}")
+        stages = json.loads(result.stdout.strip().splitlines()[-1])
+        for stage, metrics in stages.items():
+            if stage not in best or metrics["seconds"] < best[stage]["seconds"]:
+                best[stage] = metrics
+    return best
+
+
+def environment() -> Dict[str, str]:
+    """Describes the machine and library versions, stored with every result set."""
+    from importlib.metadata import PackageNotFoundError, version
+    try:
+        pyarrow_version = version("pyarrow")
+    except PackageNotFoundError:
+        pyarrow_version = None
+    return {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+        "cpu_count": os.cpu_count(),
+        "pandas": version("pandas"),
+        "numpy": version("numpy"),
+        "matplotlib": version("matplotlib"),
+        "pyarrow": pyarrow_version,
+    }
+
+
+def run_benchmarks(sizes: List[int], plot_types: List[str], data_dir: str, repeat: int = 1,
+                   seed: int = 0, parser: str = "auto") -> Dict:
+    """
+    Runs every plot type on a synthetic dataset of every size.
+
+    Returns:
+        {"environment": {...}, "created": ISO timestamp, "parser": parser,
+        "results": [{"rows": ..., "plot_type": ..., "stages": {...},
+        "total_seconds": ...}, ...]}
+    """
+    from generate_data import dataset_path
+
+    results = []
+    for rows in sizes:
+        file_path = dataset_path(data_dir, rows, seed)
+        for plot_type in plot_types:
+            stages = measure_case(file_path, plot_type, repeat=repeat, parser=parser)
+            total = sum(metrics["seconds"] for metrics in stages.values())
+            results.append({"rows": rows, "plot_type": plot_type, "stages": stages, "total_seconds": total})
+            print(f"{plot_type:>8} {rows:>12,} rows: {total:8.3f}s, peak "
+                  f"{max(m['peak_rss_mb'] for m in stages.values()):8.1f} MB  "
+                  + "  ".join(f"{stage}={stages[stage]['seconds']:.3f}s" for stage in STAGES))
+    return {"environment": environment(), "created": time.strftime("%Y-%m-%dT%H:%M:%S%z"), "parser": parser,
+            "results": results}
+
+
+def compare_to_baseline(current: Dict, baseline: Dict, threshold: float = DEFAULT_THRESHOLD) -> List[Dict]:
+    """
+    Flags stages that got slower or used more memory than in a baseline.
+
+    Only cases present in both result sets are compared.
+
+    Args:
+        current: Results of run_benchmarks.
+        baseline: Stored results of an earlier run_benchmarks.
+        threshold: Relative increase that counts as a regression, e.g. 0.25
+            for 25%. Increases below MIN_SECONDS_DELTA seconds or
+            MIN_RSS_DELTA_MB megabytes are ignored as noise.
+
+    Returns:
+        One entry per regression with the keys "rows", "plot_type", "stage",
+        "metric", "baseline", "current" and "change" (relative increase).
+    """
+    baseline_cases = {(r["rows"], r["plot_type"]): r["stages"] for r in baseline["results"]}
+    regressions = []
+    for result in current["results"]:
+        old_stages = baseline_cases.get((result["rows"], result["plot_type"]))
+        if old_stages is None:
+            continue
+        for stage, metrics in result["stages"].items():
+            if stage not in old_stages:
+                continue
+            for metric, floor in (("seconds", MIN_SECONDS_DELTA), ("peak_rss_mb", MIN_RSS_DELTA_MB)):
+                old, new = old_stages[stage][metric], metrics[metric]
+                if new - old > floor and new > old * (1 + threshold):
+                    regressions.append({"rows": result["rows"], "plot_type": result["plot_type"], "stage": stage,
+                                        "metric": metric, "baseline": old, "current": new,
+                                        "change": new / old - 1 if old else float("inf")})
+    return regressions
+
+
+def _parse_size(text: str) -> int:
+    size = float(text)
+    if size < 1 or size != int(size):
+        raise argparse.ArgumentTypeError(f"invalid size: '{text}'")
+    return int(size)
+
+
+def main(argv: Optional[List[str]] = None):
+    if argv is None:
+        argv = sys.argv[1:]
+    if argv[:1] == ["--run_case"]:
+        # Child process of measure_case: report one case as a JSON line.
+        print(json.dumps(run_case(argv[1], argv[2], *argv[3:4])))
+        return
+
+    parser = argparse.ArgumentParser(description="Benchmark the validate → load → render → encode pipeline.")
+    parser.add_argument("--sizes", type=_parse_size, nargs="+", default=list(DEFAULT_SIZES),
+                        help="Dataset sizes in rows, e.g. 1e3 1e6 1e8. Defaults to 1e3 to 1e6.")
+    parser.add_argument("--plot_types", type=str, nargs="+", choices=list(CASES), default=list(CASES),
+                        help="Plot types to benchmark. Defaults to all.")
+    parser.add_argument("--data_dir", type=str, default=os.path.join(BENCHMARKS_DIR, "data"),
+                        help="Directory of the generated datasets, which are reused across runs.")
+    parser.add_argument("--repeat", type=int, default=1,
+                        help="Runs per case; the fastest run of each stage is kept. Defaults to 1.")
+    parser.add_argument("--parser", type=str, choices=["auto", "c", "pyarrow", "numpy"], default="auto",
+                        help="CSV parser backend of the load stage. Defaults to auto.")
+    parser.add_argument("--output", type=str, default=None, help="Optional path to write the results as JSON.")
+    parser.add_argument("--baseline", type=str, default=None,
+                        help="Optional baseline JSON to compare against. Exits with status 1 on regressions.")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help=f"Relative slowdown or memory growth flagged as a regression. Defaults to {DEFAULT_THRESHOLD}.")
+    args = parser.parse_args(argv)
+
+    current = run_benchmarks(args.sizes, args.plot_types, args.data_dir, repeat=args.repeat, parser=args.parser)
+    if args.output is not None:
+        with open(args.output, "w") as f:
+            json.dump(current, f, indent=2)
+        print(f"Results saved to {args.output}.")
+
+    if args.baseline is not None:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        regressions = compare_to_baseline(current, baseline, threshold=args.threshold)
+        for r in regressions:
+            print(f"REGRESSION {r['plot_type']} {r['rows']:,} rows, {r['stage']} {r['metric']}: "
+                  f"{r['baseline']:.3f} -> {r['current']:.3f} (+{r['change']:.0%})")
+        if regressions:
+            sys.exit(1)
+        print(f"No regressions against {args.baseline}.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,375 @@
+import math
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+# Aggregations computed as a quantile of the values, mapped to the quantile.
+QUANTILE_AGGREGATIONS = {"median": 0.5, "p25": 0.25, "p75": 0.75, "p90": 0.9, "p95": 0.95, "p99": 0.99}
+
+# Supported aggregations for bar charts.
+AGGREGATIONS = ("sum", "mean", "count", "min", "max") + tuple(QUANTILE_AGGREGATIONS)
+
+# Label of the bucket that collects the categories outside the top N.
+DEFAULT_OTHER_LABEL = "Other"
+
+
+def aggregate_categories(df: pd.DataFrame, x_column: str, y_column: str, agg: str = "sum",
+                         top_n: Optional[int] = None, other_label: str = DEFAULT_OTHER_LABEL) -> pd.DataFrame:
+    """
+    Groups rows by x_column and aggregates y_column per category.
+
+    Args:
+        df: DataFrame (or DataFrame-like object) containing the data.
+        x_column: Name of the category column.
+        y_column: Name of the value column.
+        agg: One of AGGREGATIONS. "count" counts the non-null y values;
+            "median" and "p25" to "p99" are quantiles of the values.
+        top_n: If given, only the top_n categories with the largest aggregated
+            value are kept and all remaining rows are aggregated into a single
+            other_label category, which is placed last.
+        other_label: Label of the bucket holding the remaining categories.
+
+    Returns:
+        A DataFrame with one row per category and the columns x_column and y_column.
+        Categories are sorted by x_column, or by descending value when top_n applies.
+
+    Raises:
+        ValueError: If agg is not one of AGGREGATIONS or top_n is not positive.
+    """
+    if agg not in AGGREGATIONS:
+        raise ValueError(f"Unknown aggregation '{agg}'. Choose from {list(AGGREGATIONS)}.")
+    if top_n is not None and top_n <= 0:
+        raise ValueError(f"top_n must be a positive integer, got {top_n}.")
+
+    frame = pd.DataFrame({x_column: df[x_column], y_column: df[y_column]})
+    grouped = _aggregate(frame.groupby(x_column, sort=True, observed=True)[y_column], agg)
+    if top_n is not None and len(grouped) > top_n:
+        top = grouped.nlargest(top_n)
+        rest = _aggregate(frame.loc[~frame[x_column].isin(top.index), y_column], agg)
+        # Categories become labels so the numeric and "Other" entries can be mixed.
+        top.index = top.index.astype(str)
+        grouped = pd.concat([top, pd.Series([rest], index=[other_label])])
+    return grouped.rename_axis(x_column).reset_index(name=y_column)
+
+
+def _aggregate(values, agg: str):
+    """Applies agg to a Series or a grouped Series."""
+    if agg in QUANTILE_AGGREGATIONS and agg != "median":
+        return values.quantile(QUANTILE_AGGREGATIONS[agg])
+    return values.agg(agg)
+
+
+# Aggregations that can be computed per shard and merged exactly.
+MERGEABLE_AGGREGATIONS = ("sum", "mean", "count", "min", "max")
+
+# Statistics kept per category by partial_aggregate.
+_PARTIAL_STATISTICS = ("sum", "count", "min", "max")
+
+
+def partial_aggregate(df: pd.DataFrame, x_column: str, y_column: str) -> pd.DataFrame:
+    """
+    Reduces one shard of the data to mergeable per-category statistics.
+
+    Args:
+        df: DataFrame (or DataFrame-like object) holding one shard of the data.
+        x_column: Name of the category column.
+        y_column: Name of the value column.
+
+    Returns:
+        A DataFrame with one row per category and the columns x_column, "sum",
+        "count", "min" and "max" of the shard's y_column values. Frames from
+        several shards can be concatenated and passed to merge_partial_aggregates.
+    """
+    frame = pd.DataFrame({x_column: df[x_column], y_column: df[y_column]})
+    grouped = frame.groupby(x_column, sort=False, observed=True)[y_column].agg(list(_PARTIAL_STATISTICS))
+    return grouped.reset_index()
+
+
+def merge_partial_aggregates(partials: pd.DataFrame, x_column: str, y_column: str, agg: str = "sum",
+                             top_n: Optional[int] = None, other_label: str = DEFAULT_OTHER_LABEL) -> pd.DataFrame:
+    """
+    Merges the statistics of several shards into the final aggregated values.
+
+    The result equals aggregate_categories applied to all shards' rows at once.
+
+    Args:
+        partials: Concatenated partial_aggregate results.
+        x_column: Name of the category column.
+        y_column: Name of the value column in the result.
+        agg: One of MERGEABLE_AGGREGATIONS.
+        top_n: See aggregate_categories.
+        other_label: See aggregate_categories.
+
+    Returns:
+        See aggregate_categories.
+
+    Raises:
+        ValueError: If agg is not one of MERGEABLE_AGGREGATIONS or top_n is not positive.
+    """
+    if agg not in MERGEABLE_AGGREGATIONS:
+        raise ValueError(f"Aggregation '{agg}' cannot be merged across shards. "
+                         f"Choose from {list(MERGEABLE_AGGREGATIONS)}.")
+    if top_n is not None and top_n <= 0:
+        raise ValueError(f"top_n must be a positive integer, got {top_n}.")
+
+    stats = partials.groupby(x_column, sort=True, observed=True).agg(
+        {"sum": "sum", "count": "sum", "min": "min", "max": "max"})
+    grouped = _finish(stats, agg)
+    if top_n is not None and len(grouped) > top_n:
+        top = grouped.nlargest(top_n)
+        rest = stats.loc[~stats.index.isin(top.index)]
+        other = _finish(pd.DataFrame({"sum": [rest["sum"].sum()], "count": [rest["count"].sum()],
+                                      "min": [rest["min"].min()], "max": [rest["max"].max()]}), agg)
+        # Categories become labels so the numeric and "Other" entries can be mixed.
+        top.index = top.index.astype(str)
+        grouped = pd.concat([top, pd.Series(other.to_numpy(), index=[other_label])])
+    return grouped.rename_axis(x_column).reset_index(name=y_column)
+
+
+def _finish(stats: pd.DataFrame, agg: str) -> pd.Series:
+    """Computes the final aggregate from merged statistics."""
+    if agg == "mean":
+        return stats["sum"] / stats["count"]
+    return stats[agg]
+
+
+# Number of chunk statistics StreamingAggregator buffers before combining them,
+# which amortizes the fixed cost of a groupby over many small frames.
+_MAX_PENDING_PARTIALS = 64
+
+# Default relative accuracy of QuantileSketch: quantiles are within 1% of the exact value.
+DEFAULT_RELATIVE_ACCURACY = 0.01
+
+
+class QuantileSketch:
+    """
+    A mergeable sketch of a distribution that answers quantile queries approximately.
+
+    Values are counted in logarithmically sized buckets, as in DDSketch, so
+    the values around every quantile's rank are known within
+    relative_accuracy, and so is the quantile interpolated between them.
+    Its size grows with the logarithm of the value range, not with the
+    number of values, and sketches of separate chunks merge into the sketch
+    of all values. Infinite values are counted on their own and returned
+    exactly.
+    """
+
+    def __init__(self, relative_accuracy: float = DEFAULT_RELATIVE_ACCURACY):
+        """
+        Args:
+            relative_accuracy: Largest relative error of a quantile, between 0 and 1.
+
+        Raises:
+            ValueError: If relative_accuracy is not between 0 and 1.
+        """
+        if not 0 < relative_accuracy < 1:
+            raise ValueError(f"relative_accuracy must be between 0 and 1, got {relative_accuracy}.")
+        self.relative_accuracy = relative_accuracy
+        self._gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self._log_gamma = math.log(self._gamma)
+        self.positive: Dict[int, int] = {}
+        self.negative: Dict[int, int] = {}
+        self.zeros = 0
+        self.infinities = {1: 0, -1: 0}
+        self.count = 0
+
+    def add(self, values) -> None:
+        """Adds an array of values. NaN values are ignored."""
+        values = np.asarray(values, dtype=np.float64)
+        values = values[~np.isnan(values)]
+        self.count += len(values)
+        infinite = np.isinf(values)
+        if infinite.any():
+            self.infinities[1] += int(np.count_nonzero(values[infinite] > 0))
+            self.infinities[-1] += int(np.count_nonzero(values[infinite] < 0))
+            values = values[~infinite]
+        tiny = np.finfo(np.float64).tiny
+        self.zeros += int(np.count_nonzero(np.abs(values) < tiny))
+        self._add_buckets(self.positive, values[values >= tiny])
+        self._add_buckets(self.negative, -values[values <= -tiny])
+
+    def _add_buckets(self, buckets: Dict[int, int], magnitudes: np.ndarray) -> None:
+        if not len(magnitudes):
+            return
+        keys, counts = np.unique(np.ceil(np.log(magnitudes) / self._log_gamma).astype(np.int64), return_counts=True)
+        for key, count in zip(keys.tolist(), counts.tolist()):
+            buckets[key] = buckets.get(key, 0) + count
+
+    def merge(self, other: "QuantileSketch") -> None:
+        """Adds the values counted by other, a sketch with the same relative accuracy."""
+        if other.relative_accuracy != self.relative_accuracy:
+            raise ValueError("Only sketches with the same relative accuracy can be merged.")
+        for buckets, other_buckets in ((self.positive, other.positive), (self.negative, other.negative)):
+            for key, count in other_buckets.items():
+                buckets[key] = buckets.get(key, 0) + count
+        self.zeros += other.zeros
+        for sign in self.infinities:
+            self.infinities[sign] += other.infinities[sign]
+        self.count += other.count
+
+    def quantile(self, q: float) -> float:
+        """
+        Returns the approximate q-quantile (0 <= q <= 1), or NaN for an empty sketch.
+
+        Like pandas' default linear interpolation, the result lies between
+        the values at rank floor(q * (count - 1)) and the rank above it.
+        """
+        if not 0 <= q <= 1:
+            raise ValueError(f"q must be between 0 and 1, got {q}.")
+        if self.count == 0:
+            return float("nan")
+        rank = q * (self.count - 1)
+        lower_rank = math.floor(rank)
+        fraction = rank - lower_rank
+        lower = None
+        seen = 0
+        for value, count in self._ascending_buckets():
+            seen += count
+            if lower is None and seen > lower_rank:
+                lower = value
+                if fraction == 0:
+                    return lower
+            if lower is not None and seen > lower_rank + 1:
+                if math.isinf(lower) or math.isinf(value):
+                    # An infinite neighbour wins; between -inf and inf the quantile is undefined (NaN).
+                    return lower + value
+                return lower + fraction * (value - lower)
+
+    def _ascending_buckets(self):
+        """Yields (representative value, count) of the non-empty buckets in ascending order of value."""
+        if self.infinities[-1]:
+            yield float("-inf"), self.infinities[-1]
+        for key in sorted(self.negative, reverse=True):
+            yield -self._value(key), self.negative[key]
+        if self.zeros:
+            yield 0.0, self.zeros
+        for key in sorted(self.positive):
+            yield self._value(key), self.positive[key]
+        if self.infinities[1]:
+            yield float("inf"), self.infinities[1]
+
+    def _value(self, key: int) -> float:
+        # The point of bucket (gamma^(key-1), gamma^key] within relative_accuracy of both ends.
+        return 2 * self._gamma ** key / (self._gamma + 1)
+
+
+class StreamingAggregator:
+    """
+    Folds chunks of rows into running per-category statistics for bar charts.
+
+    Only the per-category count, sum, minimum and maximum (and, for quantile
+    aggregations, one QuantileSketch per category) are kept, so a file of any
+    size can be aggregated chunk by chunk in memory bounded by the number of
+    categories. Aggregators of separate files or shards can be merged.
+    """
+
+    def __init__(self, x_column: str, y_column: str, sketch: bool = False,
+                 relative_accuracy: float = DEFAULT_RELATIVE_ACCURACY):
+        """
+        Args:
+            x_column: Name of the category column.
+            y_column: Name of the value column.
+            sketch: If True, a QuantileSketch is kept per category, so the
+                quantile aggregations (QUANTILE_AGGREGATIONS) can be computed.
+            relative_accuracy: Relative accuracy of the sketches.
+        """
+        self.x_column = x_column
+        self.y_column = y_column
+        self.relative_accuracy = relative_accuracy
+        self.sketches: Optional[Dict[Any, QuantileSketch]] = {} if sketch else None
+        self.rows = 0
+        self._stats: Optional[pd.DataFrame] = None
+        self._pending: List[pd.DataFrame] = []
+
+    @property
+    def stats(self) -> pd.DataFrame:
+        """The per-category "sum", "count", "min" and "max" so far, indexed by category."""
+        self._compact()
+        if self._stats is None:
+            return pd.DataFrame({name: pd.Series(dtype=np.float64) for name in _PARTIAL_STATISTICS})
+        return self._stats
+
+    def update(self, df: pd.DataFrame) -> None:
+        """Adds the rows of one chunk."""
+        partial = partial_aggregate(df, self.x_column, self.y_column).set_index(self.x_column)
+        self._add_partial(partial)
+        if self.sketches is not None:
+            for category, values in df[self.y_column].groupby(df[self.x_column], sort=False, observed=True):
+                sketch = self.sketches.get(category)
+                if sketch is None:
+                    sketch = self.sketches[category] = QuantileSketch(self.relative_accuracy)
+                sketch.add(values.to_numpy())
+        self.rows += len(df)
+
+    def merge(self, other: "StreamingAggregator") -> None:
+        """Adds the rows folded into other, an aggregator of the same columns."""
+        self._add_partial(other.stats)
+        if self.sketches is not None:
+            if other.sketches is None:
+                raise ValueError("Cannot merge an aggregator without quantile sketches.")
+            for category, sketch in other.sketches.items():
+                if category in self.sketches:
+                    self.sketches[category].merge(sketch)
+                else:
+                    self.sketches[category] = sketch
+        self.rows += other.rows
+
+    def _add_partial(self, stats: pd.DataFrame) -> None:
+        # Categorical labels are stored as plain values, so chunks whose
+        # categories differ still combine into one index.
+        if isinstance(stats.index, pd.CategoricalIndex):
+            stats.index = stats.index.astype(stats.index.categories.dtype)
+        self._pending.append(stats)
+        if len(self._pending) >= _MAX_PENDING_PARTIALS:
+            self._compact()
+
+    def _compact(self) -> None:
+        if not self._pending:
+            return
+        merged = pd.concat(([self._stats] if self._stats is not None else []) + self._pending)
+        self._stats = merged.groupby(level=0, sort=False).agg({"sum": "sum", "count": "sum", "min": "min", "max": "max"})
+        self._pending = []
+
+    def result(self, agg: str = "sum", top_n: Optional[int] = None,
+               other_label: str = DEFAULT_OTHER_LABEL) -> pd.DataFrame:
+        """
+        Returns the aggregated values of the rows folded so far.
+
+        Args:
+            agg: One of AGGREGATIONS. Quantile aggregations need sketch=True
+                and are approximate.
+            top_n: See aggregate_categories.
+            other_label: See aggregate_categories.
+
+        Returns:
+            See aggregate_categories.
+
+        Raises:
+            ValueError: If agg is unknown or needs sketches this aggregator
+                does not keep, or top_n is not positive.
+        """
+        if agg in MERGEABLE_AGGREGATIONS:
+            return merge_partial_aggregates(self.stats.rename_axis(self.x_column).reset_index(), self.x_column,
+                                            self.y_column, agg=agg, top_n=top_n, other_label=other_label)
+        if agg not in QUANTILE_AGGREGATIONS:
+            raise ValueError(f"Unknown aggregation '{agg}'. Choose from {list(AGGREGATIONS)}.")
+        if self.sketches is None:
+            raise ValueError(f"Aggregation '{agg}' needs quantile sketches; create the aggregator with sketch=True.")
+        if top_n is not None and top_n <= 0:
+            raise ValueError(f"top_n must be a positive integer, got {top_n}.")
+
+        q = QUANTILE_AGGREGATIONS[agg]
+        categories = sorted(self.stats.index)
+        grouped = pd.Series([self.sketches[c].quantile(q) if c in self.sketches else np.nan for c in categories],
+                            index=pd.Index(categories), dtype=np.float64)
+        if top_n is not None and len(grouped) > top_n:
+            top = grouped.nlargest(top_n)
+            rest = QuantileSketch(self.relative_accuracy)
+            for category in grouped.index.difference(top.index):
+                if category in self.sketches:
+                    rest.merge(self.sketches[category])
+            # Categories become labels so the numeric and "Other" entries can be mixed.
+            top.index = top.index.astype(str)
+            grouped = pd.concat([top, pd.Series([rest.quantile(q)], index=[other_label])])
+        return grouped.rename_axis(self.x_column).reset_index(name=self.y_column)
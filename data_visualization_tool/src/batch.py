@@ -0,0 +1,297 @@
+#!/usr/bin/env python3
+import argparse
+import csv
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Dict, List, Optional, Tuple
+
+try:
+    from .data_loader import expand_input_paths, read_csv_header
+    from .main import build_parser, load_data, main_only_options, render_plot, required_columns, validate_args
+    from .parallel import SharedFrame, render_shared
+except ImportError:
+    # Fallback for direct execution, e.g. "python src/batch.py manifest.json".
+    from data_loader import expand_input_paths, read_csv_header
+    from main import build_parser, load_data, main_only_options, render_plot, required_columns, validate_args
+    from parallel import SharedFrame, render_shared
+
+# Job fields that map to main.py's positional arguments, in order.
+POSITIONAL_FIELDS = ("file_path", "plot_type", "x_column", "y_column")
+
+# Options that control how a file is loaded. Jobs are grouped by these so that
+# each distinct input is loaded once.
+LOAD_OPTIONS = ("file_path", "chunksize", "cache_dir", "cache_max_bytes", "mmap", "sort_by", "workers",
+                "optimize_memory", "date_format", "sample", "seed", "stratify_by", "parser")
+
+
+def load_manifest(manifest_path: str) -> List[Dict]:
+    """
+    Reads a batch manifest listing plot jobs.
+
+    Each job is a mapping from main.py argument names to values, e.g.
+    {"file_path": "data.csv", "plot_type": "bar", "x_column": "a",
+    "y_column": "b", "agg": "sum", "output_path": "a_vs_b.png"}.
+
+    Supported formats, chosen by file extension:
+        .json: a list of jobs, or an object with a "jobs" list.
+        .yaml/.yml: the same structure as JSON (requires PyYAML).
+        .csv: one job per row, with argument names as the header. Empty cells
+            are ignored and "true"/"false" are read as booleans.
+
+    Args:
+        manifest_path: The path to the manifest file.
+
+    Returns:
+        The list of jobs.
+
+    Raises:
+        FileNotFoundError: If the manifest does not exist.
+        ImportError: If a YAML manifest is given and PyYAML is not installed.
+        ValueError: If the manifest format is unsupported or malformed.
+    """
+    extension = os.path.splitext(manifest_path)[1].lower()
+    with open(manifest_path, newline="") as f:
+        if extension == ".json":
+            data = json.load(f)
+        elif extension in (".yaml", ".yml"):
+            try:
+                import yaml
+            except ImportError:
+                raise ImportError("PyYAML is required to read YAML manifests (pip install pyyaml).")
+            data = yaml.safe_load(f)
+        elif extension == ".csv":
+            data = [{key: _parse_csv_cell(value) for key, value in row.items() if value not in (None, "")}
+                    for row in csv.DictReader(f)]
+        else:
+            raise ValueError(f"Unsupported manifest format '{extension}'. Use .json, .yaml, .yml or .csv.")
+    if isinstance(data, dict):
+        data = data.get("jobs")
+    if not isinstance(data, list) or not all(isinstance(job, dict) for job in data):
+        raise ValueError(f"Manifest '{manifest_path}' must contain a list of job objects.")
+    return data
+
+
+def _parse_csv_cell(value: str):
+    lowered = value.strip().lower()
+    if lowered in ("true", "false"):
+        return lowered == "true"
+    return value
+
+
+def job_to_args(job: Dict, parser: Optional[argparse.ArgumentParser] = None) -> argparse.Namespace:
+    """
+    Converts a manifest job into the arguments main.py would parse for it.
+
+    The job goes through main.py's own parser, so option names, choices and
+    types are validated exactly as on the command line.
+
+    Raises:
+        ValueError: If the job is missing a required field or has an invalid option.
+    """
+    parser = parser or build_parser()
+    missing = [field for field in POSITIONAL_FIELDS if field not in job]
+    if missing:
+        raise ValueError(f"Job is missing required fields: {missing}")
+    argv = [str(job[field]) for field in POSITIONAL_FIELDS]
+    for key, value in job.items():
+        if key in POSITIONAL_FIELDS or value is None or value is False:
+            continue
+        argv.append(f"--{key}")
+        if isinstance(value, list):
+            argv.extend(str(item) for item in value)
+        elif value is not True:
+            argv.append(str(value))
+    try:
+        args = parser.parse_args(argv)
+    except SystemExit:
+        # argparse has already printed the reason to stderr.
+        raise ValueError(f"Invalid job arguments: {argv}")
+    validate_args(args)
+    unsupported = main_only_options(args)
+    if unsupported:
+        raise ValueError(f"Options {unsupported} are not supported in batch jobs.")
+    return args
+
+
+def run_batch(jobs: List[Dict], fail_fast: bool = False, workers: int = 1) -> List[Dict]:
+    """
+    Renders a list of plot jobs, loading each distinct input file only once.
+
+    Jobs that read the same file with the same loading options share one load
+    of the union of their columns.
+
+    Args:
+        jobs: Jobs as returned by load_manifest.
+        fail_fast: If True, stop at the first failed job.
+        workers: Number of worker processes rendering in parallel. With more
+            than one, each loaded frame is placed in shared memory once and
+            the jobs are distributed over a process pool.
+
+    Returns:
+        One result per job, in manifest order, with the keys "index",
+        "file_path", "plot_type", "output_path", "status" ("ok", "error" or
+        "skipped"), "error" and "seconds".
+    """
+    parser = build_parser()
+    results = [{"index": i, "file_path": job.get("file_path"), "plot_type": job.get("plot_type"),
+                "output_path": None, "status": "skipped", "error": None, "seconds": 0.0}
+               for i, job in enumerate(jobs)]
+
+    # Group valid jobs by how their input has to be loaded, keeping manifest order.
+    groups: Dict[tuple, List] = {}
+    for i, job in enumerate(jobs):
+        try:
+            args = job_to_args(job, parser)
+        except ValueError as e:
+            results[i].update(status="error", error=str(e))
+            if fail_fast:
+                return results
+            continue
+        key = tuple(getattr(args, option) for option in LOAD_OPTIONS)
+        if args.date_format is not None:
+            # The date format applies to the job's own x column.
+            key += (args.x_column,)
+        groups.setdefault(key, []).append((i, args))
+
+    if workers > 1:
+        _run_groups_parallel(list(groups.values()), results, fail_fast, workers)
+    else:
+        _run_groups_serial(list(groups.values()), results, fail_fast)
+    return results
+
+
+def _load_group(group: List) -> Tuple[object, float]:
+    """Loads the data shared by a group of jobs and returns it with the load time per job."""
+    first_args = group[0][1]
+    print(f"Loading data from {first_args.file_path}...")
+    start = time.perf_counter()
+    # Columns missing from the file are left out of the shared load so
+    # that only the jobs referencing them fail.
+    # Shards share one header, so the first shard's is representative.
+    header = set(read_csv_header(expand_input_paths(first_args.file_path)[0]))
+    columns = [c for c in dict.fromkeys(c for _, args in group for c in required_columns(args))
+               if c in header]
+    df = load_data(first_args, columns=columns)
+    return df, (time.perf_counter() - start) / len(group)
+
+
+def _fail_group(group: List, results: List[Dict], error: Exception) -> None:
+    for i, _ in group:
+        results[i].update(status="error", error=f"Failed to load data: {error}")
+
+
+def _run_groups_serial(groups: List[List], results: List[Dict], fail_fast: bool) -> None:
+    for group in groups:
+        try:
+            df, load_seconds = _load_group(group)
+        except Exception as e:
+            _fail_group(group, results, e)
+            if fail_fast:
+                return
+            continue
+
+        for i, args in group:
+            start = time.perf_counter()
+            try:
+                output_path = render_plot(df, args)
+                results[i].update(status="ok", output_path=output_path)
+            except Exception as e:
+                results[i].update(status="error", error=str(e))
+            # The shared load time is split evenly across the jobs that used it.
+            results[i]["seconds"] = load_seconds + time.perf_counter() - start
+            if fail_fast and results[i]["status"] == "error":
+                return
+
+
+def _run_groups_parallel(groups: List[List], results: List[Dict], fail_fast: bool, workers: int) -> None:
+    # Each group's shared memory is released as soon as its last job finishes.
+    shared: Dict[int, list] = {}
+    futures = {}
+    try:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            for group_id, group in enumerate(groups):
+                load_seconds = 0.0
+                spec = None
+                # Memory-mapped inputs are already shared through the page cache,
+                # so workers map them directly instead.
+                if not group[0][1].mmap:
+                    try:
+                        df, load_seconds = _load_group(group)
+                        frame = SharedFrame(df)
+                    except Exception as e:
+                        _fail_group(group, results, e)
+                        if fail_fast:
+                            break
+                        continue
+                    del df
+                    shared[group_id] = [frame, len(group)]
+                    spec = frame.spec
+                for i, args in group:
+                    futures[executor.submit(render_shared, spec, args)] = (i, group_id, load_seconds)
+
+            for future in as_completed(futures):
+                i, group_id, load_seconds = futures[future]
+                if future.cancelled():
+                    continue
+                try:
+                    output_path, render_seconds = future.result()
+                    results[i].update(status="ok", output_path=output_path,
+                                      seconds=load_seconds + render_seconds)
+                except Exception as e:
+                    results[i].update(status="error", error=str(e), seconds=load_seconds)
+                if group_id in shared:
+                    shared[group_id][1] -= 1
+                    if shared[group_id][1] == 0:
+                        shared.pop(group_id)[0].close()
+                if fail_fast and results[i]["status"] == "error":
+                    for pending in futures:
+                        pending.cancel()
+                    break
+    finally:
+        # Reached only after the pool has shut down, so no worker still uses the memory.
+        for frame, _ in shared.values():
+            frame.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Render many plots from a manifest of plot jobs.")
+    parser.add_argument("manifest", type=str, help="Path to a .json, .yaml/.yml or .csv manifest of plot jobs.")
+    parser.add_argument("--report", type=str, default=None,
+                        help="Optional path to write per-job results as JSON.")
+    parser.add_argument("--fail_fast", action="store_true", help="Stop at the first failed job.")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="Number of worker processes rendering in parallel (0 = one per CPU). Defaults to 1.")
+    args = parser.parse_args()
+
+    try:
+        jobs = load_manifest(args.manifest)
+    except FileNotFoundError:
+        print(f"Error: The manifest '{args.manifest}' was not found.")
+        sys.exit(1)
+    except (ImportError, ValueError) as e:
+        print(f"Error: {e}")
+        sys.exit(1)
+
+    workers = args.workers if args.workers > 0 else (os.cpu_count() or 1)
+    results = run_batch(jobs, fail_fast=args.fail_fast, workers=workers)
+
+    for result in results:
+        detail = result["output_path"] if result["status"] == "ok" else result["error"]
+        print(f"[{result['status']}] job {result['index']} ({result['plot_type']}, "
+              f"{result['seconds']:.2f}s): {detail}")
+    failed = sum(result["status"] != "ok" for result in results)
+    print(f"{len(results) - failed} of {len(results)} jobs succeeded.")
+
+    if args.report is not None:
+        with open(args.report, "w") as f:
+            json.dump(results, f, indent=2)
+
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
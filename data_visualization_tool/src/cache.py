@@ -0,0 +1,166 @@
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+try:
+    from .disk_cache import DEFAULT_MAX_BYTES, evict_lru, file_fingerprint
+except ImportError:
+    from disk_cache import DEFAULT_MAX_BYTES, evict_lru, file_fingerprint
+
+_META_FILE = "meta.json"
+
+
+class FrameCache:
+    """
+    A size-bounded on-disk cache of parsed CSV files in a binary columnar layout.
+
+    Each entry is a directory holding one .npy file per column plus a small JSON
+    manifest, keyed by the source file's fingerprint and the projected columns.
+    A warm load is a binary read (or a memory map) of the .npy files instead of
+    a CSV parse. String columns are stored as fixed-width unicode arrays with a
+    separate null mask, and categorical columns as their integer codes plus an
+    array of categories, so no pickling is involved.
+    """
+
+    def __init__(self, cache_dir: str, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        os.makedirs(cache_dir, exist_ok=True)
+
+    def key(self, file_path: str, columns: Optional[List[str]] = None,
+            parse_options: Optional[Dict[str, Any]] = None) -> str:
+        """Returns the cache key for file_path projected onto columns and parsed with parse_options."""
+        digest = hashlib.blake2b(digest_size=20)
+        digest.update(file_fingerprint(file_path).encode())
+        digest.update(json.dumps(columns).encode())
+        if parse_options:
+            digest.update(json.dumps(parse_options, sort_keys=True).encode())
+        return digest.hexdigest()
+
+    def get(self, file_path: str, columns: Optional[List[str]] = None,
+            mmap_mode: Optional[str] = None,
+            parse_options: Optional[Dict[str, Any]] = None) -> Optional[pd.DataFrame]:
+        """
+        Returns the cached frame for file_path, or None on a cache miss.
+
+        Args:
+            file_path: The path to the source CSV file.
+            columns: The projected columns the frame was stored with.
+            mmap_mode: Optional numpy memory-map mode (e.g. "r") for numeric columns.
+            parse_options: The JSON-serializable options the frame was parsed
+                with, e.g. {"categories": [...]}, which are part of the key.
+        """
+        data = self.get_columns(file_path, columns, mmap_mode=mmap_mode, parse_options=parse_options)
+        if data is None:
+            return None
+        return pd.DataFrame(data, copy=False)
+
+    def get_columns(self, file_path: str, columns: Optional[List[str]] = None,
+                    mmap_mode: Optional[str] = None,
+                    parse_options: Optional[Dict[str, Any]] = None) -> Optional[Dict[str, Any]]:
+        """
+        Returns the cached columns for file_path without building a DataFrame.
+
+        Numeric columns are returned as numpy arrays (numpy.memmap instances when
+        mmap_mode is given); string and categorical columns are returned as pandas Series.
+
+        Args:
+            file_path: The path to the source CSV file.
+            columns: The projected columns the frame was stored with.
+            mmap_mode: Optional numpy memory-map mode (e.g. "r") for numeric columns.
+            parse_options: The options the frame was parsed with, see get.
+
+        Returns:
+            A dict mapping column names to their values in file order, or None on a miss.
+        """
+        entry = os.path.join(self.cache_dir, self.key(file_path, columns, parse_options))
+        try:
+            with open(os.path.join(entry, _META_FILE)) as f:
+                meta = json.load(f)
+            data = {}
+            for i, column in enumerate(meta["columns"]):
+                data[column["name"]] = self._read_column(entry, i, column, mmap_mode)
+        except (FileNotFoundError, ValueError, KeyError):
+            return None
+        os.utime(entry)
+        return data
+
+    def put(self, file_path: str, columns: Optional[List[str]], df: pd.DataFrame,
+            parse_options: Optional[Dict[str, Any]] = None) -> bool:
+        """
+        Stores df as the cached frame for file_path projected onto columns.
+
+        parse_options are the options df was parsed with, see get.
+
+        Returns:
+            True if the frame was stored, False if it has columns that cannot be
+            represented without pickling (e.g. mixed-type object columns).
+        """
+        if not all(_is_storable(df[name]) for name in df.columns):
+            return False
+        key = self.key(file_path, columns, parse_options)
+        tmp_dir = tempfile.mkdtemp(prefix=".tmp-", dir=self.cache_dir)
+        try:
+            meta = {"rows": len(df), "columns": []}
+            for i, name in enumerate(df.columns):
+                meta["columns"].append(self._write_column(tmp_dir, i, name, df[name]))
+            with open(os.path.join(tmp_dir, _META_FILE), "w") as f:
+                json.dump(meta, f)
+            entry = os.path.join(self.cache_dir, key)
+            try:
+                os.rename(tmp_dir, entry)
+            except OSError:
+                # Another process stored the same entry first.
+                shutil.rmtree(tmp_dir, ignore_errors=True)
+        except BaseException:
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+            raise
+        evict_lru(self.cache_dir, self.max_bytes, keep=key)
+        return True
+
+    @staticmethod
+    def _write_column(entry: str, index: int, name: str, series: pd.Series) -> dict:
+        if _is_numpy_native(series):
+            np.save(os.path.join(entry, f"{index}.npy"), series.to_numpy())
+            return {"name": name, "kind": "native", "dtype": str(series.dtype)}
+        if isinstance(series.dtype, pd.CategoricalDtype):
+            np.save(os.path.join(entry, f"{index}.npy"), series.cat.codes.to_numpy())
+            np.save(os.path.join(entry, f"{index}.categories.npy"), series.cat.categories.to_numpy().astype(str))
+            return {"name": name, "kind": "category", "ordered": series.cat.ordered}
+        mask = series.isna().to_numpy()
+        values = np.where(mask, "", series.to_numpy(dtype=object)).astype(str)
+        np.save(os.path.join(entry, f"{index}.npy"), values)
+        np.save(os.path.join(entry, f"{index}.mask.npy"), mask)
+        return {"name": name, "kind": "string", "dtype": str(series.dtype)}
+
+    @staticmethod
+    def _read_column(entry: str, index: int, column: dict, mmap_mode: Optional[str]):
+        values = np.load(os.path.join(entry, f"{index}.npy"), mmap_mode=mmap_mode)
+        if column["kind"] == "native":
+            return values
+        if column["kind"] == "category":
+            categories = np.load(os.path.join(entry, f"{index}.categories.npy"))
+            return pd.Series(pd.Categorical.from_codes(values, categories.tolist(), ordered=column["ordered"]))
+        mask = np.load(os.path.join(entry, f"{index}.mask.npy"))
+        series = pd.Series(values, dtype=object)
+        series[mask] = np.nan
+        return series.astype(column["dtype"])
+
+
+def _is_numpy_native(series: pd.Series) -> bool:
+    return isinstance(series.dtype, np.dtype) and series.dtype.kind in "biufcmM"
+
+
+def _is_storable(series: pd.Series) -> bool:
+    if _is_numpy_native(series):
+        return True
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        return pd.api.types.infer_dtype(series.cat.categories, skipna=True) in ("string", "empty")
+    return pd.api.types.infer_dtype(series, skipna=True) in ("string", "empty")
+
@@ -1,11 +1,137 @@
+import importlib.util
+import io
+import os
+import sys
+import time
+import warnings
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+import numpy as np
 import pandas as pd
 
-def load_csv(file_path: str) -> pd.DataFrame:
+try:
+    from .aggregation import StreamingAggregator
+    from .cache import FrameCache
+    from .sampling import ReservoirSampler
+    from .schema import DEFAULT_CATEGORY_RATIO, detect_compression, open_text, probe_schema
+    from .shards import expand_input_paths, is_sharded_input
+except ImportError:
+    from aggregation import StreamingAggregator
+    from cache import FrameCache
+    from sampling import ReservoirSampler
+    from schema import DEFAULT_CATEGORY_RATIO, detect_compression, open_text, probe_schema
+    from shards import expand_input_paths, is_sharded_input
+
+# Number of rows parsed per chunk when streaming a CSV file.
+DEFAULT_CHUNKSIZE = 100_000
+
+# Parser backends of load_csv: pandas' C engine, pandas' multithreaded pyarrow
+# engine (with the pyarrow package), and numpy.loadtxt for files of plain
+# numbers. "auto" picks one per file, see choose_parser.
+PARSERS = ("auto", "c", "pyarrow", "numpy")
+
+# Smaller files are parsed with the C engine without timing the other
+# backends, since the probe would cost more than a faster backend could save.
+AUTO_PARSER_MIN_BYTES = 32 * 1024 ** 2
+
+# Characters at the head of a file that choose_parser times each backend on.
+PARSER_PROBE_CHARS = 256 * 1024
+
+
+def iter_csv_chunks(file_path: str, columns: Optional[List[str]] = None, chunksize: int = DEFAULT_CHUNKSIZE,
+                    dtype: Optional[Dict[str, Any]] = None) -> Iterator[pd.DataFrame]:
+    """
+    Streams a CSV file as a sequence of DataFrame chunks.
+
+    Only the requested columns are parsed, so peak memory is bounded by
+    chunksize * len(columns) rather than by the size of the file. Compressed
+    files (see detect_compression) are decompressed on the fly as the chunks
+    are parsed, without a decompressed copy on disk.
+
+    Args:
+        file_path: The path to the CSV file.
+        columns: Optional list of column names to read. All columns are read if None.
+        chunksize: Number of rows per chunk. Defaults to DEFAULT_CHUNKSIZE.
+        dtype: Optional read_csv dtypes of some columns, e.g. from
+            schema.dtype_hints, which spare pandas inferring them.
+
+    Yields:
+        pandas DataFrames of at most chunksize rows.
+
+    Raises:
+        FileNotFoundError: If the CSV file is not found at the specified path.
+        pd.errors.EmptyDataError: If the CSV file is empty.
+        pd.errors.ParserError: If an error occurs while parsing the CSV file.
+        ValueError: If any of the requested columns is not in the file.
+    """
+    if chunksize <= 0:
+        raise ValueError(f"chunksize must be a positive integer, got {chunksize}.")
+    try:
+        with pd.read_csv(file_path, usecols=columns, chunksize=chunksize, dtype=dtype,
+                         compression=detect_compression(file_path)) as reader:
+            for chunk in reader:
+                yield chunk
+    except Exception as e:
+        _report_load_error(file_path, columns, e)
+        raise
+
+
+def read_csv_header(file_path: str) -> List[str]:
+    """
+    Reads only the header row of a CSV file.
+
+    Args:
+        file_path: The path to the CSV file.
+
+    Returns:
+        The column names, in file order.
+
+    Raises:
+        FileNotFoundError: If the CSV file is not found at the specified path.
+        pd.errors.EmptyDataError: If the CSV file is empty.
+    """
+    try:
+        return pd.read_csv(file_path, nrows=0, compression=detect_compression(file_path)).columns.tolist()
+    except Exception as e:
+        _report_load_error(file_path, None, e)
+        raise
+
+
+def load_csv(file_path: str, columns: Optional[List[str]] = None, chunksize: Optional[int] = None,
+             cache: Optional[FrameCache] = None, dtype: Optional[Dict[str, Any]] = None,
+             categories: Optional[List[str]] = None, dates: Optional[Dict[str, str]] = None,
+             parser: str = "c", schema: Optional[Dict[str, str]] = None) -> pd.DataFrame:
     """
     Loads a CSV file into a pandas DataFrame.
 
+    gzip, bz2, xz, zstd and single-file zip inputs are detected from their
+    leading bytes and decompressed while parsing.
+
     Args:
         file_path: The path to the CSV file.
+        columns: Optional list of column names to read. All columns are read if None.
+        chunksize: If given, the file is parsed in chunks of this many rows,
+            which bounds the parser's own buffers on very wide files. The
+            loaded frame still holds every row: the chunks are concatenated
+            one column at a time, so the peak is the data plus one column.
+        cache: Optional FrameCache. On a hit the frame is read from its binary
+            columnar copy instead of parsing the CSV; on a miss the parsed frame
+            is stored for the next load.
+        dtype: Optional read_csv dtypes of some columns, see iter_csv_chunks.
+        categories: Optional columns to parse as categoricals, e.g. picked by
+            schema.category_columns. Each distinct string is then stored once.
+        dates: Optional mapping from column name to the strptime format (or
+            "ISO8601") of its timestamps, see parse_dates.
+        parser: One of PARSERS. "c" (the default) is pandas' C engine;
+            "pyarrow" and "numpy" parse the whole file at once, so they cannot
+            be combined with chunksize. "auto" picks the fastest backend with
+            choose_parser, and falls back to the C engine if numpy fails on
+            values past the probed head of the file; chunks are always parsed
+            by the C engine.
+        schema: Optional result of schema.probe_schema for the file, e.g.
+            from validating the request. The other parsers need it, so the
+            file is probed here if it is None.
 
     Returns:
         A pandas DataFrame containing the data from the CSV file.
@@ -14,19 +140,571 @@ def load_csv(file_path: str) -> pd.DataFrame:
         FileNotFoundError: If the CSV file is not found at the specified path.
         pd.errors.EmptyDataError: If the CSV file is empty.
         pd.errors.ParserError: If an error occurs while parsing the CSV file.
+        ValueError: If any of the requested columns is not in the file, a
+            date column does not match its format, the parser is unknown or
+            not installed, or the numpy parser meets values other than numbers.
     """
-    try:
-        df = pd.read_csv(file_path)
-        return df
-    except FileNotFoundError:
+    if parser not in PARSERS:
+        raise ValueError(f"Unknown parser '{parser}'. Choose from {list(PARSERS)}.")
+    if chunksize is not None and parser not in ("auto", "c"):
+        raise ValueError(f"The {parser} parser reads whole files and cannot be combined with chunksize.")
+    if parser == "pyarrow" and "pyarrow" not in available_parsers():
+        error_msg = "Error: The pyarrow parser requires the pyarrow package."
+        print(error_msg)
+        raise ValueError(error_msg)
+    parse_options = {name: value for name, value in (("categories", sorted(categories or [])), ("dates", dates))
+                     if value}
+    if cache is not None and os.path.exists(file_path):
+        df = cache.get(file_path, columns, parse_options=parse_options)
+        if df is not None:
+            return df
+
+    if categories:
+        dtype = {**(dtype or {}), **{column: "category" for column in categories}}
+    if chunksize is not None:
+        chunks = list(iter_csv_chunks(file_path, columns=columns, chunksize=chunksize, dtype=dtype))
+        df = _concat_chunks(chunks)
+    else:
+        auto = parser == "auto"
+        if auto and not os.path.exists(file_path):
+            parser = "c"
+        if schema is None and parser != "c" and (not auto or os.path.getsize(file_path) >= AUTO_PARSER_MIN_BYTES):
+            # probe_schema reports its own errors, so the file is probed outside the try block.
+            schema = probe_schema(file_path)
+        if parser == "auto":
+            parser = choose_parser(file_path, columns, dtype, schema)
+        try:
+            df = _read_csv(file_path, columns, dtype, parser, schema, fallback=auto)
+        except Exception as e:
+            _report_load_error(file_path, columns, e)
+            raise
+    if dates:
+        df = parse_dates(df, dates, file_path)
+
+    if cache is not None:
+        cache.put(file_path, columns, df, parse_options=parse_options)
+    return df
+
+
+def load_csvs(file_paths: List[str], columns: Optional[List[str]] = None, chunksize: Optional[int] = None,
+              cache: Optional[FrameCache] = None, workers: Optional[int] = None,
+              reducer: Optional[Callable[[pd.DataFrame], pd.DataFrame]] = None,
+              dtype: Optional[Dict[str, Any]] = None, categories: Optional[List[str]] = None,
+              dates: Optional[Dict[str, str]] = None, parser: str = "c") -> pd.DataFrame:
+    """
+    Loads several CSV files with the same columns into one DataFrame.
+
+    The files are parsed in parallel worker processes, so CPU-bound work such
+    as parsing or decompressing many shards uses several cores.
+
+    Args:
+        file_paths: The paths to the CSV files, which may be compressed. A
+            directory or glob pattern can be expanded with expand_input_paths.
+        columns: Optional list of column names to read. All columns are read if None.
+        chunksize: Optional chunk size, see load_csv.
+        cache: Optional FrameCache, see load_csv. Each file is cached separately.
+        workers: Number of worker processes. Defaults to one per CPU, at most
+            one per file. With 1, the files are parsed in this process.
+        reducer: Optional picklable function applied to each file's frame in
+            the worker, e.g. to aggregate a shard before it is sent back.
+        dtype: Optional read_csv dtypes of some columns, see iter_csv_chunks.
+        categories: Optional columns to parse as categoricals, see load_csv.
+        dates: Optional formats of date columns, see load_csv.
+        parser: Parser backend, see load_csv. With "auto" each file gets its own pick.
+
+    Returns:
+        The (reduced) frames of all files concatenated in the order of file_paths.
+
+    Raises:
+        The exceptions of load_csv for the first file that fails to load.
+        ValueError: If file_paths is empty.
+    """
+    frames = _map_files(_load_shard, [(path, columns, chunksize, cache, reducer, dtype, categories, dates, parser)
+                                      for path in file_paths], workers)
+    return concat_frames(frames)
+
+
+def _map_files(fn: Callable, calls: List[tuple], workers: Optional[int]) -> List[Any]:
+    """
+    Calls fn(*call) for each call, one per input file, in worker processes if there are several.
+
+    Args:
+        fn: A picklable function.
+        calls: The arguments of each call, one tuple per file.
+        workers: Number of worker processes, see load_csvs.
+
+    Returns:
+        The results in the order of calls.
+
+    Raises:
+        The first exception raised by fn, in the order of calls.
+        ValueError: If calls is empty.
+    """
+    if not calls:
+        error_msg = "Error: No input files were given."
+        print(error_msg)
+        raise ValueError(error_msg)
+    workers = min(workers or os.cpu_count() or 1, len(calls))
+    if workers == 1:
+        return [fn(*call) for call in calls]
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = [executor.submit(fn, *call) for call in calls]
+        return [future.result() for future in futures]
+
+
+def available_parsers() -> List[str]:
+    """Returns the parser backends usable here: "c", "numpy", and "pyarrow" if the pyarrow package is installed."""
+    return [parser for parser in PARSERS[1:] if parser != "pyarrow" or importlib.util.find_spec("pyarrow") is not None]
+
+
+def candidate_parsers(schema: Dict[str, str], columns: Optional[List[str]] = None,
+                      dtype: Optional[Dict[str, Any]] = None) -> List[str]:
+    """
+    Returns the available parser backends able to read the columns of a probed file.
+
+    numpy.loadtxt only parses plain numbers, so it is a candidate when the
+    sample of every read column holds integers or floats and no dtype is
+    forced on them. Missing values past the sample still make it fail.
+
+    Args:
+        schema: The result of schema.probe_schema for the file.
+        columns: Optional columns to read. All columns are read if None.
+        dtype: Optional read_csv dtypes of some columns.
+
+    Returns:
+        The candidates, the C engine first.
+    """
+    names = list(schema) if columns is None else columns
+    numeric = bool(names) and all(schema.get(column) in ("integer", "float") for column in names)
+    return [parser for parser in available_parsers()
+            if parser != "numpy" or (numeric and not set(dtype or {}) & set(names))]
+
+
+def choose_parser(file_path: str, columns: Optional[List[str]] = None, dtype: Optional[Dict[str, Any]] = None,
+                  schema: Optional[Dict[str, str]] = None) -> str:
+    """
+    Picks the fastest parser backend for a CSV file.
+
+    Files smaller than AUTO_PARSER_MIN_BYTES get the C engine. For larger
+    ones, each of the candidate_parsers is timed on the first
+    PARSER_PROBE_CHARS characters of the file, which measures what the
+    column kinds alone cannot tell: the width of the rows, the share of
+    integer columns, and how many cores pyarrow's threads get here.
+
+    Args:
+        file_path: The path to the (possibly compressed) CSV file.
+        columns: Optional columns to read. All columns are read if None.
+        dtype: Optional read_csv dtypes of some columns.
+        schema: Optional result of schema.probe_schema for the file, probed if None.
+
+    Returns:
+        "c", "pyarrow" or "numpy".
+
+    Raises:
+        FileNotFoundError: If the CSV file is not found at the specified path.
+        ValueError: If the file cannot be decompressed.
+    """
+    if os.path.getsize(file_path) < AUTO_PARSER_MIN_BYTES:
+        return "c"
+    schema = schema or probe_schema(file_path)
+    parsers = candidate_parsers(schema, columns, dtype)
+    if len(parsers) == 1:
+        return parsers[0]
+    with open_text(file_path) as f:
+        head = f.read(PARSER_PROBE_CHARS)
+    head = head[:head.rfind("\n") + 1]
+    seconds = {}
+    for parser in parsers:
+        try:
+            # The best of two runs, so pyarrow's first call does not pay for its import.
+            for _ in range(2):
+                start = time.perf_counter()
+                _parse_csv(io.StringIO(head), columns, dtype, parser, schema)
+                seconds[parser] = min(seconds.get(parser, np.inf), time.perf_counter() - start)
+        except Exception:
+            # E.g. missing values in the head, which numpy cannot parse.
+            seconds.pop(parser, None)
+    return min(seconds, key=seconds.get, default="c")
+
+
+def _read_csv(file_path: str, columns: Optional[List[str]], dtype: Optional[Dict[str, Any]], parser: str,
+              schema: Optional[Dict[str, str]], fallback: bool = False) -> pd.DataFrame:
+    """Parses a whole CSV file with the "c", "pyarrow" or "numpy" backend, falling back to "c" if asked."""
+    compression = detect_compression(file_path)
+    if parser != "c":
+        try:
+            return _parse_csv(file_path, columns, dtype, parser, schema, compression)
+        except ValueError:
+            if not fallback:
+                raise
+            # Values past the probed head that the chosen backend cannot parse.
+    return pd.read_csv(file_path, usecols=columns, dtype=dtype, compression=compression)
+
+
+def _parse_csv(source: Any, columns: Optional[List[str]], dtype: Optional[Dict[str, Any]], parser: str,
+               schema: Dict[str, str], compression: Optional[str] = None) -> pd.DataFrame:
+    """Parses a CSV file or text buffer with the "c", "pyarrow" or "numpy" backend, columns in file order."""
+    missing = [column for column in columns or [] if column not in schema]
+    if missing:
+        raise ValueError(f"Usecols do not match columns, columns expected but not found: {missing}")
+    names = [column for column in schema if columns is None or column in columns]
+    if parser == "numpy":
+        return _parse_numbers(source, names, schema, compression)
+    if parser == "pyarrow" and isinstance(source, io.StringIO):
+        # pyarrow reads bytes.
+        source = io.BytesIO(source.getvalue().encode())
+    df = pd.read_csv(source, usecols=columns, dtype=dtype, compression=compression, engine=parser)
+    # Unlike the C engine, pyarrow returns the columns in the order of usecols.
+    return df if list(df.columns) == names else df[names]
+
+
+def _parse_numbers(source: Any, names: List[str], schema: Dict[str, str],
+                   compression: Optional[str]) -> pd.DataFrame:
+    """Parses columns of plain numbers with numpy.loadtxt, integers as int64 and the rest as float64."""
+    text = [name for name in names if schema[name] not in ("integer", "float")]
+    if text:
+        raise ValueError(f"The numpy parser only reads columns of numbers, but {text} are not.")
+    positions = [list(schema).index(name) for name in names]
+    fields = [(name, np.int64 if schema[name] == "integer" else np.float64) for name in names]
+    with warnings.catch_warnings():
+        # A file without data rows becomes an empty frame, as with pandas.
+        warnings.simplefilter("ignore", UserWarning)
+        if compression is not None:
+            with open_text(source) as f:
+                data = np.loadtxt(f, delimiter=",", skiprows=1, usecols=positions, dtype=fields, quotechar='"',
+                                  ndmin=1)
+        else:
+            # A path is read faster than a Python file object.
+            data = np.loadtxt(source, delimiter=",", skiprows=1, usecols=positions, dtype=fields, quotechar='"',
+                              encoding="utf-8-sig", ndmin=1)
+    return pd.DataFrame({name: data[name] for name in names})
+
+
+def aggregate_csvs(file_paths: List[str], x_column: str, y_column: str, chunksize: int = DEFAULT_CHUNKSIZE,
+                   workers: Optional[int] = None, sketch: bool = False, dtype: Optional[Dict[str, Any]] = None,
+                   categories: Optional[List[str]] = None) -> StreamingAggregator:
+    """
+    Aggregates y_column per x_column category over CSV files of any size.
+
+    Each file is streamed in chunks that are folded into a
+    StreamingAggregator and dropped, so memory stays bounded by chunksize and
+    the number of categories rather than by the size of the files. Several
+    files are aggregated in parallel worker processes and merged.
+
+    Args:
+        file_paths: The paths to the (possibly compressed) CSV files.
+        x_column: Name of the category column.
+        y_column: Name of the value column.
+        chunksize: Number of rows per chunk. Defaults to DEFAULT_CHUNKSIZE.
+        workers: Number of worker processes, see load_csvs.
+        sketch: If True, quantile sketches are kept, see StreamingAggregator.
+        dtype: Optional read_csv dtypes of some columns, see iter_csv_chunks.
+        categories: Optional columns to parse as categoricals, see load_csv.
+
+    Returns:
+        The StreamingAggregator of all rows of all files.
+
+    Raises:
+        The exceptions of iter_csv_chunks for the first file that fails to load.
+        ValueError: If file_paths is empty.
+    """
+    if categories:
+        dtype = {**(dtype or {}), **{column: "category" for column in categories}}
+    aggregators = _map_files(_aggregate_shard, [(path, x_column, y_column, chunksize, sketch, dtype)
+                                                for path in file_paths], workers)
+    for aggregator in aggregators[1:]:
+        aggregators[0].merge(aggregator)
+    return aggregators[0]
+
+
+def _aggregate_shard(file_path: str, x_column: str, y_column: str, chunksize: int, sketch: bool,
+                     dtype: Optional[Dict[str, Any]]) -> StreamingAggregator:
+    aggregator = StreamingAggregator(x_column, y_column, sketch=sketch)
+    columns = list(dict.fromkeys([x_column, y_column]))
+    for chunk in iter_csv_chunks(file_path, columns=columns, chunksize=chunksize, dtype=dtype):
+        aggregator.update(chunk)
+    return aggregator
+
+
+def sample_csvs(file_paths: List[str], n: int, columns: Optional[List[str]] = None, seed: int = 0,
+                stratify_by: Optional[str] = None, chunksize: int = DEFAULT_CHUNKSIZE, workers: Optional[int] = None,
+                dtype: Optional[Dict[str, Any]] = None) -> ReservoirSampler:
+    """
+    Draws a seeded random sample of at most n rows from CSV files of any size.
+
+    Each file is streamed in chunks that are folded into a ReservoirSampler
+    and dropped, so memory stays bounded by n and chunksize rather than by
+    the size of the files. Several files are sampled in parallel worker
+    processes, each with its own seed derived from seed, and the samples
+    are merged.
+
+    Args:
+        file_paths: The paths to the (possibly compressed) CSV files.
+        n: The largest number of rows to sample.
+        columns: Optional list of column names to read. All columns are read if None.
+        seed: The random seed. The same seed and files give the same sample.
+        stratify_by: Optional column whose distinct values are sampled
+            separately, see ReservoirSampler. It must be among columns.
+        chunksize: Number of rows per chunk. Defaults to DEFAULT_CHUNKSIZE.
+        workers: Number of worker processes, see load_csvs.
+        dtype: Optional read_csv dtypes of some columns, see iter_csv_chunks.
+
+    Returns:
+        The ReservoirSampler of all rows of all files; result() returns the
+        sample in file order.
+
+    Raises:
+        The exceptions of iter_csv_chunks for the first file that fails to load.
+        ValueError: If file_paths is empty, n is not positive, or
+            stratify_by is not among columns.
+    """
+    if n <= 0:
+        error_msg = f"Error: The sample size must be a positive integer, got {n}."
+        print(error_msg)
+        raise ValueError(error_msg)
+    if stratify_by is not None and columns is not None and stratify_by not in columns:
+        error_msg = f"Error: The stratification column '{stratify_by}' is not among the columns read: {columns}"
+        print(error_msg)
+        raise ValueError(error_msg)
+    samplers = _map_files(_sample_shard, [(path, n, columns, (seed, i), stratify_by, chunksize, dtype)
+                                          for i, path in enumerate(file_paths)], workers)
+    for sampler in samplers[1:]:
+        samplers[0].merge(sampler)
+    return samplers[0]
+
+
+def _sample_shard(file_path: str, n: int, columns: Optional[List[str]], seed: tuple, stratify_by: Optional[str],
+                  chunksize: int, dtype: Optional[Dict[str, Any]]) -> ReservoirSampler:
+    sampler = ReservoirSampler(n, seed=seed, stratify_by=stratify_by)
+    for chunk in iter_csv_chunks(file_path, columns=columns, chunksize=chunksize, dtype=dtype):
+        sampler.update(chunk)
+    return sampler
+
+
+def _load_shard(file_path: str, columns: Optional[List[str]], chunksize: Optional[int],
+                cache: Optional[FrameCache], reducer: Optional[Callable],
+                dtype: Optional[Dict[str, Any]] = None, categories: Optional[List[str]] = None,
+                dates: Optional[Dict[str, str]] = None, parser: str = "c") -> pd.DataFrame:
+    df = load_csv(file_path, columns=columns, chunksize=chunksize, cache=cache, dtype=dtype, categories=categories,
+                  dates=dates, parser=parser)
+    return df if reducer is None else reducer(df)
+
+
+def parse_dates(df: pd.DataFrame, dates: Dict[str, str], file_path: Optional[str] = None) -> pd.DataFrame:
+    """
+    Converts text columns of timestamps into datetime64 columns.
+
+    A fixed format lets pandas parse every value with one vectorized pass,
+    instead of guessing the format of each value or leaving the column as
+    strings that plots treat as categorical ticks.
+
+    Args:
+        df: The parsed frame. Columns not in dates are left untouched.
+        dates: Mapping from column name to a strptime format such as
+            "%Y-%m-%d %H:%M:%S", or "ISO8601" for any ISO 8601 timestamps.
+        file_path: Optional source of df, used in error messages.
+
+    Returns:
+        The frame with the date columns converted. Missing values become NaT.
+
+    Raises:
+        ValueError: If a value does not match the format of its column.
+    """
+    df = df.copy(deep=False)
+    for column, fmt in dates.items():
+        if column not in df.columns:
+            continue
+        try:
+            df[column] = pd.to_datetime(df[column], format=fmt)
+        except (ValueError, TypeError) as e:
+            source = f" of '{file_path}'" if file_path else ""
+            error_msg = f"Error: Could not parse column '{column}'{source} as dates with format '{fmt}': {e}"
+            print(error_msg)
+            raise ValueError(error_msg)
+    return df
+
+
+def concat_frames(frames: List[pd.DataFrame]) -> pd.DataFrame:
+    """
+    Concatenates frames with the same columns, such as the chunks or shards of a file.
+
+    Categorical columns stay categorical: their categories are merged first,
+    where pandas would fall back to an object column whenever the chunks saw
+    different categories.
+    """
+    if len(frames) == 1:
+        return frames[0]
+    categorical = [name for name, dtype in frames[0].dtypes.items() if isinstance(dtype, pd.CategoricalDtype)]
+    if categorical:
+        frames = [frame.copy(deep=False) for frame in frames]
+        for name in categorical:
+            merged = pd.api.types.union_categoricals([frame[name] for frame in frames], sort_categories=True)
+            for frame in frames:
+                frame[name] = frame[name].cat.set_categories(merged.categories)
+    return pd.concat(frames, ignore_index=True)
+
+
+def _concat_chunks(chunks: List[pd.DataFrame]) -> pd.DataFrame:
+    """Concatenates chunks one column at a time, dropping each column from the chunks once it is copied."""
+    if len(chunks) == 1:
+        return chunks[0]
+    columns = {}
+    for name in list(chunks[0].columns):
+        columns[name] = concat_frames([chunk[[name]] for chunk in chunks])[name]
+        for chunk in chunks:
+            del chunk[name]
+    return pd.DataFrame(columns, copy=False)
+
+
+def optimize_dtypes(df: pd.DataFrame, max_category_ratio: float = DEFAULT_CATEGORY_RATIO,
+                    categories: Optional[List[str]] = None) -> pd.DataFrame:
+    """
+    Stores the columns of a frame in the narrowest dtypes that hold their values exactly.
+
+    Integer columns are downcast to the smallest integer type covering their
+    range, float columns to float32 if every value survives the round trip,
+    and text columns with few distinct values become categoricals.
+
+    Args:
+        df: The frame to optimize. It is not modified.
+        max_category_ratio: Largest ratio of distinct to non-missing values
+            for a text column to become categorical.
+        categories: Optional columns allowed to become categorical. All text
+            columns are allowed if None.
+
+    Returns:
+        A frame with the same values and smaller dtypes.
+    """
+    columns = {}
+    for name, series in df.items():
+        dtype = series.dtype
+        if isinstance(dtype, pd.CategoricalDtype):
+            pass
+        elif isinstance(dtype, np.dtype) and dtype.kind in "iu":
+            series = series.astype(_narrowest_integer(series.to_numpy()))
+        elif isinstance(dtype, np.dtype) and dtype.kind == "f" and dtype.itemsize > 4:
+            values = series.to_numpy()
+            narrow = values.astype(np.float32)
+            # NaN never equals itself, so it is accepted separately.
+            if np.all((narrow == values) | np.isnan(values)):
+                series = pd.Series(narrow, index=series.index, name=name, copy=False)
+        elif pd.api.types.is_string_dtype(dtype) and (categories is None or name in categories):
+            values = series.dropna()
+            if (len(values) and pd.api.types.infer_dtype(values, skipna=False) == "string"
+                    and values.nunique() <= max_category_ratio * len(values)):
+                series = series.astype("category")
+        columns[name] = series
+    return pd.DataFrame(columns, index=df.index, copy=False)
+
+
+def _narrowest_integer(values: np.ndarray) -> np.dtype:
+    if not len(values):
+        return values.dtype
+    low, high = values.min(), values.max()
+    candidates = (np.int8, np.int16, np.int32) if values.dtype.kind == "i" else (np.uint8, np.uint16, np.uint32)
+    for candidate in candidates:
+        info = np.iinfo(candidate)
+        if np.dtype(candidate).itemsize < values.dtype.itemsize and info.min <= low and high <= info.max:
+            return np.dtype(candidate)
+    return values.dtype
+
+
+def memory_usage(df) -> int:
+    """Returns the bytes held by the columns of df, including the strings they reference."""
+    return int(df.memory_usage(index=False, deep=True).sum())
+
+
+def default_memory_usage(df) -> int:
+    """
+    Estimates the bytes the columns of df would take with pandas' default dtypes.
+
+    Numbers count as 8 bytes (booleans as 1) and every row of a categorical
+    column as one reference to its own string object, which is how a default
+    parse stores them.
+    """
+    total = 0
+    for _, series in df.items():
+        if isinstance(series.dtype, pd.CategoricalDtype):
+            counts = series.value_counts(sort=False)
+            string_bytes = sum(sys.getsizeof(value) * int(count) for value, count in counts.items())
+            total += string_bytes + 8 * len(series)
+        elif isinstance(series.dtype, np.dtype) and series.dtype.kind in "iuf":
+            total += 8 * len(series)
+        else:
+            total += int(series.memory_usage(index=False, deep=True))
+    return total
+
+
+def _report_load_error(file_path: str, columns: Optional[List[str]], error: Exception) -> None:
+    """Prints a user-facing message describing why loading file_path failed."""
+    if isinstance(error, FileNotFoundError):
         print(f"Error: The file '{file_path}' was not found.")
-        raise
-    except pd.errors.EmptyDataError:
+    elif isinstance(error, pd.errors.EmptyDataError):
         print(f"Error: The file '{file_path}' is empty.")
-        raise
-    except pd.errors.ParserError:
+    elif isinstance(error, pd.errors.ParserError):
         print(f"Error: An error occurred while parsing the file '{file_path}'.")
-        raise
-    except Exception as e:
-        print(f"An unexpected error occurred: {e}")
-        raise
+    elif isinstance(error, ValueError) and columns is not None:
+        print(f"Error: Could not read columns {columns} from '{file_path}': {error}")
+    else:
+        print(f"An unexpected error occurred: {error}")
+
+
+class MappedColumns:
+    """
+    A read-only, DataFrame-like view over memory-mapped numeric columns.
+
+    It supports the subset of the DataFrame interface the plotters use
+    (`columns`, `df[name]`, `len(df)`), so it can be passed to them directly.
+    Column values are numpy.memmap arrays backed by the page cache, which lets
+    several processes plot the same dataset without a private copy each.
+    """
+
+    def __init__(self, arrays: Dict[str, np.ndarray]):
+        self._arrays = arrays
+        self.columns = pd.Index(list(arrays))
+
+    def __getitem__(self, column: str) -> np.ndarray:
+        return self._arrays[column]
+
+    def __len__(self) -> int:
+        return len(next(iter(self._arrays.values()))) if self._arrays else 0
+
+
+def open_mmap_columns(file_path: str, columns: List[str], cache: FrameCache,
+                      chunksize: Optional[int] = None, parser: str = "c",
+                      schema: Optional[Dict[str, str]] = None) -> MappedColumns:
+    """
+    Opens numeric CSV columns as memory-mapped arrays.
+
+    The first call for a file converts the projected columns into the cache's
+    binary layout; later calls, from any process sharing the cache directory,
+    only map the existing .npy files.
+
+    Args:
+        file_path: The path to the CSV file.
+        columns: Names of the numeric columns to map.
+        cache: The FrameCache that holds the converted columns.
+        chunksize: Optional chunk size for the one-time conversion parse.
+        parser: Parser backend of the conversion parse, see load_csv.
+        schema: Optional probed schema of the file, see load_csv.
+
+    Returns:
+        A MappedColumns view over the requested columns.
+
+    Raises:
+        FileNotFoundError: If the CSV file is not found at the specified path.
+        pd.errors.EmptyDataError: If the CSV file is empty.
+        pd.errors.ParserError: If an error occurs while parsing the CSV file.
+        ValueError: If a requested column is missing or is not numeric.
+    """
+    data = cache.get_columns(file_path, columns, mmap_mode="r") if os.path.exists(file_path) else None
+    if data is None:
+        load_csv(file_path, columns=columns, chunksize=chunksize, cache=cache, parser=parser, schema=schema)
+        data = cache.get_columns(file_path, columns, mmap_mode="r")
+    non_numeric = [name for name, values in (data or {}).items()
+                   if not isinstance(values, np.ndarray) or values.dtype.kind not in "biuf"]
+    if data is None or non_numeric:
+        error_msg = f"Error: Only numeric columns can be memory-mapped, got non-numeric columns: {non_numeric}"
+        print(error_msg)
+        raise ValueError(error_msg)
+    return MappedColumns(data)
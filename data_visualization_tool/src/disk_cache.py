@@ -0,0 +1,168 @@
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+from typing import Any, Dict, List, Optional, Union
+
+# File fingerprints, LRU eviction and the render cache only use the standard
+# library, so a render cache hit does not pay for importing pandas or matplotlib.
+
+# Default upper bound on the total size of a cache directory.
+DEFAULT_MAX_BYTES = 2 * 1024 ** 3
+
+# Size and number of the blocks sampled from a file when fingerprinting it.
+_FINGERPRINT_BLOCK_SIZE = 1024 ** 2
+_FINGERPRINT_BLOCKS = 8
+
+
+def file_fingerprint(file_path: str) -> str:
+    """
+    Computes a cheap fingerprint identifying the current contents of a file.
+
+    The fingerprint combines the absolute path, size and modification time with
+    a hash of evenly spaced blocks of the file (always including the first and
+    last block), so it costs a few megabytes of I/O regardless of file size.
+
+    Args:
+        file_path: The path to the file.
+
+    Returns:
+        A hex digest string.
+
+    Raises:
+        FileNotFoundError: If the file does not exist.
+    """
+    stat = os.stat(file_path)
+    digest = hashlib.blake2b(digest_size=20)
+    digest.update(os.path.abspath(file_path).encode())
+    digest.update(f"{stat.st_size}:{stat.st_mtime_ns}".encode())
+    with open(file_path, "rb") as f:
+        last_offset = max(stat.st_size - _FINGERPRINT_BLOCK_SIZE, 0)
+        offsets = {last_offset * i // (_FINGERPRINT_BLOCKS - 1) for i in range(_FINGERPRINT_BLOCKS)}
+        for offset in sorted(offsets):
+            f.seek(offset)
+            digest.update(f.read(_FINGERPRINT_BLOCK_SIZE))
+    return digest.hexdigest()
+
+
+def evict_lru(cache_dir: str, max_bytes: int, keep: Optional[str] = None) -> None:
+    """
+    Deletes the least recently used entries of cache_dir until it fits in max_bytes.
+
+    Every direct child of cache_dir is treated as one entry; its last use is
+    its modification time, which callers refresh with os.utime on each hit.
+
+    Args:
+        cache_dir: The cache directory.
+        max_bytes: The maximum total size of all entries.
+        keep: Optional name of an entry that must not be evicted.
+    """
+    entries = []
+    total = 0
+    for name in os.listdir(cache_dir):
+        path = os.path.join(cache_dir, name)
+        if name.startswith("."):
+            continue
+        try:
+            size = _entry_size(path)
+            entries.append((os.stat(path).st_mtime_ns, size, name, path))
+        except FileNotFoundError:
+            # Removed concurrently by another process.
+            continue
+        total += size
+    entries.sort()
+    for _, size, name, path in entries:
+        if total <= max_bytes:
+            break
+        if name == keep:
+            continue
+        if os.path.isdir(path):
+            shutil.rmtree(path, ignore_errors=True)
+        else:
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+        total -= size
+
+
+def _entry_size(path: str) -> int:
+    if not os.path.isdir(path):
+        return os.stat(path).st_size
+    return sum(os.stat(os.path.join(path, f)).st_size for f in os.listdir(path))
+
+
+class RenderCache:
+    """
+    A size-bounded on-disk cache of rendered chart images.
+
+    Entries are keyed by a fingerprint of the input file together with every
+    parameter that affects the image, so an unchanged chart can be restored
+    with a file copy instead of loading the data and rendering it again.
+    Each entry is a single image file named after its key.
+    """
+
+    def __init__(self, cache_dir: str, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        os.makedirs(cache_dir, exist_ok=True)
+
+    def key(self, file_path: Union[str, List[str]], params: Dict[str, Any]) -> str:
+        """
+        Returns the cache key for a chart of file_path rendered with params.
+
+        Args:
+            file_path: The path to the input data file, or the list of paths
+                of a sharded input.
+            params: JSON-serializable plot parameters, e.g. plot type, columns,
+                title, image format and resolution.
+        """
+        digest = hashlib.blake2b(digest_size=20)
+        for path in [file_path] if isinstance(file_path, str) else file_path:
+            digest.update(file_fingerprint(path).encode())
+        digest.update(json.dumps(params, sort_keys=True).encode())
+        return digest.hexdigest()
+
+    def get(self, key: str, output_path: str) -> bool:
+        """
+        Copies the cached image for key to output_path.
+
+        Returns:
+            True on a cache hit, False if there is no entry for key.
+
+        Raises:
+            OSError: If the entry exists but cannot be copied to output_path,
+                e.g. because the directory of output_path does not exist.
+        """
+        entry = os.path.join(self.cache_dir, key)
+        try:
+            # A copy rather than a hard link: the plotters overwrite existing
+            # outputs in place, which would also rewrite a linked entry.
+            shutil.copyfile(entry, output_path)
+        except FileNotFoundError:
+            if not os.path.exists(entry):
+                return False
+            raise
+        os.utime(entry)
+        return True
+
+    def put(self, key: str, output_path: str) -> None:
+        """
+        Stores the rendered image at output_path as the entry for key.
+
+        Raises:
+            OSError: If the image cannot be copied into the cache directory.
+        """
+        fd, tmp_path = tempfile.mkstemp(prefix=".tmp-", dir=self.cache_dir)
+        os.close(fd)
+        try:
+            shutil.copyfile(output_path, tmp_path)
+            os.replace(tmp_path, os.path.join(self.cache_dir, key))
+        except BaseException:
+            try:
+                os.remove(tmp_path)
+            except FileNotFoundError:
+                pass
+            raise
+        evict_lru(self.cache_dir, self.max_bytes, keep=key)
@@ -0,0 +1,237 @@
+from typing import Tuple
+
+import numpy as np
+
+# Supported downsampling methods for line graphs.
+DOWNSAMPLE_METHODS = ("lttb", "minmax")
+
+# Supported aggregations when resampling a line graph to fixed-width buckets.
+RESAMPLE_METHODS = ("mean", "min", "max", "last")
+
+
+def _fail(error_msg: str):
+    print(error_msg)
+    raise ValueError(error_msg)
+
+
+def lttb_indices(x: np.ndarray, y: np.ndarray, n_out: int) -> np.ndarray:
+    """
+    Selects points with the Largest-Triangle-Three-Buckets algorithm.
+
+    The first and last points are always kept. The remaining points are split
+    into n_out - 2 equally sized buckets and, from each bucket, the point that
+    forms the largest triangle with the previously selected point and the mean
+    of the next bucket is kept. Each bucket is evaluated with vectorized NumPy
+    operations, so the cost is one pass over the data plus n_out small steps.
+
+    Args:
+        x: The x values, in plotting order.
+        y: The y values, the same length as x.
+        n_out: The number of points to select.
+
+    Returns:
+        Sorted integer indices of the selected points. Points with a NaN x or y
+        are never selected. All finite points are selected if there are at most
+        n_out of them.
+
+    Raises:
+        ValueError: If n_out is less than 3 and there are more than n_out points.
+    """
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    valid = np.flatnonzero(np.isfinite(x) & np.isfinite(y))
+    if len(valid) <= n_out:
+        return valid
+    if n_out < 3:
+        _fail(f"Error: LTTB needs n_out >= 3, got {n_out}.")
+    xs = x[valid]
+    ys = y[valid]
+
+    # Bucket i spans [edges[i], edges[i + 1]) over the interior points 1..n-2.
+    edges = np.linspace(1, len(xs) - 1, n_out - 1).astype(np.int64)
+    counts = np.diff(edges)
+    x_means = np.add.reduceat(xs, edges[:-1]) / counts
+    y_means = np.add.reduceat(ys, edges[:-1]) / counts
+    # The "next bucket" of the last bucket is the last point.
+    x_means = np.append(x_means[1:], xs[-1])
+    y_means = np.append(y_means[1:], ys[-1])
+
+    selected = np.empty(n_out, dtype=np.int64)
+    selected[0] = 0
+    selected[-1] = len(xs) - 1
+    a = 0
+    for i in range(n_out - 2):
+        start, end = edges[i], edges[i + 1]
+        bx = xs[start:end]
+        by = ys[start:end]
+        areas = np.abs((xs[a] - x_means[i]) * (by - ys[a]) - (xs[a] - bx) * (y_means[i] - ys[a]))
+        a = start + int(np.argmax(areas))
+        selected[i + 1] = a
+    return valid[selected]
+
+
+def minmax_indices(y: np.ndarray, n_buckets: int) -> np.ndarray:
+    """
+    Selects the minimum and maximum point of each of n_buckets equal-sized buckets.
+
+    Buckets hold equal numbers of consecutive points, not equal ranges of x,
+    so they match pixel columns only for evenly spaced x values.
+
+    Keeping both extremes of every bucket preserves peaks and troughs exactly,
+    which makes this the right choice for spiky signals. The selection is fully
+    vectorized (no Python loop over buckets).
+
+    Args:
+        y: The y values, in plotting order.
+        n_buckets: The number of buckets, typically the output width in pixels.
+
+    Returns:
+        Sorted integer indices of the selected points (at most 2 * n_buckets + 2,
+        including the first and last points). NaN values are never selected.
+
+    Raises:
+        ValueError: If n_buckets is not positive.
+    """
+    if n_buckets < 1:
+        _fail(f"Error: Min/max downsampling needs n_buckets >= 1, got {n_buckets}.")
+    y = np.asarray(y, dtype=np.float64)
+    n = len(y)
+    if n <= 2 * n_buckets:
+        return np.flatnonzero(~np.isnan(y))
+    starts = np.unique(np.linspace(0, n, n_buckets + 1).astype(np.int64)[:-1])
+    bucket_ids = np.repeat(np.arange(len(starts)), np.diff(np.append(starts, n)))
+    endpoints = np.array([0, n - 1])
+    picked = [endpoints[~np.isnan(y[endpoints])]]
+    for reduce in (np.fmin, np.fmax):
+        extremes = reduce.reduceat(y, starts)
+        candidates = np.flatnonzero(y == extremes[bucket_ids])
+        _, first = np.unique(bucket_ids[candidates], return_index=True)
+        picked.append(candidates[first])
+    return np.unique(np.concatenate(picked))
+
+
+def downsample_indices(x: np.ndarray, y: np.ndarray, n_out: int, method: str = "lttb") -> np.ndarray:
+    """
+    Selects at most about n_out representative points of a series.
+
+    Args:
+        x: The x values. Non-numeric values (e.g. strings) are replaced by their
+            positions, so only numeric and datetime x values affect the geometry.
+        y: The numeric y values.
+        n_out: The target number of points, typically the output width in pixels.
+        method: "lttb" or "minmax".
+
+    Returns:
+        Sorted integer indices of the selected points.
+
+    Raises:
+        ValueError: If method is not one of DOWNSAMPLE_METHODS, or n_out is
+            too small for it (see lttb_indices and minmax_indices).
+    """
+    if method not in DOWNSAMPLE_METHODS:
+        _fail(f"Error: Unknown downsampling method '{method}'. Choose from {list(DOWNSAMPLE_METHODS)}.")
+    if method == "minmax":
+        return minmax_indices(y, n_out)
+    return lttb_indices(_as_float_positions(x), y, n_out)
+
+
+def resample_series(x: np.ndarray, y: np.ndarray, n_buckets: int,
+                    method: str = "mean") -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Aggregates one or several series into at most n_buckets buckets of equal width along x.
+
+    Unlike downsample_indices, which keeps selected points, resampling
+    replaces the points of each bucket by one aggregated value, like a
+    time-series resample to a fixed frequency. With n_buckets set to the
+    output width in pixels, each bucket is one pixel column wide. Points are
+    sorted by x first if needed, and all series sharing x are aggregated in
+    one vectorized pass.
+
+    Args:
+        x: The numeric or datetime64 x values.
+        y: The numeric y values, either one series of the same length as x or
+            a 2D array with one column per series.
+        n_buckets: The number of buckets, typically the output width in pixels.
+        method: "mean", "min", "max" or "last" (the value of the largest x).
+            Missing y values are skipped.
+
+    Returns:
+        The bucket start positions, in the dtype of x, and the aggregated y
+        values, shaped like y. Buckets without values hold NaN, so gaps in
+        the data show as gaps in the line. Points with a missing x (or with
+        no y value) are dropped, and the remaining points are returned sorted
+        but otherwise unchanged if there are at most n_buckets of them.
+
+    Raises:
+        ValueError: If method is not one of RESAMPLE_METHODS, n_buckets is not
+            positive, x is neither numeric nor datetime, or y does not match x.
+    """
+    if method not in RESAMPLE_METHODS:
+        _fail(f"Error: Unknown resampling method '{method}'. Choose from {list(RESAMPLE_METHODS)}.")
+    if n_buckets < 1:
+        _fail(f"Error: Resampling needs n_buckets >= 1, got {n_buckets}.")
+    x = np.asarray(x)
+    y = np.asarray(y, dtype=np.float64)
+    if y.ndim not in (1, 2) or len(y) != len(x):
+        _fail(f"Error: y must hold one row per x value, got shape {y.shape} for {len(x)} x values.")
+    if x.dtype.kind == "M":
+        positions = x.view(np.int64)
+        valid = ~np.isnat(x)
+    elif x.dtype.kind in "biuf":
+        positions = x.astype(np.float64)
+        valid = np.isfinite(positions)
+    else:
+        _fail(f"Error: Resampling needs numeric or datetime x values, got dtype {x.dtype}.")
+    missing = np.isnan(y)
+    valid &= ~(missing if y.ndim == 1 else missing.all(axis=1))
+    if not valid.all():
+        x, y, positions, missing = x[valid], y[valid], positions[valid], missing[valid]
+    if len(positions) > 1 and not np.all(positions[1:] >= positions[:-1]):
+        order = np.argsort(positions, kind="stable")
+        x, y, positions, missing = x[order], y[order], positions[order], missing[order]
+    if len(positions) <= n_buckets:
+        return x, y
+
+    low = positions[0]
+    if x.dtype.kind == "M":
+        # Integer nanosecond (or other unit) widths keep bucket edges exact.
+        width = max(1, -(-(int(positions[-1]) - int(low) + 1) // n_buckets))
+        bucket_ids = (positions - low) // width
+    else:
+        width = (positions[-1] - low) / n_buckets or 1.0
+        bucket_ids = np.minimum(((positions - low) / width).astype(np.int64), n_buckets - 1)
+    starts = np.flatnonzero(np.diff(bucket_ids, prepend=-1))
+    if method == "mean":
+        counts = np.add.reduceat(~missing, starts, axis=0, dtype=np.int64)
+        sums = np.add.reduceat(np.where(missing, 0.0, y), starts, axis=0)
+        with np.errstate(invalid="ignore"):
+            values = sums / counts
+    elif method == "min":
+        values = np.fmin.reduceat(y, starts, axis=0)
+    elif method == "max":
+        values = np.fmax.reduceat(y, starts, axis=0)
+    else:
+        # The last row of each bucket holding a value, or -1 if there is none.
+        rows = np.arange(len(y)).reshape((-1,) + (1,) * (y.ndim - 1))
+        last = np.maximum.reduceat(np.where(missing, -1, rows), starts, axis=0)
+        values = np.where(last >= 0, np.take_along_axis(y, np.maximum(last, 0), axis=0), np.nan)
+
+    n_out = int(bucket_ids[-1]) + 1
+    y_out = np.full((n_out,) + y.shape[1:], np.nan)
+    y_out[bucket_ids[starts]] = values
+    if x.dtype.kind == "M":
+        x_out = (low + np.arange(n_out, dtype=np.int64) * width).view(x.dtype)
+    else:
+        x_out = low + np.arange(n_out) * width
+    return x_out, y_out
+
+
+def _as_float_positions(x) -> np.ndarray:
+    values = np.asarray(x)
+    if values.dtype.kind in "biuf":
+        return values.astype(np.float64)
+    if values.dtype.kind in "mM":
+        positions = values.astype(np.int64).astype(np.float64)
+        positions[np.isnat(values)] = np.nan
+        return positions
+    return np.arange(len(values), dtype=np.float64)
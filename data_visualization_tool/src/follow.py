@@ -0,0 +1,216 @@
+import argparse
+import io
+import os
+import time
+from typing import Callable, Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+try:
+    from .data_loader import DEFAULT_CHUNKSIZE, detect_compression, parse_dates, read_csv_header
+    from .main import date_columns, render_plot, required_columns
+except ImportError:
+    from data_loader import DEFAULT_CHUNKSIZE, detect_compression, parse_dates, read_csv_header
+    from main import date_columns, render_plot, required_columns
+
+# Default number of seconds between two refreshes in follow mode.
+DEFAULT_INTERVAL = 60.0
+
+# Smallest capacity allocated for a column buffer.
+_MIN_CAPACITY = 1024
+
+# Bytes read from the file at a time by CsvFollower.poll, so the first poll of
+# a large file does not hold all of its text in memory at once.
+_READ_BLOCK_BYTES = 16 * 1024 ** 2
+
+
+class _ColumnBuffer:
+    """A column of values that grows in place with amortized O(1) appends."""
+
+    def __init__(self):
+        self._values: Optional[np.ndarray] = None
+        self._size = 0
+
+    def append(self, values: np.ndarray) -> None:
+        if self._values is None:
+            self._values = np.empty(max(len(values), _MIN_CAPACITY), dtype=values.dtype)
+        dtype = self._promote(self._values.dtype, values.dtype)
+        needed = self._size + len(values)
+        if dtype != self._values.dtype or needed > len(self._values):
+            # Doubling the capacity keeps the total copying linear in the number of rows.
+            grown = np.empty(max(needed, 2 * len(self._values)), dtype=dtype)
+            grown[:self._size] = self._values[:self._size]
+            self._values = grown
+        self._values[self._size:needed] = values
+        self._size = needed
+
+    def view(self) -> np.ndarray:
+        """Returns the filled part of the buffer without copying it."""
+        if self._values is None:
+            return np.empty(0)
+        return self._values[:self._size]
+
+    @staticmethod
+    def _promote(current: np.dtype, new: np.dtype) -> np.dtype:
+        # e.g. an int column that later receives a NaN or a decimal becomes float;
+        # anything that does not promote numerically (like strings) becomes object.
+        if current.kind in "biuf" and new.kind in "biuf":
+            return np.result_type(current, new)
+        return current if current == new else np.dtype(object)
+
+
+class CsvFollower:
+    """
+    Follows a CSV file that is being appended to, parsing only the new rows.
+
+    The follower remembers the byte offset up to which the file has been
+    parsed. Each poll() reads from that offset to the last complete line, so
+    the cost of a refresh is proportional to the appended data rather than to
+    the size of the file. The data is read and parsed in blocks of whole lines,
+    so only one block of text is held in memory at a time. A trailing line
+    without its newline is left for the next poll. The parsed columns are kept
+    in growing in-memory buffers.
+
+    If the file shrinks or is replaced (e.g. by log rotation), it is read again
+    from the start.
+
+    Quoted fields spanning several lines are not supported, since every newline
+    is treated as the end of a row.
+    """
+
+    def __init__(self, file_path: str, columns: Optional[List[str]] = None,
+                 chunksize: int = DEFAULT_CHUNKSIZE, dates: Optional[Dict[str, str]] = None):
+        """
+        Args:
+            file_path: The path to the CSV file.
+            columns: Optional list of column names to keep. All columns are kept if None.
+            chunksize: Number of rows parsed at a time from newly appended data.
+            dates: Optional mapping from column name to the format of its
+                timestamps, see data_loader.parse_dates.
+
+        Raises:
+            FileNotFoundError: If the CSV file is not found at the specified path.
+            pd.errors.EmptyDataError: If the CSV file has no header row yet.
+            ValueError: If any of the requested columns is not in the file, or
+                the file is compressed.
+        """
+        if chunksize <= 0:
+            raise ValueError(f"chunksize must be a positive integer, got {chunksize}.")
+        self.file_path = file_path
+        self.columns = columns
+        self.chunksize = chunksize
+        self.dates = dates or {}
+        self._reset()
+
+    def _reset(self) -> None:
+        if os.path.exists(self.file_path) and detect_compression(self.file_path) is not None:
+            # Byte offsets into a compressed stream cannot be resumed from.
+            error_msg = f"Error: Cannot follow the compressed file '{self.file_path}'."
+            print(error_msg)
+            raise ValueError(error_msg)
+        header = read_csv_header(self.file_path)
+        missing = [c for c in self.columns or [] if c not in header]
+        if missing:
+            error_msg = f"Error: Could not read columns {self.columns} from '{self.file_path}': missing {missing}"
+            print(error_msg)
+            raise ValueError(error_msg)
+        with open(self.file_path, "rb") as f:
+            self.offset = len(f.readline())
+            self._inode = os.fstat(f.fileno()).st_ino
+        self.header = header
+        self.rows = 0
+        self._buffers: Dict[str, _ColumnBuffer] = {name: _ColumnBuffer() for name in self.columns or header}
+
+    def poll(self) -> int:
+        """
+        Parses the rows appended since the last poll.
+
+        Returns:
+            The number of new rows. If the file was truncated or replaced, all
+            of its rows count as new.
+
+        Raises:
+            FileNotFoundError: If the file has been removed.
+            pd.errors.ParserError: If the new rows cannot be parsed.
+            ValueError: If a new timestamp does not match its date format.
+        """
+        stat = os.stat(self.file_path)
+        if stat.st_ino != self._inode or stat.st_size < self.offset:
+            print(f"The file '{self.file_path}' was truncated or replaced; reading it again.")
+            self._reset()
+        new_rows = 0
+        with open(self.file_path, "rb") as f:
+            f.seek(self.offset)
+            data = b""
+            while True:
+                block = f.read(_READ_BLOCK_BYTES)
+                if not block:
+                    return new_rows
+                # A line longer than a block is completed by the next ones.
+                data += block
+                end = data.rfind(b"\n") + 1
+                if end:
+                    new_rows += self._parse(data[:end])
+                    data = data[end:]
+
+    def _parse(self, data: bytes) -> int:
+        """Parses whole lines of new rows into the buffers and advances the offset past them."""
+        try:
+            with pd.read_csv(io.BytesIO(data), header=None, names=self.header, usecols=self.columns,
+                             chunksize=self.chunksize) as reader:
+                chunks = list(reader)
+        except pd.errors.EmptyDataError:
+            # Only blank lines were appended.
+            chunks = []
+        except Exception:
+            print(f"Error: An error occurred while parsing new rows of the file '{self.file_path}'.")
+            raise
+        if self.dates:
+            chunks = [parse_dates(chunk, self.dates, self.file_path) for chunk in chunks]
+        new_rows = 0
+        for chunk in chunks:
+            for name, buffer in self._buffers.items():
+                buffer.append(chunk[name].to_numpy())
+            new_rows += len(chunk)
+        # Only advanced once the block is parsed, so a failed poll can be retried from it.
+        self.offset += len(data)
+        self.rows += new_rows
+        return new_rows
+
+    def frame(self) -> pd.DataFrame:
+        """Returns the rows parsed so far as a DataFrame sharing the follower's buffers."""
+        return pd.DataFrame({name: buffer.view() for name, buffer in self._buffers.items()}, copy=False)
+
+
+def follow_plot(args: argparse.Namespace, interval: float = DEFAULT_INTERVAL,
+                max_refreshes: Optional[int] = None, sleep: Callable[[float], None] = time.sleep) -> None:
+    """
+    Re-renders a plot whenever rows are appended to its CSV file.
+
+    The file is parsed once, then polled every interval seconds; each refresh
+    parses only the new rows and re-renders the plot if there were any.
+
+    Args:
+        args: Parsed main.py arguments.
+        interval: Seconds to wait between refreshes.
+        max_refreshes: Optional number of polls after which to stop. Runs until
+            interrupted if None.
+        sleep: The function used to wait between refreshes.
+
+    Raises:
+        The exceptions raised by CsvFollower and render_plot; their error
+        messages are printed before raising.
+    """
+    follower = CsvFollower(args.file_path, required_columns(args), chunksize=args.chunksize or DEFAULT_CHUNKSIZE,
+                           dates=date_columns(args))
+    refreshes = 0
+    while True:
+        new_rows = follower.poll()
+        if new_rows:
+            output_path = render_plot(follower.frame(), args)
+            print(f"Plot saved to {output_path} ({follower.rows} rows, {new_rows} new).")
+        refreshes += 1
+        if max_refreshes is not None and refreshes >= max_refreshes:
+            return
+        sleep(interval)
@@ -1,34 +1,581 @@
 #!/usr/bin/env python3
 import argparse
+import functools
+import importlib
+import os
 import sys
-import pandas as pd # Import pandas for specific exceptions
+from typing import Any, Dict, List, Optional
 
-try:
-    from .data_loader import load_csv
-    from .plotter import generate_bar_chart, generate_line_graph, generate_scatter_plot
-except ImportError:
-    # Fallback for direct execution if modules are not found in the current package.
-    # This can happen if the script is run as "python src/main.py" from the project root.
-    from data_loader import load_csv
-    from plotter import generate_bar_chart, generate_line_graph, generate_scatter_plot
+# Bumped whenever a change to the rendering code alters the images it produces,
+# which invalidates existing render cache entries.
+RENDER_CACHE_VERSION = 2
 
+# Options that only apply to a standalone main.py run.
+MAIN_ONLY_OPTIONS = ("follow", "render_cache", "profile", "cprofile", "stream")
 
-def main():
+# DataFrame attribute marking data that load_data has already aggregated.
+AGGREGATED_ATTR = "aggregated"
+
+
+def _import_module(name: str):
+    """
+    Imports a sibling module of this package on first use.
+
+    The loader and plotting modules pull in pandas and matplotlib, which take
+    most of the start-up time, so they are only imported once a request is
+    known to be valid. --help, argument errors and missing files stay fast.
+    """
+    if __package__:
+        return importlib.import_module(f".{name}", __package__)
+    # Direct execution, e.g. "python src/main.py": the modules are top-level.
+    return importlib.import_module(name)
+
+
+def build_parser() -> argparse.ArgumentParser:
+    """Builds the command-line parser shared by main() and the batch runner."""
     parser = argparse.ArgumentParser(description="Data Visualization Tool")
-    parser.add_argument("file_path", type=str, help="Path to the CSV file.")
+    parser.add_argument("file_path", type=str,
+                        help="Path to the CSV file, a directory of CSV shards, or a (quoted) glob pattern of shards.")
     parser.add_argument("plot_type", type=str, choices=["bar", "line", "scatter"],
                         help="Type of plot to generate (bar, line, scatter).")
     parser.add_argument("x_column", type=str, help="Name of the column for the x-axis.")
     parser.add_argument("y_column", type=str, help="Name of the column for the y-axis.")
+    parser.add_argument("--extra_y", type=str, nargs="+", default=None, metavar="COLUMN",
+                        help="Line and scatter plots: further y columns drawn alongside y_column from the same load.")
+    parser.add_argument("--facet", type=str, default=None, metavar="COLUMN",
+                        help="Line and scatter plots: draw one subplot per distinct value of this column.")
+    parser.add_argument("--layout", type=str, choices=["overlay", "grid"], default="overlay",
+                        help="With --extra_y: draw the y columns in one plot (overlay, default) or one subplot each (grid).")
     parser.add_argument("--title", type=str, default=None, help="Optional title for the plot.")
     parser.add_argument("--output_path", type=str, default=None,
                         help="Optional path to save the plot image.")
+    parser.add_argument("--chunksize", type=int, default=None,
+                        help="Optional number of rows to parse per chunk. Bounds the parser's buffers on wide files; the loaded data still holds every row.")
+    parser.add_argument("--parser", type=str, choices=["auto", "c", "pyarrow", "numpy"], default="auto",
+                        help="CSV parser backend: pandas' C engine, pandas' multithreaded pyarrow engine (needs pyarrow), or numpy.loadtxt for files of plain numbers. auto (default) times them on the head of large files and picks the fastest.")
+    parser.add_argument("--cache_dir", type=str, default=None,
+                        help="Optional directory for a binary cache of parsed CSV files.")
+    parser.add_argument("--cache_max_bytes", type=int, default=None,
+                        help="Optional size limit of the cache directory in bytes.")
+    parser.add_argument("--agg", type=str, default=None,
+                        choices=["sum", "mean", "count", "min", "max", "median", "p25", "p75", "p90", "p95", "p99"],
+                        help="Bar charts only: aggregate y_column per x_column category before drawing.")
+    parser.add_argument("--top_n", type=int, default=None,
+                        help="Bar charts only: keep the top N categories and group the rest into 'Other'.")
+    parser.add_argument("--stream", action="store_true",
+                        help="Bar charts with --agg or --top_n: aggregate the file chunk by chunk in constant memory. Quantiles (median, p25-p99) become approximate.")
+    parser.add_argument("--downsample", type=str, choices=["lttb", "minmax"], default=None,
+                        help="Optional downsampling method for line plots with more points than the output has pixels.")
+    parser.add_argument("--max_points", type=int, default=None,
+                        help="Optional target number of points when downsampling. Defaults to the output width in pixels.")
+    parser.add_argument("--resample", type=str, choices=["mean", "min", "max", "last"], default=None,
+                        help="Line plots only: aggregate y_column into equal-width x buckets, one per pixel or --max_points buckets.")
+    parser.add_argument("--date_format", type=str, default=None,
+                        help="Optional strptime format of timestamps in x_column, e.g. '%%Y-%%m-%%d %%H:%%M:%%S', or ISO8601. The column is parsed as datetimes.")
+    parser.add_argument("--scatter_mode", type=str, choices=["points", "density"], default="points",
+                        help="Scatter plots only: draw one marker per row (points) or a log-scaled 2D histogram (density).")
+    parser.add_argument("--mmap", action="store_true",
+                        help="Plot numeric columns straight from memory-mapped arrays in --cache_dir.")
+    parser.add_argument("--dpi", type=float, default=None,
+                        help="Optional output resolution in dots per inch. Defaults to matplotlib's savefig.dpi.")
+    parser.add_argument("--render_cache", type=str, default=None,
+                        help="Optional directory of rendered charts. An unchanged chart of unchanged data is copied from it instead of being rendered.")
+    parser.add_argument("--render_cache_max_bytes", type=int, default=None,
+                        help="Optional size limit of the render cache directory in bytes.")
+    parser.add_argument("--sample", type=int, default=None, metavar="N",
+                        help="Optional number of rows to plot: a seeded random sample drawn while streaming the file, in memory bounded by N.")
+    parser.add_argument("--seed", type=int, default=0,
+                        help="Random seed of --sample. The same seed and data give the same sample. Defaults to 0.")
+    parser.add_argument("--stratify_by", type=str, default=None, metavar="COLUMN",
+                        help="With --sample: give every distinct value of this column an equal share of the sample.")
+    parser.add_argument("--optimize_memory", action="store_true",
+                        help="Store the data in the narrowest dtypes and text columns with few distinct values as categoricals, and report the memory saved.")
+    parser.add_argument("--sort_by", type=str, default=None,
+                        help="Optional column to sort the rows by before plotting, e.g. a timestamp spread across shards.")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="Number of processes parsing sharded input in parallel. Defaults to one per CPU.")
+    parser.add_argument("--profile", type=str, default=None,
+                        help="Optional path to write per-stage timings, row counts and memory high-water marks to.")
+    parser.add_argument("--profile_format", type=str, choices=["json", "chrome"], default="json",
+                        help="Format of --profile: a JSON summary (default) or a Chrome trace-event file.")
+    parser.add_argument("--cprofile", type=str, default=None,
+                        help="Optional path to write cProfile statistics of the whole run to.")
+    parser.add_argument("--follow", action="store_true",
+                        help="Keep running and re-render whenever rows are appended to the CSV file.")
+    parser.add_argument("--interval", type=float, default=60.0,
+                        help="Follow mode only: seconds between checks for new rows. Defaults to 60.")
+    return parser
+
+
+def main_only_options(args: argparse.Namespace) -> List[str]:
+    """Returns the options in args that only a standalone main.py run supports (not batch jobs or the server)."""
+    return [name for name in MAIN_ONLY_OPTIONS if getattr(args, name) not in (None, False)]
+
+
+def y_columns(args: argparse.Namespace) -> List[str]:
+    """Returns the y columns a plot request draws: y_column followed by any --extra_y columns."""
+    return list(dict.fromkeys([args.y_column] + (args.extra_y or [])))
+
+
+def is_series_plot(args: argparse.Namespace) -> bool:
+    """Returns True if a plot request draws several y columns or facets (see plotter.render_series_figure)."""
+    return len(y_columns(args)) > 1 or args.facet is not None
+
+
+def required_columns(args: argparse.Namespace) -> List[str]:
+    """Returns the CSV columns a plot request needs, in order and without duplicates."""
+    optional = [args.facet, args.stratify_by, args.sort_by]
+    return list(dict.fromkeys([args.x_column] + y_columns(args) + [column for column in optional if column]))
+
+
+def date_columns(args: argparse.Namespace) -> Dict[str, str]:
+    """Returns the columns a plot request parses as datetimes, mapped to their formats."""
+    return {args.x_column: args.date_format} if args.date_format is not None else {}
+
+
+def numeric_columns(args: argparse.Namespace) -> List[str]:
+    """Returns the columns a plot request cannot draw from text, such as the axes of a density scatter plot."""
+    columns = []
+    if args.mmap:
+        columns += required_columns(args)
+    if args.plot_type == "scatter" and args.scatter_mode == "density":
+        columns += [args.x_column, args.y_column]
+    if args.plot_type == "line" and args.resample is not None and args.date_format is None:
+        columns.append(args.x_column)
+    if is_series_plot(args) or (args.plot_type == "line" and (args.downsample or args.resample)):
+        columns += y_columns(args)
+    if args.plot_type == "bar" and args.agg not in (None, "sum", "count", "min", "max"):
+        columns.append(args.y_column)
+    return list(dict.fromkeys(columns))
+
+
+def load_data(args: argparse.Namespace, columns: Optional[List[str]] = None, pre_aggregate: bool = False,
+              dtype: Optional[Dict[str, Any]] = None, file_schema: Optional[Dict[str, str]] = None):
+    """
+    Loads the data for a plot request, honouring its loading options.
+
+    A directory or glob pattern in args.file_path is loaded as a set of
+    shards, parsed in parallel by args.workers processes. With args.stream,
+    the rows are folded chunk by chunk into per-category statistics and only
+    the aggregated bars are returned (marked like pre_aggregate). With
+    args.optimize_memory, text columns whose sample has few distinct values
+    are parsed as categoricals and the frame is stored in the narrowest
+    dtypes (see data_loader.optimize_dtypes). With args.date_format, the x
+    column is parsed as datetimes. With args.sample, only a seeded random
+    sample of the rows is kept while the file is streamed. args.parser picks
+    the CSV parser backend of whole-file loads (see data_loader.load_csv).
+
+    Args:
+        args: Parsed command-line arguments.
+        columns: Columns to read. Defaults to required_columns(args).
+        pre_aggregate: If True, an aggregated bar chart of sharded input is
+            aggregated per shard inside the workers and merged, so only one
+            row per category and shard is sent back. The result is marked with
+            the AGGREGATED_ATTR frame attribute, so render_plot does not
+            aggregate it again. Only valid when the data serves this request alone.
+        dtype: Optional read_csv dtypes of some columns, e.g. the
+            schema.dtype_hints of a probed file.
+        file_schema: Optional schema.probe_schema result of a single input
+            file, which spares the parser selection probing it again.
+
+    Returns:
+        A pandas DataFrame, or a MappedColumns view when args.mmap is set.
+
+    Raises:
+        The exceptions raised by load_csv and open_mmap_columns; their error
+        messages are printed by the loader.
+    """
+    cache_module = _import_module("cache")
+    data_loader = _import_module("data_loader")
+    # Only the plotted columns are parsed; the rest of the file is skipped.
+    if columns is None:
+        columns = required_columns(args)
+    cache = None
+    if args.cache_dir is not None:
+        cache = cache_module.FrameCache(args.cache_dir, max_bytes=args.cache_max_bytes or cache_module.DEFAULT_MAX_BYTES)
+    if args.stream:
+        return _stream_aggregate(args, data_loader, dtype)
+    if args.sample is not None:
+        return _sample(args, data_loader, columns, dtype)
+    if not data_loader.is_sharded_input(args.file_path):
+        if args.mmap:
+            return data_loader.open_mmap_columns(args.file_path, columns, cache, chunksize=args.chunksize,
+                                                 parser=args.parser, schema=file_schema)
+        categories = _category_columns(args, args.file_path, columns)
+        df = data_loader.load_csv(args.file_path, columns=columns, chunksize=args.chunksize, cache=cache,
+                                  dtype=dtype, categories=categories, dates=date_columns(args), parser=args.parser,
+                                  schema=file_schema)
+        return _sorted(_optimized(df, args), args)
+
+    if args.mmap:
+        error_msg = "Error: Sharded input cannot be memory-mapped."
+        print(error_msg)
+        raise ValueError(error_msg)
+    try:
+        paths = data_loader.expand_input_paths(args.file_path)
+    except FileNotFoundError as e:
+        print(f"Error: {e}")
+        raise
+    categories = _category_columns(args, paths[0], columns)
+    aggregation = _import_module("aggregation")
+    agg = args.agg or "sum"
+    if (pre_aggregate and args.plot_type == "bar" and (args.agg or args.top_n)
+            and agg in aggregation.MERGEABLE_AGGREGATIONS):
+        reducer = functools.partial(aggregation.partial_aggregate, x_column=args.x_column, y_column=args.y_column)
+        partials = data_loader.load_csvs(paths, columns=[args.x_column, args.y_column], chunksize=args.chunksize,
+                                         cache=cache, workers=args.workers, reducer=reducer, dtype=dtype,
+                                         categories=categories, dates=date_columns(args), parser=args.parser)
+        try:
+            df = aggregation.merge_partial_aggregates(partials, args.x_column, args.y_column, agg=agg,
+                                                      top_n=args.top_n)
+        except ValueError as e:
+            print(f"Error: {e}")
+            raise
+        df.attrs[AGGREGATED_ATTR] = True
+        return df
+    df = data_loader.load_csvs(paths, columns=columns, chunksize=args.chunksize, cache=cache, workers=args.workers,
+                               dtype=dtype, categories=categories, dates=date_columns(args), parser=args.parser)
+    return _sorted(_optimized(df, args), args)
+
+
+def _stream_aggregate(args: argparse.Namespace, data_loader, dtype: Optional[Dict[str, Any]]):
+    try:
+        paths = data_loader.expand_input_paths(args.file_path)
+    except FileNotFoundError as e:
+        print(f"Error: {e}")
+        raise
+    aggregation = _import_module("aggregation")
+    agg = args.agg or "sum"
+    aggregator = data_loader.aggregate_csvs(
+        paths, args.x_column, args.y_column, chunksize=args.chunksize or data_loader.DEFAULT_CHUNKSIZE,
+        workers=args.workers, sketch=agg in aggregation.QUANTILE_AGGREGATIONS, dtype=dtype,
+        # Category labels parse faster than strings and group without being hashed again.
+        categories=_import_module("schema").category_columns(paths[0], _categorizable(args, [args.x_column])))
+    try:
+        df = aggregator.result(agg, top_n=args.top_n)
+    except ValueError as e:
+        print(f"Error: {e}")
+        raise
+    df.attrs[AGGREGATED_ATTR] = True
+    return df
+
+
+def _sample(args: argparse.Namespace, data_loader, columns: List[str], dtype: Optional[Dict[str, Any]]):
+    try:
+        paths = data_loader.expand_input_paths(args.file_path)
+    except FileNotFoundError as e:
+        print(f"Error: {e}")
+        raise
+    sampler = data_loader.sample_csvs(paths, args.sample, columns=columns, seed=args.seed,
+                                      stratify_by=args.stratify_by,
+                                      chunksize=args.chunksize or data_loader.DEFAULT_CHUNKSIZE,
+                                      workers=args.workers, dtype=dtype)
+    df = sampler.result()
+    print(f"Sampled {len(df):,} of {sampler.rows:,} rows.")
+    # Dates are parsed for the sampled rows only.
+    if date_columns(args):
+        df = data_loader.parse_dates(df, date_columns(args), args.file_path)
+    return _sorted(_optimized(df, args), args)
+
+
+def _categorizable(args: argparse.Namespace, columns: List[str]) -> List[str]:
+    # Timestamps are converted to datetimes after parsing, so they stay plain strings until then.
+    columns = [column for column in columns if column not in date_columns(args)]
+    if args.plot_type == "bar" and (args.agg or args.top_n):
+        # Aggregating an unordered categorical fails where plain strings work (e.g. min, max).
+        return [column for column in columns if column != args.y_column]
+    return columns
+
+
+def _category_columns(args: argparse.Namespace, file_path: str, columns: List[str]) -> List[str]:
+    if not args.optimize_memory:
+        return []
+    # A sample of the (first) file decides, so the full column is parsed only once.
+    return _import_module("schema").category_columns(file_path, _categorizable(args, columns))
+
+
+def _optimized(df, args: argparse.Namespace):
+    if not args.optimize_memory:
+        return df
+    return _import_module("data_loader").optimize_dtypes(df, categories=_categorizable(args, list(df.columns)))
+
+
+def _sorted(df, args: argparse.Namespace):
+    if args.sort_by is None:
+        return df
+    # A stable sort keeps the file (and shard) order of rows with equal keys.
+    return df.sort_values(args.sort_by, kind="stable", ignore_index=True)
+
+
+def default_output_path(plot_type: str) -> str:
+    """Returns the output file name used when --output_path is not given."""
+    return f"{plot_type}_chart.png"
+
+
+def plot_title(args: argparse.Namespace) -> str:
+    """Returns the plot title, generating a default one when --title is not given."""
+    if args.title is not None:
+        return args.title
+    title = f"{args.plot_type.capitalize()} chart for {args.x_column} vs {', '.join(y_columns(args))}"
+    return title + (f" by {args.facet}" if args.facet else "")
+
+
+def plot_options(args: argparse.Namespace) -> Dict[str, Any]:
+    """Returns the plot-type specific options of a plot request."""
+    # Only the options of the requested plot type are passed on.
+    return {
+        "bar": {"agg": args.agg, "top_n": args.top_n},
+        "line": {"downsample": args.downsample, "max_points": args.max_points, "resample": args.resample},
+        "scatter": {"mode": args.scatter_mode},
+    }.get(args.plot_type, {})
 
+
+def render_cache_params(args: argparse.Namespace) -> Dict[str, Any]:
+    """
+    Returns every parameter that affects the image rendered for args.
+
+    Together with the input file's fingerprint this forms the render cache key.
+    The matplotlib version is included because it can change the output.
+    """
+    from importlib.metadata import version
+    output_path = args.output_path or default_output_path(args.plot_type)
+    return {
+        "version": RENDER_CACHE_VERSION,
+        "matplotlib": version("matplotlib"),
+        "columns": [args.x_column] + y_columns(args),
+        "facet": args.facet,
+        "layout": args.layout,
+        "plot_type": args.plot_type,
+        "title": plot_title(args),
+        "format": os.path.splitext(output_path)[1].lower(),
+        "dpi": args.dpi,
+        "date_format": args.date_format,
+        # Sorting changes the order in which line charts connect their points.
+        "sort_by": args.sort_by,
+        # Streamed quantiles are approximate, so they differ from in-memory ones.
+        "stream": args.stream,
+        "sample": [args.sample, args.seed, args.stratify_by] if args.sample is not None else None,
+        "options": plot_options(args),
+    }
+
+
+def render_plot(df, args: argparse.Namespace, profiler=None) -> str:
+    """
+    Renders the plot described by args from already loaded data.
+
+    Args:
+        df: The loaded data.
+        args: Parsed command-line arguments.
+        profiler: Optional profiling.Profiler timing the validate, render and
+            encode stages.
+
+    Returns:
+        The path the plot was saved to.
+
+    Raises:
+        ValueError: If the plot cannot be generated from df, e.g. an unknown
+            plot_type or a missing column (the plotting functions print the
+            error message).
+    """
+    # Determine output_path
+    actual_output_path = args.output_path
+    if actual_output_path is None:
+        actual_output_path = default_output_path(args.plot_type)
+
+    options = plot_options(args)
+    if getattr(df, "attrs", {}).get(AGGREGATED_ATTR):
+        # Already aggregated per category (and top N) by load_data.
+        options.update(agg=None, top_n=None)
+
+    if profiler is None:
+        profiler = _import_module("profiling").Profiler(enabled=False)
+    # The figure is drawn on its own Figure rather than pyplot's global
+    # state, so render_plot is safe to call from several threads.
+    with profiler.stage("import", module="plotter"):
+        plotter = _import_module("plotter")
+    with profiler.stage("validate"):
+        if is_series_plot(args):
+            plotter.validate_series_plot(args.plot_type, df, args.x_column, y_columns(args), args.facet, args.layout)
+        else:
+            plotter.validate_plot(args.plot_type, df, args.x_column, args.y_column)
+    with profiler.stage("render", rows=len(df)):
+        if is_series_plot(args):
+            fig = plotter.render_series_figure(args.plot_type, df, args.x_column, y_columns(args),
+                                               facet_column=args.facet, layout=args.layout,
+                                               title=plot_title(args), dpi=args.dpi, **options)
+        else:
+            fig = plotter.render_figure(args.plot_type, df, args.x_column, args.y_column, title=plot_title(args),
+                                        dpi=args.dpi, **options)
+    with profiler.stage("encode"):
+        plotter.save_figure(fig, actual_output_path, dpi=args.dpi)
+    return actual_output_path
+
+
+def validate_args(args: argparse.Namespace) -> None:
+    """
+    Checks the combinations of options that the parser cannot express.
+
+    Shared by main(), batch jobs and the render server, so a request is
+    accepted or rejected the same way everywhere.
+
+    Raises:
+        ValueError: If options conflict or a number is out of range.
+    """
+    if args.chunksize is not None and args.chunksize <= 0:
+        raise ValueError("--chunksize must be positive.")
+    if args.mmap and args.cache_dir is None:
+        raise ValueError("--mmap requires --cache_dir.")
+    if args.follow and (args.mmap or args.cache_dir is not None):
+        raise ValueError("--follow cannot be combined with --mmap or --cache_dir.")
+    if args.follow and (args.render_cache is not None or args.profile is not None or args.cprofile is not None):
+        raise ValueError("--follow cannot be combined with --render_cache, --profile or --cprofile.")
+    if args.optimize_memory and (args.mmap or args.follow):
+        raise ValueError("--optimize_memory cannot be combined with --mmap or --follow.")
+    if args.top_n is not None and args.top_n <= 0:
+        raise ValueError("--top_n must be positive.")
+    if args.stream and (args.plot_type != "bar" or (args.agg is None and args.top_n is None)):
+        raise ValueError("--stream applies to bar charts with --agg or --top_n.")
+    if args.stream and (args.mmap or args.follow or args.cache_dir is not None or args.sort_by is not None):
+        raise ValueError("--stream cannot be combined with --mmap, --follow, --cache_dir or --sort_by.")
+    if args.downsample is not None and args.resample is not None:
+        raise ValueError("--downsample and --resample cannot be combined.")
+    if args.max_points is not None and args.max_points <= 0:
+        raise ValueError("--max_points must be positive.")
+    if args.downsample == "lttb" and args.max_points is not None and args.max_points < 3:
+        raise ValueError("--downsample lttb needs --max_points of at least 3.")
+    if is_series_plot(args) and (args.plot_type not in ("line", "scatter") or args.scatter_mode != "points"):
+        raise ValueError("--extra_y and --facet apply to line plots and point scatter plots.")
+    if args.date_format is not None and (args.mmap or args.stream):
+        raise ValueError("--date_format cannot be combined with --mmap or --stream.")
+    if args.sample is not None and args.sample <= 0:
+        raise ValueError("--sample must be positive.")
+    if args.sample is not None and (args.mmap or args.follow or args.stream or args.cache_dir is not None):
+        raise ValueError("--sample cannot be combined with --mmap, --follow, --stream or --cache_dir.")
+    if args.stratify_by is not None and args.sample is None:
+        raise ValueError("--stratify_by requires --sample.")
+    if args.parser in ("pyarrow", "numpy") and (args.chunksize is not None or args.stream or args.sample is not None
+                                                or args.follow):
+        raise ValueError("--parser pyarrow and numpy read whole files and cannot be combined with --chunksize, "
+                         "--stream, --sample or --follow.")
+    if args.sort_by is not None and (args.mmap or args.follow):
+        raise ValueError("--sort_by cannot be combined with --mmap or --follow.")
+    if args.workers is not None and args.workers <= 0:
+        raise ValueError("--workers must be positive.")
+    if args.interval <= 0:
+        raise ValueError("--interval must be positive.")
+
+
+def main():
+    parser = build_parser()
     args = parser.parse_args()
 
     try:
-        print(f"Loading data from {args.file_path}...")
-        df = load_csv(args.file_path)
+        validate_args(args)
+    except ValueError as e:
+        parser.error(str(e))
+
+    profiler = None
+    if args.profile is not None or args.cprofile is not None:
+        profiling = _import_module("profiling")
+        profiler = profiling.Profiler(cprofile_path=args.cprofile, metadata={
+            "argv": sys.argv[1:], "file_path": args.file_path, "plot_type": args.plot_type,
+            "x_column": args.x_column, "y_column": args.y_column})
+    status = "error"
+    try:
+        _run(parser, args, profiler)
+        status = "ok"
+    except SystemExit as e:
+        if e.code in (None, 0):
+            status = "ok"
+        raise
+    finally:
+        if profiler is not None:
+            profiler.finish(status)
+            if args.profile is not None:
+                profiler.write(args.profile, args.profile_format)
+                print(f"Profile saved to {args.profile}.")
+
+
+def _run(parser: argparse.ArgumentParser, args: argparse.Namespace, profiler=None):
+    """Runs a validated main.py request, timing its stages with profiler if given."""
+    if profiler is None:
+        profiler = _import_module("profiling").Profiler(enabled=False)
+
+    print(f"Loading data from {args.file_path}...")
+    shards = _import_module("shards")
+    try:
+        # Checked up front so that a typo does not pay for importing pandas.
+        with profiler.stage("expand_input") as record:
+            input_paths = shards.expand_input_paths(args.file_path)
+            record["files"] = len(input_paths)
+    except FileNotFoundError as e:
+        print(f"Error: {e}")
+        sys.exit(1)
+    if args.follow and shards.is_sharded_input(args.file_path):
+        parser.error("--follow needs a single CSV file, not a directory or glob pattern.")
+
+    render_cache = None
+    if args.render_cache is not None:
+        disk_cache = _import_module("disk_cache")
+        render_cache = disk_cache.RenderCache(
+            args.render_cache, max_bytes=args.render_cache_max_bytes or disk_cache.DEFAULT_MAX_BYTES)
+        output_path = args.output_path or default_output_path(args.plot_type)
+        try:
+            with profiler.stage("render_cache_lookup") as record:
+                render_cache_key = render_cache.key(input_paths, render_cache_params(args))
+                record["hit"] = render_cache.get(render_cache_key, output_path)
+        except OSError as e:
+            # E.g. the directory of output_path does not exist.
+            print(f"Error: Cannot restore the plot from the render cache to {output_path}: {e}")
+            sys.exit(1)
+        if record["hit"]:
+            # Neither the data nor the chart changed since it was last rendered.
+            print(f"Plot restored from the render cache to {output_path}.")
+            return
+
+    schema = _import_module("schema")
+    try:
+        # The header and a sample of rows show most invalid requests, e.g. a
+        # misspelt column, before pandas is imported or the file is parsed.
+        # Shards are assumed to share the first file's columns.
+        with profiler.stage("probe", file=input_paths[0]) as record:
+            file_schema = schema.probe_schema(input_paths[0])
+            record["columns"] = len(file_schema)
+            schema.check_schema(file_schema, input_paths[0], required_columns(args), numeric_columns(args))
+    except (FileNotFoundError, ValueError):
+        # Error message is printed by the schema probe
+        sys.exit(1)
+
+    with profiler.stage("import", module="pandas"):
+        import pandas as pd # Import pandas for specific exceptions
+
+    if args.follow:
+        follow = _import_module("follow")
+        print(f"Following {args.file_path}, checking for new rows every {args.interval:g}s (Ctrl+C to stop)...")
+        try:
+            follow.follow_plot(args, interval=args.interval)
+        except KeyboardInterrupt:
+            print("Stopped following.")
+        except (FileNotFoundError, pd.errors.EmptyDataError, pd.errors.ParserError, ValueError):
+            # Error message is printed by the follower or the plotting functions
+            sys.exit(1)
+        except Exception as e:
+            print(f"An unexpected error occurred while following the data: {e}")
+            sys.exit(1)
+        return
+
+    try:
+        with profiler.stage("parse", files=len(input_paths)) as record:
+            # The sample only speaks for the first file, so the dtypes of shards are still inferred.
+            single = len(input_paths) == 1
+            dtype = schema.dtype_hints(file_schema, required_columns(args)) if single else None
+            df = load_data(args, pre_aggregate=True, dtype=dtype, file_schema=file_schema if single else None)
+            record["rows"] = len(df)
+            record["columns"] = list(df.columns)
+            if args.optimize_memory:
+                data_loader = _import_module("data_loader")
+                record["memory_bytes"] = data_loader.memory_usage(df)
+                record["default_memory_bytes"] = data_loader.default_memory_usage(df)
     except FileNotFoundError:
         # Error message is printed by load_csv
         sys.exit(1)
@@ -38,6 +585,9 @@ def main():
     except pd.errors.ParserError:
         # Error message is printed by load_csv
         sys.exit(1)
+    except ValueError:
+        # Error message is printed by load_csv (e.g. a requested column is missing)
+        sys.exit(1)
     except Exception as e:
         print(f"An unexpected error occurred while loading the data: {e}")
         sys.exit(1)
@@ -46,31 +596,23 @@ def main():
         print("Failed to load data. Exiting.")
         sys.exit(1)
 
-    # Determine output_path
-    actual_output_path = args.output_path
-    if actual_output_path is None:
-        actual_output_path = f"{args.plot_type}_chart.png"
-
-    # Determine title
-    actual_title = args.title
-    if actual_title is None:
-        actual_title = f"{args.plot_type.capitalize()} chart for {args.x_column} vs {args.y_column}"
+    if args.optimize_memory:
+        optimized, default = record["memory_bytes"], record["default_memory_bytes"]
+        print(f"Memory: {default / 1e6:.1f} MB with default dtypes, {optimized / 1e6:.1f} MB optimized"
+              + (f" ({optimized / default:.0%})." if default else "."))
 
     print(f"Generating {args.plot_type} plot...")
 
     try:
-        if args.plot_type == "bar":
-            generate_bar_chart(df, args.x_column, args.y_column, title=actual_title, output_path=actual_output_path)
-        elif args.plot_type == "line":
-            generate_line_graph(df, args.x_column, args.y_column, title=actual_title, output_path=actual_output_path)
-        elif args.plot_type == "scatter":
-            generate_scatter_plot(df, args.x_column, args.y_column, title=actual_title, output_path=actual_output_path)
-        else:
-            # This case should ideally not be reached due to argparse choices
-            print(f"Error: Invalid plot_type '{args.plot_type}'. Please choose from 'bar', 'line', or 'scatter'.")
-            sys.exit(1)
-        
+        actual_output_path = render_plot(df, args, profiler=profiler)
         print(f"Plot saved to {actual_output_path}.")
+        if render_cache is not None:
+            try:
+                with profiler.stage("render_cache_store"):
+                    render_cache.put(render_cache_key, actual_output_path)
+            except OSError as e:
+                # The plot itself was saved; only the next run misses the cache.
+                print(f"Could not store the plot in the render cache: {e}")
 
     except ValueError as ve:
         # Error message is printed by plotting functions
@@ -0,0 +1,161 @@
+import time
+from multiprocessing import shared_memory
+from typing import Any, Dict, List, Tuple
+
+import numpy as np
+import pandas as pd
+
+try:
+    from .main import load_data, render_plot
+except ImportError:
+    from main import load_data, render_plot
+
+
+class SharedFrame:
+    """
+    Copies the columns of a DataFrame into POSIX shared memory once, so that
+    worker processes can rebuild it without the frame being pickled per job.
+
+    Numeric, boolean and datetime columns are stored as their raw buffers.
+    Other columns (e.g. strings) are factorized into integer codes and their
+    distinct values. Categorical columns are shared as their existing codes
+    and categories. Distinct string values are stored in shared memory too,
+    as UTF-8 bytes after their offsets, so a column with millions of distinct
+    strings does not make every job's spec large. Other distinct values
+    (e.g. Python objects) travel with the spec.
+
+    Use as a context manager in the parent process; the shared memory is
+    released on exit, so all workers using it must have finished by then.
+    """
+
+    def __init__(self, df):
+        self._segments: List[shared_memory.SharedMemory] = []
+        self.spec: List[Dict[str, Any]] = []
+        try:
+            for name in df.columns:
+                self.spec.append(self._share_column(name, df[name]))
+        except BaseException:
+            self.close()
+            raise
+
+    def _share_column(self, name: str, values) -> Dict[str, Any]:
+        labels = None
+        categorical = isinstance(values.dtype, pd.CategoricalDtype)
+        if categorical:
+            array, labels = values.cat.codes.to_numpy(), values.cat.categories
+        else:
+            array = np.asarray(values)
+        if array.dtype.kind not in "biufcmM":
+            array, labels = pd.factorize(values, use_na_sentinel=True)
+        shared_labels = None
+        if labels is not None and all(isinstance(label, str) for label in labels):
+            shared_labels, labels = self._share_strings(labels), None
+        array = np.ascontiguousarray(array)
+        return {"name": name, "segment": self._share_array(array), "dtype": array.dtype.str, "length": len(array),
+                "categorical": categorical, "labels": labels, "shared_labels": shared_labels}
+
+    def _share_array(self, array: np.ndarray) -> str:
+        # SharedMemory rejects a size of 0, so empty arrays still get one byte.
+        segment = shared_memory.SharedMemory(create=True, size=max(array.nbytes, 1))
+        self._segments.append(segment)
+        np.ndarray(array.shape, dtype=array.dtype, buffer=segment.buf)[:] = array
+        return segment.name
+
+    def _share_strings(self, labels) -> Dict[str, Any]:
+        # Layout: len(labels) + 1 int64 offsets, then the concatenated UTF-8 bytes.
+        encoded = [label.encode("utf-8", "surrogatepass") for label in labels]
+        offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+        np.cumsum([len(data) for data in encoded], out=offsets[1:])
+        payload = np.frombuffer(b"".join(encoded), dtype=np.uint8)
+        buffer = np.concatenate([offsets.view(np.uint8), payload])
+        return {"segment": self._share_array(buffer), "count": len(encoded), "nbytes": buffer.nbytes,
+                "dtype": labels.dtype}
+
+    def close(self) -> None:
+        """Releases the shared memory segments."""
+        for segment in self._segments:
+            segment.close()
+            segment.unlink()
+        self._segments = []
+
+    def __enter__(self) -> "SharedFrame":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+
+def attach_shared_frame(spec: List[Dict[str, Any]]) -> Tuple[pd.DataFrame, List[shared_memory.SharedMemory]]:
+    """
+    Rebuilds a DataFrame from a SharedFrame spec inside a worker process.
+
+    Numeric columns are zero-copy views of the shared memory. Shared string
+    values are decoded into the worker's memory.
+
+    Returns:
+        The DataFrame and the attached segments. Close the segments (not unlink)
+        once the frame is no longer used.
+    """
+    segments = []
+    data = {}
+    for column in spec:
+        segment = shared_memory.SharedMemory(name=column["segment"])
+        segments.append(segment)
+        array = np.ndarray((column["length"],), dtype=np.dtype(column["dtype"]), buffer=segment.buf)
+        labels = column["labels"]
+        if column["shared_labels"] is not None:
+            labels = _attach_strings(column["shared_labels"])
+        if column["categorical"]:
+            data[column["name"]] = pd.Categorical.from_codes(array, labels)
+        elif labels is not None:
+            # Code -1 marks a missing value and is absent from the index, so it becomes NaN.
+            data[column["name"]] = pd.Series(labels).reindex(array).reset_index(drop=True)
+        else:
+            data[column["name"]] = array
+    return pd.DataFrame(data, copy=False), segments
+
+
+def _attach_strings(spec: Dict[str, Any]) -> pd.Index:
+    """Decodes the strings stored by SharedFrame._share_strings."""
+    segment = shared_memory.SharedMemory(name=spec["segment"])
+    try:
+        # One copy, so that no view keeps the segment from being closed.
+        buffer = bytes(segment.buf[:spec["nbytes"]])
+    finally:
+        segment.close()
+    start = 8 * (spec["count"] + 1)
+    offsets = np.frombuffer(buffer, dtype=np.int64, count=spec["count"] + 1).tolist()
+    payload = buffer[start:]
+    return pd.Index([payload[a:b].decode("utf-8", "surrogatepass") for a, b in zip(offsets[:-1], offsets[1:])],
+                    dtype=spec["dtype"])
+
+
+def render_shared(spec, args) -> Tuple[str, float]:
+    """
+    Worker entry point: renders one plot job from shared data.
+
+    Args:
+        spec: A SharedFrame spec, or None to have the worker load the data
+            itself (used for memory-mapped inputs, which are already shared
+            through the page cache).
+        args: The job's parsed main.py arguments.
+
+    Returns:
+        The output path and the render time in seconds.
+    """
+    start = time.perf_counter()
+    if spec is None:
+        return render_plot(load_data(args), args), time.perf_counter() - start
+    df, segments = attach_shared_frame(spec)
+    try:
+        output_path = render_plot(df, args)
+    finally:
+        # The frame's columns are views of the segments and must go first.
+        del df
+        for segment in segments:
+            try:
+                segment.close()
+            except BufferError:
+                # Something still holds a view of the buffer; it is released with it.
+                pass
+    return output_path, time.perf_counter() - start
@@ -1,8 +1,177 @@
+import io
+import math
+import os
+import threading
+from typing import BinaryIO, List, Optional, Tuple, Union
+
+import numpy as np
 import pandas as pd
+import matplotlib
+# Plots are only ever written to files, so use the non-interactive Agg backend
+# instead of letting matplotlib probe for a GUI toolkit.
+matplotlib.use("Agg")
 import matplotlib.pyplot as plt
-import seaborn as sns
+from matplotlib.axes import Axes
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.colors import LogNorm
+from matplotlib.figure import Figure
+
+try:
+    from .aggregation import AGGREGATIONS, aggregate_categories
+    from .downsample import DOWNSAMPLE_METHODS, RESAMPLE_METHODS, downsample_indices, resample_series
+except ImportError:
+    from aggregation import AGGREGATIONS, aggregate_categories
+    from downsample import DOWNSAMPLE_METHODS, RESAMPLE_METHODS, downsample_indices, resample_series
+
+
+# Supported rendering modes for scatter plots.
+SCATTER_MODES = ("points", "density")
+
+# Supported plot types and the defaults used by the matching generate_* function.
+PLOT_TYPES = ("bar", "line", "scatter")
+DEFAULT_TITLES = {"bar": "Bar Chart", "line": "Line Graph", "scatter": "Scatter Plot"}
+DEFAULT_OUTPUT_PATHS = {"bar": "bar_chart.png", "line": "line_graph.png", "scatter": "scatter_plot.png"}
+
+# Ways of drawing several y columns: together in each subplot, or one subplot per column.
+SERIES_LAYOUTS = ("overlay", "grid")
+
+# Plot types that can draw several y columns or facets.
+SERIES_PLOT_TYPES = ("line", "scatter")
+
+# Most subplots drawn on one figure, so faceting by an ID-like column fails
+# fast instead of drawing thousands of unreadable panels.
+MAX_PANELS = 36
+
+# Image formats chart_bytes encodes. save_figure also writes the other formats
+# of matplotlib's backends, e.g. pdf or jpg. WebP additionally needs a Pillow
+# build with WebP support, see available_image_formats().
+IMAGE_FORMATS = ("png", "svg", "webp")
+
+
+def output_size_px() -> Tuple[int, int]:
+    """Returns the (width, height) in pixels of a figure saved with the current matplotlib defaults."""
+    dpi = matplotlib.rcParams["savefig.dpi"]
+    if dpi == "figure":
+        dpi = matplotlib.rcParams["figure.dpi"]
+    width, height = matplotlib.rcParams["figure.figsize"]
+    return int(round(width * dpi)), int(round(height * dpi))
+
+
+def output_width_px() -> int:
+    """Returns the width in pixels of a figure saved with the current matplotlib defaults."""
+    return output_size_px()[0]
+
+
+def density_grid(x, y, bins: Tuple[int, int]) -> Tuple[np.ndarray, Tuple[float, float, float, float]]:
+    """
+    Counts points per cell of a regular 2D grid in a single vectorized pass.
+
+    Unlike np.histogram2d, cell indices are computed arithmetically and counted
+    with np.bincount, so the cost is linear in the number of points.
+
+    Args:
+        x: The numeric x values.
+        y: The numeric y values.
+        bins: The number of (x, y) cells, typically the output size in pixels.
+
+    Returns:
+        A (y_bins, x_bins) array of counts, row 0 at the bottom, and the
+        (x_min, x_max, y_min, y_max) extent covered by the grid. Points with a
+        NaN or infinite coordinate are ignored.
+    """
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    finite = np.isfinite(x) & np.isfinite(y)
+    if not finite.all():
+        x, y = x[finite], y[finite]
+    x_bins, y_bins = bins
+    if len(x) == 0:
+        return np.zeros((y_bins, x_bins), dtype=np.int64), (0.0, 1.0, 0.0, 1.0)
+    x_min, x_max = float(x.min()), float(x.max())
+    y_min, y_max = float(y.min()), float(y.max())
+    # Widen degenerate ranges so every point falls into a valid cell.
+    if x_max == x_min:
+        x_min, x_max = x_min - 0.5, x_max + 0.5
+    if y_max == y_min:
+        y_min, y_max = y_min - 0.5, y_max + 0.5
+    ix = np.minimum(((x - x_min) * (x_bins / (x_max - x_min))).astype(np.int64), x_bins - 1)
+    iy = np.minimum(((y - y_min) * (y_bins / (y_max - y_min))).astype(np.int64), y_bins - 1)
+    counts = np.bincount(iy * x_bins + ix, minlength=x_bins * y_bins).reshape(y_bins, x_bins)
+    return counts, (x_min, x_max, y_min, y_max)
+
+
+def _take(values, indices: np.ndarray):
+    """Selects rows by position from a pandas Series or a numpy array."""
+    if isinstance(values, pd.Series):
+        return values.iloc[indices]
+    return np.asarray(values)[indices]
+
+
+def _fail(error_msg: str):
+    print(error_msg)
+    raise ValueError(error_msg)
+
+
+def _check_columns(df, x_column: str, y_column: str) -> None:
+    if x_column not in df.columns:
+        _fail(f"Error: x_column '{x_column}' not found in DataFrame columns: {df.columns.tolist()}")
+    if y_column not in df.columns:
+        _fail(f"Error: y_column '{y_column}' not found in DataFrame columns: {df.columns.tolist()}")
+
+
+def _bar_values(df, x_column: str, y_column: str, agg: Optional[str], top_n: Optional[int]):
+    """Returns the bar positions and heights, aggregated per category when requested."""
+    if agg is None and top_n is None:
+        return df[x_column], df[y_column]
+    if agg is not None and agg not in AGGREGATIONS:
+        _fail(f"Error: Unknown aggregation '{agg}'. Choose from {list(AGGREGATIONS)}.")
+    aggregated = aggregate_categories(df, x_column, y_column, agg=agg or "sum", top_n=top_n)
+    return aggregated[x_column], aggregated[y_column]
+
+
+def _check_line_options(downsample: Optional[str], resample: Optional[str]) -> None:
+    if downsample is not None and downsample not in DOWNSAMPLE_METHODS:
+        _fail(f"Error: Unknown downsampling method '{downsample}'. Choose from {list(DOWNSAMPLE_METHODS)}.")
+    if resample is not None and resample not in RESAMPLE_METHODS:
+        _fail(f"Error: Unknown resampling method '{resample}'. Choose from {list(RESAMPLE_METHODS)}.")
+    if downsample is not None and resample is not None:
+        _fail("Error: A line graph can be downsampled or resampled, not both.")
+
+
+def _line_values(df, x_column: str, y_column: str, downsample: Optional[str],
+                 max_points: Optional[int], width_px: int, resample: Optional[str] = None):
+    """Returns the line's x and y values, downsampled or resampled to about max_points when requested."""
+    _check_line_options(downsample, resample)
+    x_values, y_values = df[x_column], df[y_column]
+    if resample is not None:
+        x_values = np.asarray(x_values)
+        if x_values.dtype.kind not in "biufM":
+            _fail(f"Error: Resampling needs a numeric or datetime x_column, but '{x_column}' has dtype "
+                  f"{x_values.dtype}. Parse timestamps with a date format first.")
+        return resample_series(x_values, np.asarray(y_values), max_points or width_px, method=resample)
+    if downsample is not None:
+        n_out = max_points or width_px
+        if len(y_values) > n_out:
+            indices = downsample_indices(np.asarray(x_values), np.asarray(y_values), n_out, method=downsample)
+            x_values, y_values = _take(x_values, indices), _take(y_values, indices)
+    return x_values, y_values
+
 
-def generate_bar_chart(df: pd.DataFrame, x_column: str, y_column: str, title: str = "Bar Chart", output_path: str = "bar_chart.png"):
+def _check_scatter_mode(mode: str) -> None:
+    if mode not in SCATTER_MODES:
+        _fail(f"Error: Unknown scatter mode '{mode}'. Choose from {list(SCATTER_MODES)}.")
+
+
+def _density_image(df, x_column: str, y_column: str, bins: Tuple[int, int]):
+    """Returns the masked count image, its extent and a log norm for density scatter plots."""
+    counts, extent = density_grid(df[x_column], df[y_column], bins)
+    # Empty cells are masked so they stay blank instead of breaking the log scale.
+    image = np.ma.masked_equal(counts, 0)
+    norm = LogNorm(vmin=1, vmax=max(int(counts.max()), 1))
+    return image, extent, norm
+
+def generate_bar_chart(df: pd.DataFrame, x_column: str, y_column: str, title: str = "Bar Chart", output_path: str = "bar_chart.png",
+                       agg: Optional[str] = None, top_n: Optional[int] = None):
     """
     Generates a bar chart and saves it to a file.
 
@@ -12,21 +181,21 @@ def generate_bar_chart(df: pd.DataFrame, x_column: str, y_column: str, title: st
         y_column: Name of the column to use for the y-axis.
         title: Title of the chart. Defaults to "Bar Chart".
         output_path: Path to save the generated chart image. Defaults to "bar_chart.png".
+        agg: Optional aggregation ("sum", "mean", "count", "min", "max", "median"
+            or a percentile "p25" to "p99").
+            Rows are grouped by x_column and one bar is drawn per category
+            instead of one per row.
+        top_n: Optional number of categories to keep; the remaining ones are
+            aggregated into a single "Other" bar. Implies agg="sum" if agg is None.
 
     Raises:
-        ValueError: If x_column or y_column are not in df.columns.
+        ValueError: If x_column or y_column are not in df.columns, or if agg is unknown.
     """
-    if x_column not in df.columns:
-        error_msg = f"Error: x_column '{x_column}' not found in DataFrame columns: {df.columns.tolist()}"
-        print(error_msg)
-        raise ValueError(error_msg)
-    if y_column not in df.columns:
-        error_msg = f"Error: y_column '{y_column}' not found in DataFrame columns: {df.columns.tolist()}"
-        print(error_msg)
-        raise ValueError(error_msg)
+    _check_columns(df, x_column, y_column)
+    x_values, y_values = _bar_values(df, x_column, y_column, agg, top_n)
 
     plt.figure()
-    plt.bar(df[x_column], df[y_column])
+    plt.bar(x_values, y_values)
     plt.xlabel(x_column)
     plt.ylabel(y_column)
     plt.title(title)
@@ -34,7 +203,9 @@ def generate_bar_chart(df: pd.DataFrame, x_column: str, y_column: str, title: st
     plt.clf() # Clear the current figure
     plt.close() # Close the figure window
 
-def generate_line_graph(df: pd.DataFrame, x_column: str, y_column: str, title: str = "Line Graph", output_path: str = "line_graph.png"):
+def generate_line_graph(df: pd.DataFrame, x_column: str, y_column: str, title: str = "Line Graph", output_path: str = "line_graph.png",
+                        downsample: Optional[str] = None, max_points: Optional[int] = None,
+                        resample: Optional[str] = None):
     """
     Generates a line graph and saves it to a file.
 
@@ -44,21 +215,25 @@ def generate_line_graph(df: pd.DataFrame, x_column: str, y_column: str, title: s
         y_column: Name of the column to use for the y-axis.
         title: Title of the chart. Defaults to "Line Graph".
         output_path: Path to save the generated chart image. Defaults to "line_graph.png".
+        downsample: Optional downsampling method, "lttb" or "minmax". Series longer
+            than max_points are reduced to about max_points points before plotting.
+        max_points: Target number of points when downsampling, or number of
+            buckets when resampling. Defaults to the output width in pixels.
+        resample: Optional aggregation, "mean", "min", "max" or "last". The
+            series is aggregated into max_points buckets of equal width along
+            x before plotting, see resample_series. x_column must hold
+            numbers or datetimes.
 
     Raises:
-        ValueError: If x_column or y_column are not in df.columns.
+        ValueError: If x_column or y_column are not in df.columns, if
+            downsample or resample is not a known method, if both are given,
+            or if resample is given for a text x_column.
     """
-    if x_column not in df.columns:
-        error_msg = f"Error: x_column '{x_column}' not found in DataFrame columns: {df.columns.tolist()}"
-        print(error_msg)
-        raise ValueError(error_msg)
-    if y_column not in df.columns:
-        error_msg = f"Error: y_column '{y_column}' not found in DataFrame columns: {df.columns.tolist()}"
-        print(error_msg)
-        raise ValueError(error_msg)
+    _check_columns(df, x_column, y_column)
+    x_values, y_values = _line_values(df, x_column, y_column, downsample, max_points, output_width_px(), resample)
 
     plt.figure()
-    plt.plot(df[x_column], df[y_column])
+    plt.plot(x_values, y_values)
     plt.xlabel(x_column)
     plt.ylabel(y_column)
     plt.title(title)
@@ -66,7 +241,8 @@ def generate_line_graph(df: pd.DataFrame, x_column: str, y_column: str, title: s
     plt.clf() # Clear the current figure
     plt.close() # Close the figure window
 
-def generate_scatter_plot(df: pd.DataFrame, x_column: str, y_column: str, title: str = "Scatter Plot", output_path: str = "scatter_plot.png"):
+def generate_scatter_plot(df: pd.DataFrame, x_column: str, y_column: str, title: str = "Scatter Plot", output_path: str = "scatter_plot.png",
+                          mode: str = "points", bins: Optional[Tuple[int, int]] = None):
     """
     Generates a scatter plot and saves it to a file.
 
@@ -76,24 +252,432 @@ def generate_scatter_plot(df: pd.DataFrame, x_column: str, y_column: str, title:
         y_column: Name of the column to use for the y-axis.
         title: Title of the chart. Defaults to "Scatter Plot".
         output_path: Path to save the generated chart image. Defaults to "scatter_plot.png".
+        mode: "points" draws one marker per row. "density" counts the points per
+            grid cell and draws the counts as a single image with a logarithmic
+            color scale, which stays fast and readable for millions of rows.
+        bins: Number of (x, y) grid cells in density mode. Defaults to the output
+            size in pixels.
 
     Raises:
-        ValueError: If x_column or y_column are not in df.columns.
+        ValueError: If x_column or y_column are not in df.columns, or if mode is unknown.
     """
-    if x_column not in df.columns:
-        error_msg = f"Error: x_column '{x_column}' not found in DataFrame columns: {df.columns.tolist()}"
-        print(error_msg)
-        raise ValueError(error_msg)
-    if y_column not in df.columns:
-        error_msg = f"Error: y_column '{y_column}' not found in DataFrame columns: {df.columns.tolist()}"
-        print(error_msg)
-        raise ValueError(error_msg)
+    _check_columns(df, x_column, y_column)
+    _check_scatter_mode(mode)
 
     plt.figure()
-    plt.scatter(df[x_column], df[y_column])
+    if mode == "density":
+        image, extent, norm = _density_image(df, x_column, y_column, bins or output_size_px())
+        mappable = plt.imshow(image, origin="lower", extent=extent, aspect="auto", norm=norm, interpolation="nearest")
+        plt.colorbar(mappable, label="count")
+    else:
+        plt.scatter(df[x_column], df[y_column])
     plt.xlabel(x_column)
     plt.ylabel(y_column)
     plt.title(title)
     plt.savefig(output_path)
     plt.clf() # Clear the current figure
     plt.close() # Close the figure window
+
+
+# --- Object-oriented rendering -------------------------------------------------
+#
+# The generate_* functions above drive pyplot's global "current figure" state,
+# so two threads using them at the same time corrupt each other's charts. The
+# functions below build an explicit Figure with its own Agg canvas per render
+# instead and never touch pyplot, which makes them safe to call concurrently.
+
+
+class FigureTemplate:
+    """
+    A reusable figure setup for rendering charts without pyplot.
+
+    Each thread gets its own Figure and Axes, created on first use and merely
+    cleared for every later render, so repeated renders skip figure and axes
+    construction and a thread pool can share one template safely.
+
+    Args:
+        figsize: Figure size in inches. Defaults to matplotlib's figure.figsize.
+        dpi: Figure resolution. Defaults to matplotlib's figure.dpi.
+    """
+
+    def __init__(self, figsize: Optional[Tuple[float, float]] = None, dpi: Optional[float] = None):
+        self.figsize = tuple(figsize or matplotlib.rcParams["figure.figsize"])
+        self.dpi = dpi or matplotlib.rcParams["figure.dpi"]
+        self._local = threading.local()
+
+    def new_figure(self) -> Tuple[Figure, Axes]:
+        """Builds a fresh Figure with an Agg canvas and a single Axes."""
+        fig = Figure(figsize=self.figsize, dpi=self.dpi)
+        FigureCanvasAgg(fig)
+        return fig, fig.add_subplot()
+
+    def acquire(self) -> Tuple[Figure, Axes]:
+        """
+        Returns the calling thread's Figure and Axes, cleared for a new chart.
+
+        The figure is reused by the next acquire() on the same thread, so save
+        it before rendering the next chart.
+        """
+        fig = getattr(self._local, "figure", None)
+        if fig is None:
+            fig, ax = self.new_figure()
+            self._local.figure, self._local.axes = fig, ax
+            return fig, ax
+        ax = self._local.axes
+        # Drop axes added by the previous chart, e.g. a colorbar.
+        for extra in fig.axes:
+            if extra is not ax:
+                extra.remove()
+        ax.clear()
+        return fig, ax
+
+
+def _figure_size_px(fig: Figure, dpi: Optional[float] = None) -> Tuple[int, int]:
+    """Returns the (width, height) in pixels of fig saved at dpi, by default matplotlib's savefig.dpi."""
+    dpi = dpi or matplotlib.rcParams["savefig.dpi"]
+    if dpi == "figure":
+        dpi = fig.dpi
+    width, height = fig.get_size_inches()
+    return int(round(width * dpi)), int(round(height * dpi))
+
+
+def _draw_bar(fig: Figure, ax: Axes, df, x_column: str, y_column: str, size_px: Tuple[int, int],
+              agg: Optional[str] = None, top_n: Optional[int] = None) -> None:
+    ax.bar(*_bar_values(df, x_column, y_column, agg, top_n))
+
+
+def _draw_line(fig: Figure, ax: Axes, df, x_column: str, y_column: str, size_px: Tuple[int, int],
+               downsample: Optional[str] = None, max_points: Optional[int] = None,
+               resample: Optional[str] = None) -> None:
+    ax.plot(*_line_values(df, x_column, y_column, downsample, max_points, size_px[0], resample))
+
+
+def _draw_scatter(fig: Figure, ax: Axes, df, x_column: str, y_column: str, size_px: Tuple[int, int],
+                  mode: str = "points", bins: Optional[Tuple[int, int]] = None) -> None:
+    _check_scatter_mode(mode)
+    if mode == "density":
+        image, extent, norm = _density_image(df, x_column, y_column, bins or size_px)
+        mappable = ax.imshow(image, origin="lower", extent=extent, aspect="auto", norm=norm, interpolation="nearest")
+        fig.colorbar(mappable, ax=ax, label="count")
+    else:
+        ax.scatter(df[x_column], df[y_column])
+
+
+_DRAW_FUNCTIONS = {"bar": _draw_bar, "line": _draw_line, "scatter": _draw_scatter}
+
+
+def validate_plot(plot_type: str, df: pd.DataFrame, x_column: str, y_column: str) -> None:
+    """
+    Checks that a chart can be drawn from df, as render_figure does before drawing.
+
+    Raises:
+        ValueError: If plot_type is unknown or x_column or y_column are not in
+            df.columns (the error message is printed).
+    """
+    if plot_type not in PLOT_TYPES:
+        _fail(f"Error: Invalid plot_type '{plot_type}'. Please choose from {list(PLOT_TYPES)}.")
+    _check_columns(df, x_column, y_column)
+
+
+def render_figure(plot_type: str, df: pd.DataFrame, x_column: str, y_column: str, title: Optional[str] = None,
+                  template: Optional[FigureTemplate] = None, dpi: Optional[float] = None, **options) -> Figure:
+    """
+    Draws a chart on an explicit Figure without using pyplot.
+
+    Args:
+        plot_type: "bar", "line" or "scatter".
+        df: pandas DataFrame (or DataFrame-like object) containing the data.
+        x_column: Name of the column to use for the x-axis.
+        y_column: Name of the column to use for the y-axis.
+        title: Title of the chart. Defaults to the matching generate_* default.
+        template: Optional FigureTemplate whose per-thread figure is reused.
+            A new figure is built for every call if None.
+        dpi: Resolution the figure will be saved at. Downsampling,
+            resampling and density bins are sized to the pixels of that
+            output. Defaults to matplotlib's savefig.dpi.
+        **options: Plot-type specific options of the matching generate_*
+            function: agg and top_n for bar charts, downsample, max_points
+            and resample for line graphs, mode and bins for scatter plots.
+
+    Returns:
+        The rendered Figure.
+
+    Raises:
+        ValueError: If plot_type is unknown, x_column or y_column are not in
+            df.columns, or an option has an invalid value.
+    """
+    validate_plot(plot_type, df, x_column, y_column)
+
+    fig, ax = template.acquire() if template is not None else FigureTemplate().new_figure()
+    _DRAW_FUNCTIONS[plot_type](fig, ax, df, x_column, y_column, _figure_size_px(fig, dpi), **options)
+    ax.set_xlabel(x_column)
+    ax.set_ylabel(y_column)
+    ax.set_title(DEFAULT_TITLES[plot_type] if title is None else title)
+    return fig
+
+
+def validate_series_plot(plot_type: str, df: pd.DataFrame, x_column: str, y_columns: List[str],
+                         facet_column: Optional[str] = None, layout: str = "overlay") -> None:
+    """
+    Checks that render_series_figure can draw a chart from df.
+
+    Raises:
+        ValueError: If plot_type cannot draw several series, layout is
+            unknown, or a column is not in df.columns (the error message is printed).
+    """
+    if plot_type not in SERIES_PLOT_TYPES:
+        _fail(f"Error: Several y columns or facets can be drawn on {list(SERIES_PLOT_TYPES)} plots, not '{plot_type}'.")
+    if layout not in SERIES_LAYOUTS:
+        _fail(f"Error: Unknown layout '{layout}'. Choose from {list(SERIES_LAYOUTS)}.")
+    if not y_columns:
+        _fail("Error: At least one y column is needed.")
+    for column in [x_column, *y_columns] + ([facet_column] if facet_column is not None else []):
+        if column not in df.columns:
+            _fail(f"Error: Column '{column}' not found in DataFrame columns: {list(df.columns)}")
+
+
+def render_series_figure(plot_type: str, df: pd.DataFrame, x_column: str, y_columns: List[str],
+                         facet_column: Optional[str] = None, layout: str = "overlay", title: Optional[str] = None,
+                         dpi: Optional[float] = None, **options) -> Figure:
+    """
+    Draws several y columns, optionally split by a facet column, on one Figure.
+
+    The y columns of each facet are taken from df as one 2D array, so
+    resampling aggregates all of them in a single vectorized pass.
+    Downsampling selects different points per series and runs per column.
+    Subplots share both axes, which keeps small multiples comparable.
+
+    Args:
+        plot_type: "line" or "scatter" (points mode).
+        df: pandas DataFrame (or DataFrame-like object) containing the data.
+        x_column: Name of the column to use for the x-axis.
+        y_columns: Names of the numeric columns to draw against x_column.
+        facet_column: Optional column whose distinct values each get a
+            subplot showing their rows only, in sorted order. Rows with a
+            missing facet value are left out.
+        layout: "overlay" draws all y columns in each subplot, with a legend
+            when there are several; "grid" gives every y column (of every
+            facet) its own subplot.
+        title: Title of the figure. Defaults to the matching generate_* default.
+        dpi: Resolution the figure will be saved at, see render_figure.
+        **options: Options of render_figure: downsample, max_points and
+            resample for line graphs, mode for scatter plots.
+
+    Returns:
+        The rendered Figure.
+
+    Raises:
+        ValueError: See validate_series_plot. Also if a y column is not
+            numeric, there are more than MAX_PANELS subplots, or an option has
+            an invalid value.
+    """
+    validate_series_plot(plot_type, df, x_column, y_columns, facet_column, layout)
+    if plot_type == "scatter" and options.get("mode", "points") != "points":
+        _fail("Error: Several y columns or facets can only be drawn as scatter points, not as a density image.")
+    try:
+        y = np.column_stack([np.asarray(df[column], dtype=np.float64) for column in y_columns])
+    except (ValueError, TypeError):
+        _fail(f"Error: The y columns {list(y_columns)} must be numeric to be drawn together.")
+    x = np.asarray(df[x_column])
+
+    facets = [(None, slice(None))]
+    if facet_column is not None:
+        codes, labels = pd.factorize(np.asarray(df[facet_column]), sort=True)
+        order = np.argsort(codes, kind="stable")
+        bounds = np.searchsorted(codes[order], np.arange(len(labels) + 1))
+        facets = [(label, order[bounds[i]:bounds[i + 1]]) for i, label in enumerate(labels)]
+    groups = [[j] for j in range(len(y_columns))] if layout == "grid" else [list(range(len(y_columns)))]
+    n_panels = len(facets) * len(groups)
+    if n_panels > MAX_PANELS:
+        _fail(f"Error: The chart would need {n_panels} subplots; at most {MAX_PANELS} are drawn. "
+              f"Use fewer y columns or a facet column with fewer values.")
+
+    n_cols = math.ceil(math.sqrt(n_panels))
+    n_rows = math.ceil(n_panels / n_cols)
+    width, height = matplotlib.rcParams["figure.figsize"]
+    # Each subplot gets at least half the default figure size.
+    fig = Figure(figsize=(width * max(1.0, n_cols / 2), height * max(1.0, n_rows / 2)))
+    FigureCanvasAgg(fig)
+    axes = fig.subplots(n_rows, n_cols, sharex=True, sharey=True, squeeze=False).ravel()
+    for ax in axes[n_panels:]:
+        ax.remove()
+    width_px = _figure_size_px(fig, dpi)[0] // n_cols
+
+    panels = iter(axes)
+    for label, rows in facets:
+        series = _series_values(plot_type, x[rows], y[rows], width_px, **options)
+        for group in groups:
+            ax = next(panels)
+            for j in group:
+                series_x, series_y = series[j]
+                if plot_type == "line":
+                    ax.plot(series_x, series_y, label=y_columns[j])
+                else:
+                    ax.scatter(series_x, series_y, label=y_columns[j])
+            names = [f"{facet_column} = {label}"] if facet_column is not None else []
+            if layout == "grid" and len(y_columns) > 1:
+                names.append(y_columns[group[0]])
+            ax.set_title(", ".join(names))
+            if len(group) > 1:
+                # A fixed location skips matplotlib's search over every plotted point.
+                ax.legend(loc="upper left", fontsize="small")
+
+    if x.dtype.kind == "M":
+        # Slanted date labels stay readable in narrow subplots.
+        fig.autofmt_xdate()
+    title = DEFAULT_TITLES[plot_type] if title is None else title
+    if n_panels == 1:
+        axes[0].set_xlabel(x_column)
+        axes[0].set_ylabel(", ".join(y_columns))
+        axes[0].set_title(title)
+    else:
+        fig.suptitle(title)
+        fig.supxlabel(x_column)
+        if layout == "overlay":
+            fig.supylabel(", ".join(y_columns))
+    return fig
+
+
+def _series_values(plot_type: str, x: np.ndarray, y: np.ndarray, width_px: int, downsample: Optional[str] = None,
+                   max_points: Optional[int] = None, resample: Optional[str] = None,
+                   mode: str = "points") -> List[Tuple[np.ndarray, np.ndarray]]:
+    """Returns the (x, y) values to draw for each column of y, downsampled or resampled like _line_values."""
+    if plot_type != "line":
+        return [(x, y[:, j]) for j in range(y.shape[1])]
+    _check_line_options(downsample, resample)
+    n_out = max_points or width_px
+    if resample is not None:
+        if x.dtype.kind not in "biufM":
+            _fail(f"Error: Resampling needs a numeric or datetime x column, got dtype {x.dtype}. "
+                  f"Parse timestamps with a date format first.")
+        x_out, y_out = resample_series(x, y, n_out, method=resample)
+        return [(x_out, y_out[:, j]) for j in range(y.shape[1])]
+    series = []
+    for j in range(y.shape[1]):
+        if downsample is not None and len(y) > n_out:
+            indices = downsample_indices(x, y[:, j], n_out, method=downsample)
+            series.append((x[indices], y[indices, j]))
+        else:
+            series.append((x, y[:, j]))
+    return series
+
+
+def available_image_formats() -> Tuple[str, ...]:
+    """Returns the IMAGE_FORMATS usable in this environment."""
+    from PIL import features
+    return tuple(fmt for fmt in IMAGE_FORMATS if fmt != "webp" or features.check("webp"))
+
+
+def save_figure(fig: Figure, target: Union[str, BinaryIO], fmt: Optional[str] = None, dpi: Optional[float] = None,
+                compress_level: Optional[int] = None, quality: Optional[int] = None) -> None:
+    """
+    Encodes a figure into a file path or a writable binary file-like object.
+
+    Args:
+        fig: The figure to encode.
+        target: A file path or a binary file-like object such as io.BytesIO or
+            an HTTP response stream.
+        fmt: An image format the figure's canvas supports, e.g. "png",
+            "svg", "webp", "pdf" or "jpg". Defaults to the extension of a path
+            target, or "png" for file-like targets.
+        dpi: Output resolution. Defaults to matplotlib's savefig.dpi.
+        compress_level: PNG zlib compression level from 0 (fastest, largest)
+            to 9 (slowest, smallest). PNG only.
+        quality: WebP quality from 1 to 100. WebP only.
+
+    Raises:
+        ValueError: If the format is unsupported or unavailable, or an option
+            does not apply to the format or is out of range.
+    """
+    if fmt is None:
+        extension = os.path.splitext(target)[1].lstrip(".").lower() if isinstance(target, str) else ""
+        fmt = extension or "png"
+    fmt = fmt.lower()
+    supported = fig.canvas.get_supported_filetypes()
+    if fmt not in supported:
+        _fail(f"Error: Unsupported image format '{fmt}'. Choose from {sorted(supported)}.")
+    if fmt in IMAGE_FORMATS and fmt not in available_image_formats():
+        _fail(f"Error: Image format '{fmt}' requires a Pillow build with {fmt.upper()} support.")
+    if compress_level is not None and (fmt != "png" or not 0 <= compress_level <= 9):
+        _fail(f"Error: compress_level must be between 0 and 9 and applies to PNG only, got {compress_level} for {fmt}.")
+    if quality is not None and (fmt != "webp" or not 1 <= quality <= 100):
+        _fail(f"Error: quality must be between 1 and 100 and applies to WebP only, got {quality} for {fmt}.")
+
+    pil_kwargs = {}
+    if compress_level is not None:
+        pil_kwargs["compress_level"] = compress_level
+    if quality is not None:
+        pil_kwargs["quality"] = quality
+    kwargs = {"pil_kwargs": pil_kwargs} if pil_kwargs else {}
+    fig.savefig(target, format=fmt, dpi=dpi, **kwargs)
+
+
+def generate_chart(plot_type: str, df: pd.DataFrame, x_column: str, y_column: str, title: Optional[str] = None,
+                   output_path: Optional[Union[str, BinaryIO]] = None, template: Optional[FigureTemplate] = None,
+                   fmt: Optional[str] = None, dpi: Optional[float] = None, compress_level: Optional[int] = None,
+                   quality: Optional[int] = None, **options) -> Union[str, BinaryIO]:
+    """
+    Thread-safe counterpart of the generate_* functions.
+
+    Renders the chart with render_figure and saves it through the figure's own
+    Agg canvas, so it can be called from several threads at once.
+
+    Args:
+        plot_type: "bar", "line" or "scatter".
+        df: pandas DataFrame (or DataFrame-like object) containing the data.
+        x_column: Name of the column to use for the x-axis.
+        y_column: Name of the column to use for the y-axis.
+        title: Title of the chart. Defaults to the matching generate_* default.
+        output_path: Path or writable binary file-like object to save the chart
+            image to. Defaults to the matching generate_* default path.
+        template: Optional FigureTemplate whose per-thread figure is reused.
+        fmt, dpi, compress_level, quality: Encoding options, see save_figure.
+        **options: Plot-type specific options, see render_figure.
+
+    Returns:
+        output_path (the default path if none was given).
+
+    Raises:
+        ValueError: See render_figure and save_figure.
+    """
+    fig = render_figure(plot_type, df, x_column, y_column, title=title, template=template, dpi=dpi, **options)
+    if output_path is None:
+        output_path = DEFAULT_OUTPUT_PATHS[plot_type]
+    save_figure(fig, output_path, fmt=fmt, dpi=dpi, compress_level=compress_level, quality=quality)
+    return output_path
+
+
+def chart_bytes(plot_type: str, df: pd.DataFrame, x_column: str, y_column: str, title: Optional[str] = None,
+                fmt: str = "png", dpi: Optional[float] = None, compress_level: Optional[int] = None,
+                quality: Optional[int] = None, template: Optional[FigureTemplate] = None, **options) -> bytes:
+    """
+    Renders a chart and returns the encoded image instead of writing a file.
+
+    This avoids a temporary file round trip when the image is served over the
+    network. To stream into an existing file-like object instead, pass it as
+    output_path to generate_chart.
+
+    Args:
+        plot_type: "bar", "line" or "scatter".
+        df: pandas DataFrame (or DataFrame-like object) containing the data.
+        x_column: Name of the column to use for the x-axis.
+        y_column: Name of the column to use for the y-axis.
+        title: Title of the chart. Defaults to the matching generate_* default.
+        fmt: "png" (default), "svg" or "webp".
+        dpi, compress_level, quality: Encoding options, see save_figure.
+        template: Optional FigureTemplate whose per-thread figure is reused.
+        **options: Plot-type specific options, see render_figure.
+
+    Returns:
+        The encoded image.
+
+    Raises:
+        ValueError: If fmt is not one of IMAGE_FORMATS, or see render_figure
+            and save_figure.
+    """
+    if fmt.lower() not in IMAGE_FORMATS:
+        _fail(f"Error: Unsupported image format '{fmt}'. Choose from {list(IMAGE_FORMATS)}.")
+    buffer = io.BytesIO()
+    generate_chart(plot_type, df, x_column, y_column, title=title, output_path=buffer, template=template,
+                   fmt=fmt, dpi=dpi, compress_level=compress_level, quality=quality, **options)
+    return buffer.getvalue()
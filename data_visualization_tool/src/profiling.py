@@ -0,0 +1,150 @@
+import contextlib
+import cProfile
+import json
+import os
+import sys
+import time
+from typing import Any, Dict, Iterator, List, Optional
+
+# Output formats of Profiler.write.
+PROFILE_FORMATS = ("json", "chrome")
+
+# Bumped when the layout of the JSON profile changes, so tooling aggregating
+# many runs can tell the versions apart.
+PROFILE_VERSION = 1
+
+
+def peak_rss_mb() -> Optional[float]:
+    """
+    Returns the peak resident set size of this process so far, in megabytes.
+
+    Returns None on platforms without the Unix-only resource module, e.g.
+    Windows. It is imported here rather than at module level, so main.py,
+    which always imports this module, still runs there.
+    """
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in kilobytes on Linux and in bytes on macOS.
+    return peak / 1024 ** 2 if sys.platform == "darwin" else peak / 1024
+
+
+class Profiler:
+    """
+    Records the duration and memory high-water mark of the stages of one run.
+
+    Stages are timed with the stage() context manager. A disabled profiler
+    records nothing, so instrumented code does not need to check whether
+    profiling is on. Optionally the whole run is also profiled with cProfile.
+    """
+
+    def __init__(self, enabled: bool = True, cprofile_path: Optional[str] = None,
+                 metadata: Optional[Dict[str, Any]] = None):
+        """
+        Args:
+            enabled: If False, stage() records nothing.
+            cprofile_path: Optional path to write cProfile statistics of the
+                run to, readable with pstats or snakeviz.
+            metadata: Optional JSON-serializable fields stored with the profile,
+                e.g. the command-line arguments.
+        """
+        self.enabled = enabled
+        self.cprofile_path = cprofile_path
+        self.metadata = dict(metadata or {})
+        self.stages: List[Dict[str, Any]] = []
+        self.status = "ok"
+        self._started = time.time()
+        self._start = time.perf_counter()
+        self._end: Optional[float] = None
+        self._cprofile = cProfile.Profile() if enabled and cprofile_path else None
+        if self._cprofile is not None:
+            self._cprofile.enable()
+
+    @contextlib.contextmanager
+    def stage(self, name: str, **fields) -> Iterator[Dict[str, Any]]:
+        """
+        Times a stage of the run.
+
+        Args:
+            name: The stage name, e.g. "parse" or "encode".
+            **fields: Extra fields stored with the stage, e.g. rows=1000.
+
+        Yields:
+            The stage record. Fields only known once the stage has run (such
+            as the number of rows parsed) can be added to it inside the block.
+        """
+        record = {"name": name, **fields}
+        if not self.enabled:
+            yield record
+            return
+        start = time.perf_counter()
+        try:
+            yield record
+        except BaseException:
+            record["failed"] = True
+            raise
+        finally:
+            record["start"] = start - self._start
+            record["seconds"] = time.perf_counter() - start
+            record["peak_rss_mb"] = peak_rss_mb()
+            self.stages.append(record)
+
+    def finish(self, status: str = "ok") -> None:
+        """Ends the run, stopping cProfile and writing its statistics if requested."""
+        if self._end is not None:
+            return
+        self._end = time.perf_counter()
+        self.status = status
+        if self._cprofile is not None:
+            self._cprofile.disable()
+            self._cprofile.dump_stats(self.cprofile_path)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Returns the profile as a JSON-serializable dict."""
+        end = self._end if self._end is not None else time.perf_counter()
+        return {
+            "version": PROFILE_VERSION,
+            "started": self._started,
+            "pid": os.getpid(),
+            "status": self.status,
+            "total_seconds": end - self._start,
+            "peak_rss_mb": peak_rss_mb(),
+            "metadata": self.metadata,
+            "stages": self.stages,
+        }
+
+    def to_chrome_trace(self) -> Dict[str, Any]:
+        """
+        Returns the profile in the Chrome trace-event format.
+
+        The result can be opened in chrome://tracing or Perfetto. Each stage
+        is a complete ("X") event; its extra fields become the event's args.
+        """
+        pid = os.getpid()
+        events = [{"name": "process_name", "ph": "M", "pid": pid, "tid": 0,
+                   "args": {"name": " ".join(str(a) for a in self.metadata.get("argv", [])) or "main.py"}}]
+        for record in self.stages:
+            args = {k: v for k, v in record.items() if k not in ("name", "start", "seconds")}
+            events.append({"name": record["name"], "ph": "X", "pid": pid, "tid": 0,
+                           "ts": record["start"] * 1e6, "dur": record["seconds"] * 1e6, "args": args})
+        summary = {key: value for key, value in self.to_dict().items() if key != "stages"}
+        return {"traceEvents": events, "displayTimeUnit": "ms", "otherData": summary}
+
+    def write(self, output_path: str, fmt: str = "json") -> None:
+        """
+        Writes the profile to output_path.
+
+        Args:
+            output_path: The path of the file to write.
+            fmt: "json" for to_dict, or "chrome" for to_chrome_trace.
+
+        Raises:
+            ValueError: If fmt is not one of PROFILE_FORMATS.
+        """
+        if fmt not in PROFILE_FORMATS:
+            raise ValueError(f"Unknown profile format '{fmt}'. Choose from {list(PROFILE_FORMATS)}.")
+        data = self.to_chrome_trace() if fmt == "chrome" else self.to_dict()
+        with open(output_path, "w") as f:
+            json.dump(data, f, indent=2)
@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+"""
+Thin client for the render server.
+
+It only imports the standard library, so starting it costs a few milliseconds
+instead of the full pandas/matplotlib import time paid by main.py.
+
+Usage:
+    python src/render_client.py [--socket PATH] file_path plot_type x_column y_column [OPTIONS]
+
+All arguments after the optional --socket are the same as main.py's.
+"""
+import json
+import os
+import socket
+import sys
+import tempfile
+from typing import Dict, List, Optional
+
+# Socket used when neither --socket nor the DVT_RENDER_SOCKET environment variable is given.
+DEFAULT_SOCKET_PATH = os.environ.get(
+    "DVT_RENDER_SOCKET",
+    os.path.join(tempfile.gettempdir(), f"data_visualization_tool-{os.getuid()}.sock"),
+)
+
+
+def send_request(message: Dict, socket_path: str = DEFAULT_SOCKET_PATH, timeout: Optional[float] = None) -> Dict:
+    """
+    Sends one request to the render server and returns its decoded response.
+
+    Raises:
+        OSError: If the server cannot be reached.
+    """
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as conn:
+        conn.settimeout(timeout)
+        conn.connect(socket_path)
+        conn.sendall(json.dumps(message).encode() + b"\n")
+        with conn.makefile("rb") as reader:
+            return json.loads(reader.readline())
+
+
+def render(argv: List[str], socket_path: str = DEFAULT_SOCKET_PATH) -> Dict:
+    """Asks the render server to run main.py with argv, relative to the current directory."""
+    return send_request({"argv": argv, "cwd": os.getcwd()}, socket_path)
+
+
+def main():
+    argv = sys.argv[1:]
+    socket_path = DEFAULT_SOCKET_PATH
+    if len(argv) >= 2 and argv[0] == "--socket":
+        socket_path, argv = argv[1], argv[2:]
+
+    try:
+        response = render(argv, socket_path)
+    except OSError as e:
+        print(f"Error: Could not reach the render server at '{socket_path}': {e}")
+        sys.exit(1)
+
+    sys.stdout.write(response.get("output", ""))
+    if response["status"] != "ok":
+        if response.get("error") and response["error"] not in response.get("output", ""):
+            print(f"Error: {response['error']}")
+        sys.exit(1)
+    print(f"Plot saved to {response['output_path']}.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,185 @@
+#!/usr/bin/env python3
+import argparse
+import contextlib
+import io
+import json
+import os
+import socketserver
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, List
+
+import pandas as pd
+
+try:
+    from .data_loader import expand_input_paths
+    from .main import (build_parser, default_output_path, load_data, main_only_options, render_plot,
+                       required_columns, validate_args)
+    from .plotter import generate_line_graph
+    from .render_client import DEFAULT_SOCKET_PATH
+except ImportError:
+    # Fallback for direct execution, e.g. "python src/render_server.py".
+    from data_loader import expand_input_paths
+    from main import (build_parser, default_output_path, load_data, main_only_options, render_plot,
+                      required_columns, validate_args)
+    from plotter import generate_line_graph
+    from render_client import DEFAULT_SOCKET_PATH
+
+# Default number of loaded datasets kept in memory by the server.
+DEFAULT_MAX_DATASETS = 8
+
+# Arguments holding paths that are resolved against the client's working directory.
+PATH_ARGUMENTS = ("file_path", "output_path", "cache_dir")
+
+
+class DatasetCache:
+    """
+    An in-memory LRU cache of loaded datasets.
+
+    Entries are keyed by the path, size and modification time of each input
+    file together with the loading options, so a file that changes on disk is
+    reloaded.
+    """
+
+    def __init__(self, max_entries: int = DEFAULT_MAX_DATASETS):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[tuple, object]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def load(self, args: argparse.Namespace):
+        """Returns the data for args, loading it with main.load_data on a miss."""
+        # Every shard of a directory or glob input takes part in the key.
+        files = tuple((path, os.stat(path).st_size, os.stat(path).st_mtime_ns)
+                      for path in expand_input_paths(args.file_path))
+        key = (files, tuple(required_columns(args)), args.sort_by, args.chunksize, args.cache_dir, args.mmap,
+               args.optimize_memory, args.date_format, args.sample, args.seed, args.stratify_by, args.parser)
+        if key in self._entries:
+            self.hits += 1
+            self._entries.move_to_end(key)
+            return self._entries[key]
+        self.misses += 1
+        df = load_data(args)
+        self._entries[key] = df
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+        return df
+
+
+class RenderServer(socketserver.UnixStreamServer):
+    """
+    A long-lived render server listening on a Unix socket.
+
+    pandas and matplotlib are imported once, and recently used datasets stay
+    loaded, so each request only pays for rendering. Requests are served one
+    at a time because the loader and plotters report errors on stdout, which
+    is captured per request.
+
+    Each request is a single JSON line: {"argv": [...main.py arguments...],
+    "cwd": "/client/working/dir"} or {"command": "shutdown"}. The response is
+    a single JSON line with "status" ("ok" or "error"), "output_path",
+    "error", "output" (what main.py would have printed) and "seconds".
+    """
+
+    def __init__(self, socket_path: str = DEFAULT_SOCKET_PATH, max_datasets: int = DEFAULT_MAX_DATASETS):
+        if os.path.exists(socket_path):
+            # A stale socket from a previous run; bind() fails otherwise.
+            os.remove(socket_path)
+        self.socket_path = socket_path
+        self.datasets = DatasetCache(max_datasets)
+        self.parser = build_parser()
+        self.parser.prog = "main.py"
+        old_umask = os.umask(0o177)
+        try:
+            super().__init__(socket_path, _RequestHandler)
+        finally:
+            os.umask(old_umask)
+
+    def server_close(self) -> None:
+        super().server_close()
+        try:
+            os.remove(self.socket_path)
+        except FileNotFoundError:
+            pass
+
+    def warm_up(self) -> None:
+        """Renders a tiny chart in memory so fonts and backend state are initialised."""
+        df = pd.DataFrame({"x": [0, 1], "y": [0, 1]})
+        with contextlib.redirect_stdout(io.StringIO()):
+            generate_line_graph(df, "x", "y", output_path=io.BytesIO())
+
+    def handle_request_message(self, message: Dict) -> Dict:
+        """Executes one decoded request and returns the response message."""
+        if message.get("command") == "shutdown":
+            # shutdown() blocks until serve_forever returns, so it cannot run on this thread.
+            threading.Thread(target=self.shutdown, daemon=True).start()
+            return {"status": "ok", "output_path": None, "error": None, "output": "", "seconds": 0.0}
+        start = time.perf_counter()
+        output = io.StringIO()
+        response = {"status": "error", "output_path": None, "error": None}
+        with contextlib.redirect_stdout(output), contextlib.redirect_stderr(output):
+            try:
+                args = self._parse_args(message.get("argv", []), message.get("cwd", os.getcwd()))
+                df = self.datasets.load(args)
+                response.update(status="ok", output_path=render_plot(df, args))
+            except Exception as e:
+                response["error"] = str(e)
+        response["output"] = output.getvalue()
+        response["seconds"] = time.perf_counter() - start
+        return response
+
+    def _parse_args(self, argv: List[str], cwd: str) -> argparse.Namespace:
+        try:
+            args = self.parser.parse_args(argv)
+        except SystemExit:
+            # argparse has already written the reason to the captured output.
+            raise ValueError(f"Invalid arguments: {argv}")
+        validate_args(args)
+        unsupported = main_only_options(args)
+        if unsupported:
+            raise ValueError(f"Options {unsupported} are not supported by the render server.")
+        if args.output_path is None:
+            args.output_path = default_output_path(args.plot_type)
+        for name in PATH_ARGUMENTS:
+            value = getattr(args, name)
+            if value is not None and not os.path.isabs(value):
+                setattr(args, name, os.path.join(cwd, value))
+        return args
+
+
+class _RequestHandler(socketserver.StreamRequestHandler):
+
+    def handle(self):
+        line = self.rfile.readline()
+        try:
+            message = json.loads(line)
+        except ValueError as e:
+            response = {"status": "error", "output_path": None, "error": f"Malformed request: {e}",
+                        "output": "", "seconds": 0.0}
+        else:
+            response = self.server.handle_request_message(message)
+        self.wfile.write(json.dumps(response).encode() + b"\n")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Data Visualization Tool render server")
+    parser.add_argument("--socket", type=str, default=DEFAULT_SOCKET_PATH,
+                        help=f"Path of the Unix socket to listen on. Defaults to {DEFAULT_SOCKET_PATH}.")
+    parser.add_argument("--max_datasets", type=int, default=DEFAULT_MAX_DATASETS,
+                        help=f"Number of loaded datasets kept in memory. Defaults to {DEFAULT_MAX_DATASETS}.")
+    args = parser.parse_args()
+
+    server = RenderServer(args.socket, max_datasets=args.max_datasets)
+    server.warm_up()
+    print(f"Render server listening on {args.socket}.")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
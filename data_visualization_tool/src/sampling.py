@@ -0,0 +1,117 @@
+from typing import Optional, Sequence, Union
+
+import numpy as np
+import pandas as pd
+
+
+class ReservoirSampler:
+    """
+    Keeps a seeded random sample of at most n rows of a stream of chunks.
+
+    Every row gets a random key from a generator seeded with seed, and the
+    rows with the n smallest keys are kept (bottom-k sampling), which is a
+    uniform sample without replacement. Memory is bounded by n plus one
+    chunk, whatever the length of the stream. Since the keys only depend on
+    the seed and the position of a row, the sample does not depend on the
+    chunk size, and the samplers of separate files can be merged into a
+    sample of all of them.
+
+    With stratify_by, each distinct value of that column (missing values
+    included) gets an equal share of n // strata rows, so rare groups are not
+    drowned out by frequent ones. Strata with fewer rows than their share are
+    kept whole, so the sample may hold fewer than n rows.
+    """
+
+    def __init__(self, n: int, seed: Union[int, Sequence[int]] = 0, stratify_by: Optional[str] = None):
+        """
+        Args:
+            n: The largest number of rows to keep.
+            seed: Seed of the key generator; the same seed and rows give the same sample.
+            stratify_by: Optional column to sample each distinct value of separately.
+
+        Raises:
+            ValueError: If n is not positive.
+        """
+        if n <= 0:
+            raise ValueError(f"The sample size must be a positive integer, got {n}.")
+        self.n = n
+        self.stratify_by = stratify_by
+        self.rows = 0
+        self._rng = np.random.default_rng(seed)
+        self._frame: Optional[pd.DataFrame] = None
+        self._keys = np.empty(0)
+        # The strata seen so far and, per stratum, the largest kept key once its share is full.
+        self._strata: Optional[pd.Index] = None
+        self._limits = np.empty(0)
+
+    def update(self, df: pd.DataFrame) -> None:
+        """Adds the rows of one chunk."""
+        if self.stratify_by is not None and self.stratify_by not in df.columns:
+            raise ValueError(f"The stratification column '{self.stratify_by}' is not among the columns read.")
+        keys = self._rng.random(len(df))
+        self.rows += len(df)
+        if self.stratify_by is None and len(self._keys) >= self.n:
+            # Only rows beating the largest kept key can enter the sample.
+            candidates = keys < self._keys.max()
+        elif self.stratify_by is not None and self._strata is not None:
+            # Likewise per stratum, for strata that have filled their share.
+            positions = self._strata.get_indexer(df[self.stratify_by])
+            candidates = keys < np.where(positions >= 0, self._limits[positions], np.inf)
+        else:
+            candidates = None
+        if candidates is not None:
+            if not candidates.any():
+                return
+            df, keys = df[candidates], keys[candidates]
+        self._add(df, keys)
+
+    def merge(self, other: "ReservoirSampler") -> None:
+        """Adds the sample of other, a sampler of different rows with the same n and stratify_by."""
+        self.rows += other.rows
+        if other._frame is not None:
+            self._add(other._frame, other._keys)
+
+    def result(self) -> pd.DataFrame:
+        """Returns the sampled rows in the order they were streamed in."""
+        if self._frame is None:
+            return pd.DataFrame()
+        frame = self._frame
+        if len(frame) > self.n:
+            # There are more strata than rows in the sample.
+            frame = frame[_smallest(self._keys, self.n)]
+        return frame.reset_index(drop=True)
+
+    def _add(self, df: pd.DataFrame, keys: np.ndarray) -> None:
+        frame = df if self._frame is None else pd.concat([self._frame, df], ignore_index=True)
+        keys = np.concatenate([self._keys, keys])
+        keep = _smallest(keys, self.n) if self.stratify_by is None else self._stratified(frame, keys)
+        if not keep.all():
+            frame, keys = frame[keep], keys[keep]
+        self._frame, self._keys = frame, keys
+
+    def _stratified(self, frame: pd.DataFrame, keys: np.ndarray) -> np.ndarray:
+        """Returns a mask of the rows among the smallest n // strata keys of their stratum."""
+        codes, strata = pd.factorize(frame[self.stratify_by], use_na_sentinel=False)
+        # Shares only shrink as strata appear, and the smallest keys of a
+        # stratum include those of any smaller share, so pruning early is exact.
+        share = max(1, self.n // len(strata))
+        order = np.lexsort((keys, codes))
+        sorted_codes = codes[order]
+        rank = np.arange(len(order)) - np.searchsorted(sorted_codes, sorted_codes)
+        keep = np.zeros(len(keys), dtype=bool)
+        keep[order[rank < share]] = True
+        counts = np.bincount(codes, minlength=len(strata))
+        last = order[np.searchsorted(sorted_codes, np.arange(len(strata))) + np.minimum(counts, share) - 1]
+        self._strata = pd.Index(strata)
+        self._limits = np.where(counts >= share, keys[last], np.inf)
+        return keep
+
+
+def _smallest(keys: np.ndarray, k: int) -> np.ndarray:
+    """Returns a mask of the k smallest keys, keeping the rows in their order."""
+    keep = np.zeros(len(keys), dtype=bool)
+    if len(keys) <= k:
+        keep[:] = True
+    else:
+        keep[np.argpartition(keys, k - 1)[:k]] = True
+    return keep
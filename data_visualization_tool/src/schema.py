@@ -0,0 +1,286 @@
+import bz2
+import csv
+import gzip
+import io
+import itertools
+import lzma
+import re
+import zipfile
+from typing import Dict, Iterable, List, Optional, TextIO, Tuple
+
+# Number of data rows read after the header to infer the column kinds.
+DEFAULT_SAMPLE_ROWS = 1_000
+
+# Text columns whose sample has at most this many distinct values per
+# non-missing value are worth parsing as categoricals.
+DEFAULT_CATEGORY_RATIO = 0.5
+
+# Leading bytes identifying compressed files, mapped to pandas compression names.
+# A bz2 stream starts with "BZh", a block size from 1 to 9 and the magic of its
+# first block, or of the end of the stream if it is empty. "BZh" alone is also
+# how a CSV header such as "BZhour,value" starts.
+COMPRESSION_MAGIC = {
+    b"\x1f\x8b": "gzip",
+    **{b"BZh%d" % level + block: "bz2" for level in range(1, 10) for block in (b"1AY&SY", b"\x17rE8P\x90")},
+    b"\xfd7zXZ\x00": "xz",
+    b"\x28\xb5\x2f\xfd": "zstd",
+    b"PK\x03\x04": "zip",
+}
+
+# Column kinds reported by probe_schema. "empty" means the sample holds only
+# missing values, so the kind of the column is unknown.
+COLUMN_KINDS = ("empty", "integer", "float", "boolean", "string")
+
+# Kinds pandas parses into numeric (or boolean) columns.
+NUMERIC_KINDS = ("integer", "float", "boolean")
+
+# Strings pandas reads as missing values by default.
+NA_VALUES = frozenset([
+    "", "#N/A", "#N/A N/A", "#NA", "-1.#IND", "-1.#QNAN", "-NaN", "-nan", "1.#IND", "1.#QNAN",
+    "<NA>", "N/A", "NA", "NULL", "NaN", "None", "n/a", "nan", "null",
+])
+
+# Strings pandas reads as booleans by default.
+_BOOLEAN_VALUES = frozenset(["True", "TRUE", "true", "False", "FALSE", "false"])
+
+# Numbers as pandas' C parser reads them: ASCII digits with an optional sign,
+# padded by spaces or tabs. Python's int() and float() also accept "1_000"
+# and non-ASCII digits, which pandas keeps as text.
+_INTEGER_RE = re.compile(r"[ \t]*[+-]?[0-9]+[ \t]*")
+_FLOAT_RE = re.compile(r"[ \t]*[+-]?(?:(?:[0-9]+\.?[0-9]*|\.[0-9]+)(?:[eE][+-]?[0-9]+)?|(?i:inf|infinity))[ \t]*")
+
+# Integers outside this range are kept as Python objects by pandas, not numbers.
+_INTEGER_RANGE = range(-2 ** 63, 2 ** 64)
+
+
+def detect_compression(file_path: str) -> Optional[str]:
+    """
+    Detects the compression of a file from its leading bytes.
+
+    Unlike pandas' inference from the file extension, this also recognizes
+    compressed files with a missing or misleading extension.
+
+    Args:
+        file_path: The path to the file.
+
+    Returns:
+        "gzip", "bz2", "xz", "zstd" or "zip", or None for an uncompressed file.
+
+    Raises:
+        FileNotFoundError: If the file does not exist.
+    """
+    with open(file_path, "rb") as f:
+        head = f.read(max(len(magic) for magic in COMPRESSION_MAGIC))
+    for magic, compression in COMPRESSION_MAGIC.items():
+        if head.startswith(magic):
+            return compression
+    return None
+
+
+def open_text(file_path: str) -> TextIO:
+    """
+    Opens a possibly compressed CSV file for reading as text.
+
+    Args:
+        file_path: The path to the file. gzip, bz2, xz, zstd (with the
+            zstandard package) and single-file zip archives are decompressed
+            on the fly.
+
+    Returns:
+        A text stream, to be closed by the caller.
+
+    Raises:
+        FileNotFoundError: If the file does not exist.
+        ValueError: If the file cannot be decompressed here.
+    """
+    compression = detect_compression(file_path)
+    text = {"encoding": "utf-8-sig", "errors": "replace", "newline": ""}
+    if compression == "gzip":
+        return gzip.open(file_path, "rt", **text)
+    if compression == "bz2":
+        return bz2.open(file_path, "rt", **text)
+    if compression == "xz":
+        return lzma.open(file_path, "rt", **text)
+    if compression == "zstd":
+        try:
+            import zstandard
+        except ImportError:
+            raise ValueError(f"Reading the zstd-compressed file '{file_path}' requires the zstandard package.")
+        return io.TextIOWrapper(zstandard.open(file_path, "rb"), **text)
+    if compression == "zip":
+        archive = zipfile.ZipFile(file_path)
+        names = archive.namelist()
+        if len(names) != 1:
+            archive.close()
+            raise ValueError(f"The zip archive '{file_path}' must contain exactly one file, found {len(names)}.")
+        return io.TextIOWrapper(archive.open(names[0]), **text)
+    return open(file_path, "r", **text)
+
+
+def probe_schema(file_path: str, sample_rows: int = DEFAULT_SAMPLE_ROWS) -> Dict[str, str]:
+    """
+    Reads the header and the first rows of a CSV file and infers its column kinds.
+
+    Only the standard library is used, so a request naming a missing column
+    or plotting a text column can be rejected in milliseconds, before pandas
+    is imported or the file is parsed.
+
+    Args:
+        file_path: The path to the (possibly compressed) CSV file.
+        sample_rows: Number of data rows to infer the kinds from.
+
+    Returns:
+        A mapping from column name to one of COLUMN_KINDS, in file order.
+        Column names follow pandas: unnamed columns become "Unnamed: i" and
+        repeated names get a ".1", ".2", ... suffix. A "string" column holds
+        text in the sample, so pandas cannot parse it as numbers either; the
+        other kinds only describe the sample.
+
+    Raises:
+        FileNotFoundError: If the CSV file is not found at the specified path.
+        ValueError: If the file is empty or cannot be decompressed.
+    """
+    columns, rows = _read_sample(file_path, sample_rows)
+    kinds = ["empty"] * len(columns)
+    for row in rows:
+        for j, value in enumerate(row):
+            if kinds[j] != "string":
+                kinds[j] = _widen(kinds[j], _value_kind(value))
+    return dict(zip(columns, kinds))
+
+
+def category_columns(file_path: str, columns: Optional[Iterable[str]] = None,
+                     max_ratio: float = DEFAULT_CATEGORY_RATIO, sample_rows: int = DEFAULT_SAMPLE_ROWS) -> List[str]:
+    """
+    Picks the text columns of a CSV file that are worth parsing as categoricals.
+
+    A categorical stores each distinct string once plus a small integer code
+    per row, so a low-cardinality column such as a country or status label
+    takes a fraction of the memory of one string object per row.
+
+    Args:
+        file_path: The path to the (possibly compressed) CSV file.
+        columns: Optional columns to consider. All columns are considered if None.
+        max_ratio: Largest ratio of distinct to non-missing values in the
+            sample for a column to be picked.
+        sample_rows: Number of data rows to sample, see probe_schema.
+
+    Returns:
+        The picked columns that exist in the file, in the order of columns.
+
+    Raises:
+        FileNotFoundError: If the CSV file is not found at the specified path.
+        ValueError: If the file is empty or cannot be decompressed.
+    """
+    names, rows = _read_sample(file_path, sample_rows)
+    picked = []
+    for column in (names if columns is None else columns):
+        if column not in names:
+            continue
+        j = names.index(column)
+        values = [row[j] for row in rows if j < len(row) and row[j] not in NA_VALUES]
+        if any(_value_kind(value) == "string" for value in values) and len(set(values)) <= max_ratio * len(values):
+            picked.append(column)
+    return picked
+
+
+def check_schema(schema: Dict[str, str], file_path: str, columns: Iterable[str],
+                 numeric_columns: Iterable[str] = ()) -> None:
+    """
+    Checks that a probed file can serve a plot request.
+
+    Args:
+        schema: The result of probe_schema for file_path.
+        file_path: The probed file, used in error messages.
+        columns: Columns the request reads.
+        numeric_columns: Columns the request needs numeric values in.
+
+    Raises:
+        ValueError: If a column is missing, or a numeric column holds text.
+    """
+    missing = [column for column in columns if column not in schema]
+    if missing:
+        error_msg = f"Error: Columns {missing} not found in '{file_path}'. Available columns: {list(schema)}"
+        print(error_msg)
+        raise ValueError(error_msg)
+    text = [column for column in dict.fromkeys(numeric_columns) if schema.get(column) == "string"]
+    if text:
+        error_msg = f"Error: Columns {text} of '{file_path}' hold text, but this plot needs numeric values."
+        print(error_msg)
+        raise ValueError(error_msg)
+
+
+def dtype_hints(schema: Dict[str, str], columns: Optional[Iterable[str]] = None) -> Dict[str, type]:
+    """
+    Returns the read_csv dtypes that a probed schema determines for certain.
+
+    Text in the sample makes pandas parse the whole column as text, so such
+    columns are read as str without pandas first trying to parse them as
+    numbers. Numeric kinds are not passed on, since rows past the sample may
+    still widen or turn them into text.
+
+    Args:
+        schema: The result of probe_schema.
+        columns: Optional columns to restrict the hints to.
+
+    Returns:
+        A mapping from column name to str, suitable for read_csv's dtype argument.
+    """
+    names = schema if columns is None else [column for column in columns if column in schema]
+    return {column: str for column in names if schema[column] == "string"}
+
+
+def _read_sample(file_path: str, sample_rows: int) -> Tuple[List[str], List[List[str]]]:
+    """Returns the pandas column names of a CSV file and its first sample_rows non-blank rows."""
+    try:
+        with open_text(file_path) as f:
+            rows = csv.reader(f)
+            header = next((row for row in rows if row), None)
+            if header is None:
+                raise ValueError(f"The file '{file_path}' is empty.")
+            columns = _column_names(header)
+            sample = [row[:len(columns)] for row in itertools.islice((row for row in rows if row), sample_rows)]
+    except FileNotFoundError:
+        print(f"Error: The file '{file_path}' was not found.")
+        raise
+    except (ValueError, OSError, EOFError, zipfile.BadZipFile, lzma.LZMAError) as e:
+        error_msg = f"Error: Could not read the header of '{file_path}': {e}"
+        print(error_msg)
+        raise ValueError(error_msg)
+    return columns, sample
+
+
+def _column_names(header: List[str]) -> List[str]:
+    names: List[str] = []
+    seen = set()
+    for i, name in enumerate(header):
+        name = name or f"Unnamed: {i}"
+        unique, n = name, 0
+        while unique in seen:
+            n += 1
+            unique = f"{name}.{n}"
+        seen.add(unique)
+        names.append(unique)
+    return names
+
+
+def _value_kind(value: str) -> str:
+    if value in NA_VALUES:
+        return "empty"
+    if value in _BOOLEAN_VALUES:
+        return "boolean"
+    if _INTEGER_RE.fullmatch(value):
+        return "integer" if int(value) in _INTEGER_RANGE else "string"
+    if _FLOAT_RE.fullmatch(value):
+        return "float"
+    return "string"
+
+
+def _widen(kind: str, value_kind: str) -> str:
+    if kind == "empty" or kind == value_kind:
+        return value_kind
+    if value_kind == "empty":
+        return kind
+    if {kind, value_kind} == {"integer", "float"}:
+        return "float"
+    return "string"
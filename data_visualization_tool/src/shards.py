@@ -0,0 +1,42 @@
+import glob
+import os
+from typing import List
+
+# Characters that make an input path a glob pattern.
+_GLOB_CHARACTERS = "*?["
+
+
+def is_sharded_input(file_path: str) -> bool:
+    """Returns True if file_path names a directory or a glob pattern rather than one file."""
+    if os.path.isdir(file_path):
+        return True
+    return not os.path.exists(file_path) and any(c in file_path for c in _GLOB_CHARACTERS)
+
+
+def expand_input_paths(file_path: str) -> List[str]:
+    """
+    Expands an input path into the list of files it names.
+
+    Args:
+        file_path: A file, a directory (all non-hidden files directly inside
+            it), or a glob pattern such as "data/2024-*.csv.gz" ("**" matches
+            nested directories).
+
+    Returns:
+        The matching files in sorted order. A plain file path is returned as is.
+
+    Raises:
+        FileNotFoundError: If the path does not exist or matches no files.
+    """
+    if not is_sharded_input(file_path):
+        if not os.path.exists(file_path):
+            raise FileNotFoundError(f"The file '{file_path}' was not found.")
+        return [file_path]
+    if os.path.isdir(file_path):
+        paths = [os.path.join(file_path, name) for name in os.listdir(file_path) if not name.startswith(".")]
+    else:
+        paths = glob.glob(file_path, recursive=True)
+    paths = sorted(path for path in paths if os.path.isfile(path))
+    if not paths:
+        raise FileNotFoundError(f"No input files match '{file_path}'.")
+    return paths
@@ -0,0 +1,179 @@
+import unittest
+import os
+import sys
+import warnings
+
+import numpy as np
+import pandas as pd
+
+# Adjust import path for aggregation based on execution context
+try:
+    from data_visualization_tool.src.aggregation import (aggregate_categories, merge_partial_aggregates,
+        partial_aggregate, MERGEABLE_AGGREGATIONS, QuantileSketch, StreamingAggregator)
+except ImportError:
+    sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+    from aggregation import (aggregate_categories, merge_partial_aggregates, partial_aggregate,
+        MERGEABLE_AGGREGATIONS, QuantileSketch, StreamingAggregator)
+
+
+class TestAggregateCategories(unittest.TestCase):
+
+    def setUp(self):
+        """Set up rows with repeated categories."""
+        self.df = pd.DataFrame({
+            'category': ['A', 'B', 'A', 'C', 'B', 'A', 'D'],
+            'value': [1, 10, 2, 5, 20, 3, 4],
+        })
+
+    def test_sum(self):
+        """Test summing values per category."""
+        result = aggregate_categories(self.df, 'category', 'value', agg='sum')
+        self.assertEqual(result['category'].tolist(), ['A', 'B', 'C', 'D'])
+        self.assertEqual(result['value'].tolist(), [6, 30, 5, 4])
+
+    def test_other_aggregations(self):
+        """Test count, mean, min, max and median per category."""
+        expected = {
+            'count': [3, 2, 1, 1],
+            'mean': [2.0, 15.0, 5.0, 4.0],
+            'min': [1, 10, 5, 4],
+            'max': [3, 20, 5, 4],
+            'median': [2.0, 15.0, 5.0, 4.0],
+            'p75': [2.5, 17.5, 5.0, 4.0],
+        }
+        for agg, values in expected.items():
+            with self.subTest(agg=agg):
+                result = aggregate_categories(self.df, 'category', 'value', agg=agg)
+                self.assertEqual(result['value'].tolist(), values)
+
+    def test_top_n_with_other_bucket(self):
+        """Test that categories outside the top N are aggregated into 'Other'."""
+        result = aggregate_categories(self.df, 'category', 'value', agg='sum', top_n=2)
+        self.assertEqual(result['category'].tolist(), ['B', 'A', 'Other'])
+        self.assertEqual(result['value'].tolist(), [30, 6, 9])
+
+    def test_top_n_other_uses_raw_rows(self):
+        """Test that the 'Other' bucket aggregates raw rows, not per-category results."""
+        result = aggregate_categories(self.df, 'category', 'value', agg='mean', top_n=1)
+        self.assertEqual(result['value'].tolist(), [15.0, 3.0])
+
+    def test_invalid_arguments(self):
+        """Test that an unknown aggregation or a non-positive top_n raises ValueError."""
+        with self.assertRaises(ValueError):
+            aggregate_categories(self.df, 'category', 'value', agg='bogus')
+        with self.assertRaises(ValueError):
+            aggregate_categories(self.df, 'category', 'value', top_n=0)
+
+
+    def test_merged_shards_match_single_pass(self):
+        """Test that merging per-shard statistics equals aggregating all rows at once."""
+        shards = [self.df.iloc[:2], self.df.iloc[2:5], self.df.iloc[5:]]
+        partials = pd.concat([partial_aggregate(shard, 'category', 'value') for shard in shards], ignore_index=True)
+        for agg in MERGEABLE_AGGREGATIONS:
+            for top_n in (None, 2):
+                with self.subTest(agg=agg, top_n=top_n):
+                    pd.testing.assert_frame_equal(
+                        merge_partial_aggregates(partials, 'category', 'value', agg=agg, top_n=top_n),
+                        aggregate_categories(self.df, 'category', 'value', agg=agg, top_n=top_n))
+        with self.assertRaises(ValueError):
+            merge_partial_aggregates(partials, 'category', 'value', agg='median')
+
+
+class TestQuantileSketch(unittest.TestCase):
+
+    def test_quantiles_within_relative_accuracy(self):
+        """Test that merged sketches answer quantiles within their relative accuracy."""
+        rng = np.random.default_rng(0)
+        values = np.concatenate([rng.lognormal(3, 2, 20000), -rng.lognormal(1, 1, 5000), np.zeros(100), [np.nan]])
+        first, second = QuantileSketch(0.01), QuantileSketch(0.01)
+        first.add(values[:10000])
+        second.add(values[10000:])
+        first.merge(second)
+        self.assertEqual(first.count, len(values) - 1)
+        finite = values[~np.isnan(values)]
+        for q in (0, 0.01, 0.25, 0.5, 0.9, 0.99, 1):
+            with self.subTest(q=q):
+                exact = np.quantile(finite, q)
+                self.assertLessEqual(abs(first.quantile(q) - exact), 0.01 * abs(exact))
+
+    def test_quantiles_interpolate_between_ranks(self):
+        """Test that quantiles of even-length inputs interpolate between neighbouring values like pandas."""
+        for values in ([1, 100], [10, 20, 30, 1000], [-5, 0, 3, 8]):
+            sketch = QuantileSketch(0.01)
+            sketch.add(values)
+            for q in (0.25, 0.5, 0.9):
+                with self.subTest(values=values, q=q):
+                    exact = pd.Series(values, dtype=float).quantile(q)
+                    self.assertLessEqual(abs(sketch.quantile(q) - exact), 0.01 * max(abs(v) for v in values))
+
+    def test_infinite_values(self):
+        """Test that infinite values are counted exactly instead of falling into a finite bucket."""
+        sketch = QuantileSketch(0.01)
+        with warnings.catch_warnings():
+            warnings.simplefilter('error')
+            sketch.add([1, np.inf, 2, -np.inf])
+        self.assertEqual(sketch.count, 4)
+        self.assertEqual(sketch.quantile(1), np.inf)
+        self.assertEqual(sketch.quantile(0), -np.inf)
+        self.assertAlmostEqual(sketch.quantile(0.5), 1.5, delta=0.015)
+        self.assertEqual(sketch.quantile(0.99), np.inf)
+
+    def test_empty_sketch_and_invalid_arguments(self):
+        """Test that an empty sketch has no quantiles and invalid arguments raise ValueError."""
+        self.assertTrue(np.isnan(QuantileSketch().quantile(0.5)))
+        with self.assertRaises(ValueError):
+            QuantileSketch(relative_accuracy=0)
+        with self.assertRaises(ValueError):
+            QuantileSketch().quantile(1.5)
+        with self.assertRaises(ValueError):
+            QuantileSketch(0.01).merge(QuantileSketch(0.02))
+
+
+class TestStreamingAggregator(unittest.TestCase):
+
+    def setUp(self):
+        """Set up rows with skewed categories, split into chunks."""
+        rng = np.random.default_rng(1)
+        self.df = pd.DataFrame({
+            'category': rng.choice(['A', 'B', 'C', 'D', 'E'], size=5000, p=[0.4, 0.3, 0.15, 0.1, 0.05]),
+            'value': rng.lognormal(2, 1, size=5000),
+        })
+        self.chunks = [self.df.iloc[i:i + 700] for i in range(0, len(self.df), 700)]
+
+    def test_mergeable_aggregations_are_exact(self):
+        """Test that folding chunks equals aggregating all rows at once."""
+        aggregator = StreamingAggregator('category', 'value')
+        for chunk in self.chunks:
+            aggregator.update(chunk)
+        self.assertEqual(aggregator.rows, len(self.df))
+        for agg in MERGEABLE_AGGREGATIONS:
+            for top_n in (None, 2):
+                with self.subTest(agg=agg, top_n=top_n):
+                    pd.testing.assert_frame_equal(
+                        aggregator.result(agg, top_n=top_n),
+                        aggregate_categories(self.df, 'category', 'value', agg=agg, top_n=top_n))
+
+    def test_quantiles_from_merged_aggregators(self):
+        """Test that quantile aggregations of merged aggregators are approximately exact."""
+        first = StreamingAggregator('category', 'value', sketch=True)
+        second = StreamingAggregator('category', 'value', sketch=True)
+        for i, chunk in enumerate(self.chunks):
+            (first if i % 2 else second).update(chunk)
+        first.merge(second)
+        for agg in ('median', 'p90'):
+            for top_n in (None, 3):
+                with self.subTest(agg=agg, top_n=top_n):
+                    result = first.result(agg, top_n=top_n)
+                    expected = aggregate_categories(self.df, 'category', 'value', agg=agg, top_n=top_n)
+                    self.assertEqual(result['category'].tolist(), expected['category'].tolist())
+                    np.testing.assert_allclose(result['value'], expected['value'], rtol=0.03)
+
+    def test_quantiles_need_sketches(self):
+        """Test that a quantile of an aggregator without sketches raises ValueError."""
+        aggregator = StreamingAggregator('category', 'value')
+        aggregator.update(self.df)
+        with self.assertRaises(ValueError):
+            aggregator.result('median')
+
+if __name__ == '__main__':
+    unittest.main()
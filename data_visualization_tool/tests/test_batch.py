@@ -0,0 +1,110 @@
+import unittest
+from unittest.mock import patch
+import json
+import os
+import shutil
+import sys
+import tempfile
+
+# Adjust import path for batch based on execution context
+try:
+    from data_visualization_tool.src import batch
+except ImportError:
+    sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+    import batch
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+VALID_DATA_PATH = os.path.join(BASE_DIR, "sample_data", "valid_data.csv")
+
+
+class TestBatch(unittest.TestCase):
+
+    def setUp(self):
+        """Set up a scratch directory for manifests and plot outputs."""
+        self.tmp_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        """Remove the scratch directory."""
+        shutil.rmtree(self.tmp_dir, ignore_errors=True)
+
+    def _output(self, name):
+        return os.path.join(self.tmp_dir, name)
+
+    def test_load_manifest_json_and_csv(self):
+        """Test that JSON and CSV manifests yield the same jobs."""
+        jobs = [{"file_path": VALID_DATA_PATH, "plot_type": "bar", "x_column": "name",
+                 "y_column": "value1", "top_n": "2", "mmap": False}]
+        json_path = self._output("manifest.json")
+        with open(json_path, "w") as f:
+            json.dump({"jobs": jobs}, f)
+        csv_path = self._output("manifest.csv")
+        with open(csv_path, "w") as f:
+            f.write("file_path,plot_type,x_column,y_column,top_n,mmap,title\n")
+            f.write(f"{VALID_DATA_PATH},bar,name,value1,2,false,\n")
+        self.assertEqual(batch.load_manifest(json_path), jobs)
+        self.assertEqual(batch.load_manifest(csv_path), jobs)
+
+    def test_load_manifest_unsupported_format(self):
+        """Test that an unknown manifest extension raises ValueError."""
+        path = self._output("manifest.txt")
+        open(path, "w").close()
+        with self.assertRaises(ValueError):
+            batch.load_manifest(path)
+
+    def test_job_to_args_validates_options(self):
+        """Test that jobs are validated by main.py's parser."""
+        args = batch.job_to_args({"file_path": "f.csv", "plot_type": "line", "x_column": "a",
+                                  "y_column": "b", "max_points": 100})
+        self.assertEqual(args.max_points, 100)
+        args = batch.job_to_args({"file_path": "f.csv", "plot_type": "line", "x_column": "a",
+                                  "y_column": "b", "extra_y": ["c", "d"], "facet": "e"})
+        self.assertEqual(batch.required_columns(args), ["a", "b", "c", "d", "e"])
+        with self.assertRaises(ValueError):
+            batch.job_to_args({"file_path": "f.csv", "plot_type": "line", "x_column": "a"})
+        with self.assertRaises(ValueError):
+            batch.job_to_args({"file_path": "f.csv", "plot_type": "pie", "x_column": "a", "y_column": "b"})
+        with self.assertRaises(ValueError):
+            batch.job_to_args({"file_path": "f.csv", "plot_type": "line", "x_column": "a", "y_column": "b",
+                               "parser": "numpy", "chunksize": 100})
+        # The option combinations main.py rejects are rejected in jobs too.
+        for options in ({"mmap": True, "cache_dir": "c", "sort_by": "a"}, {"stratify_by": "a"},
+                        {"downsample": "lttb", "resample": "mean"}, {"max_points": 0}, {"top_n": 0},
+                        {"resample": "mean", "max_points": -1},
+                        {"downsample": "lttb", "max_points": 2}):
+            with self.subTest(options=options):
+                with self.assertRaises(ValueError):
+                    batch.job_to_args({"file_path": "f.csv", "plot_type": "line", "x_column": "a", "y_column": "b",
+                                       **options})
+
+    def test_run_batch_loads_each_file_once(self):
+        """Test that jobs sharing an input file share one load of the union of their columns."""
+        jobs = [
+            {"file_path": VALID_DATA_PATH, "plot_type": "bar", "x_column": "name",
+             "y_column": "value1", "output_path": self._output("bar.png")},
+            {"file_path": VALID_DATA_PATH, "plot_type": "line", "x_column": "id",
+             "y_column": "value2", "output_path": self._output("line.png")},
+            {"file_path": VALID_DATA_PATH, "plot_type": "scatter", "x_column": "id",
+             "y_column": "missing", "output_path": self._output("scatter.png")},
+        ]
+        with patch.object(batch, "load_data", wraps=batch.load_data) as mock_load:
+            results = batch.run_batch(jobs)
+        mock_load.assert_called_once()
+        self.assertEqual(mock_load.call_args[1]["columns"], ["name", "value1", "id", "value2"])
+        self.assertEqual([r["status"] for r in results], ["ok", "ok", "error"])
+        self.assertTrue(os.path.exists(self._output("bar.png")))
+        self.assertTrue(os.path.exists(self._output("line.png")))
+
+    def test_run_batch_fail_fast(self):
+        """Test that fail_fast skips the jobs after the first failure."""
+        jobs = [
+            {"file_path": os.path.join(self.tmp_dir, "missing.csv"), "plot_type": "bar",
+             "x_column": "a", "y_column": "b"},
+            {"file_path": VALID_DATA_PATH, "plot_type": "bar", "x_column": "name",
+             "y_column": "value1", "output_path": self._output("bar.png")},
+        ]
+        results = batch.run_batch(jobs, fail_fast=True)
+        self.assertEqual([r["status"] for r in results], ["error", "skipped"])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,64 @@
+import unittest
+import os
+import shutil
+import sys
+import tempfile
+
+import pandas as pd
+
+BENCHMARKS_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "benchmarks")
+sys.path.insert(0, BENCHMARKS_DIR)
+from generate_data import COLUMNS, generate_csv  # noqa: E402
+from run_benchmarks import STAGES, compare_to_baseline, measure_case  # noqa: E402
+
+
+def results(seconds, rss):
+    return {"results": [{"rows": 1000, "plot_type": "line",
+                         "stages": {"load": {"seconds": seconds, "peak_rss_mb": rss}}}]}
+
+
+class TestBenchmarks(unittest.TestCase):
+
+    def setUp(self):
+        """Set up a scratch directory for generated datasets."""
+        self.tmp_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        """Remove the scratch directory."""
+        shutil.rmtree(self.tmp_dir, ignore_errors=True)
+
+    def test_generate_csv_is_deterministic(self):
+        """Test that the generator writes the expected columns and is reproducible per seed."""
+        first = generate_csv(os.path.join(self.tmp_dir, "a.csv"), 500, seed=1)
+        second = generate_csv(os.path.join(self.tmp_dir, "b.csv"), 500, seed=1)
+        df = pd.read_csv(first, parse_dates=["timestamp"])
+        self.assertEqual(df.columns.tolist(), list(COLUMNS))
+        self.assertEqual(len(df), 500)
+        self.assertEqual(df["timestamp"].iloc[1] - df["timestamp"].iloc[0], pd.Timedelta(seconds=1))
+        with open(first, "rb") as a, open(second, "rb") as b:
+            self.assertEqual(a.read(), b.read())
+
+    def test_measure_case_reports_every_stage(self):
+        """Test that a case run in a subprocess reports time and peak memory for each stage."""
+        file_path = generate_csv(os.path.join(self.tmp_dir, "data.csv"), 200)
+        stages = measure_case(file_path, "scatter")
+        self.assertEqual(list(stages), list(STAGES))
+        for metrics in stages.values():
+            self.assertGreaterEqual(metrics["seconds"], 0)
+            self.assertGreater(metrics["peak_rss_mb"], 0)
+
+    def test_compare_to_baseline(self):
+        """Test that only increases above both the relative and absolute thresholds are flagged."""
+        baseline = results(1.0, 100.0)
+        self.assertEqual(compare_to_baseline(results(1.2, 110.0), baseline), [])
+        self.assertEqual(compare_to_baseline(results(0.5, 50.0), baseline), [])
+        regressions = compare_to_baseline(results(2.0, 200.0), baseline)
+        self.assertEqual([(r["stage"], r["metric"]) for r in regressions],
+                         [("load", "seconds"), ("load", "peak_rss_mb")])
+        self.assertAlmostEqual(regressions[0]["change"], 1.0)
+        # Tiny absolute changes are noise even when they are large relative ones.
+        self.assertEqual(compare_to_baseline(results(0.002, 100.0), results(0.001, 100.0)), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
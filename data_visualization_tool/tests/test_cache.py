@@ -0,0 +1,106 @@
+import unittest
+import os
+import shutil
+import sys
+import tempfile
+
+import numpy as np
+import pandas as pd
+
+# Adjust import path for cache based on execution context
+try:
+    from data_visualization_tool.src.cache import FrameCache, file_fingerprint
+    from data_visualization_tool.src.data_loader import load_csv
+except ImportError:
+    sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+    from cache import FrameCache, file_fingerprint
+    from data_loader import load_csv
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+VALID_DATA_PATH = os.path.join(BASE_DIR, "sample_data", "valid_data.csv")
+
+
+class TestFrameCache(unittest.TestCase):
+
+    def setUp(self):
+        """Set up a scratch directory holding the cache and a copy of the sample data."""
+        self.tmp_dir = tempfile.mkdtemp()
+        self.cache_dir = os.path.join(self.tmp_dir, "cache")
+        self.csv_path = os.path.join(self.tmp_dir, "data.csv")
+        shutil.copy(VALID_DATA_PATH, self.csv_path)
+
+    def tearDown(self):
+        """Remove the scratch directory."""
+        shutil.rmtree(self.tmp_dir, ignore_errors=True)
+
+    def test_round_trip(self):
+        """Test that a stored frame is returned unchanged on a warm load."""
+        cache = FrameCache(self.cache_dir)
+        df = pd.read_csv(self.csv_path)
+        df.loc[1, 'name'] = np.nan
+        self.assertIsNone(cache.get(self.csv_path))
+        self.assertTrue(cache.put(self.csv_path, None, df))
+        pd.testing.assert_frame_equal(cache.get(self.csv_path), df)
+
+    def test_projection_is_part_of_key(self):
+        """Test that different column projections are cached separately."""
+        cache = FrameCache(self.cache_dir)
+        cache.put(self.csv_path, ['id'], pd.read_csv(self.csv_path, usecols=['id']))
+        self.assertIsNone(cache.get(self.csv_path, ['value1']))
+        self.assertIsNotNone(cache.get(self.csv_path, ['id']))
+
+    def test_memory_mapped_numeric_columns(self):
+        """Test that numeric columns can be returned memory-mapped."""
+        cache = FrameCache(self.cache_dir)
+        df = pd.read_csv(self.csv_path, usecols=['value1', 'value2'])
+        cache.put(self.csv_path, ['value1', 'value2'], df)
+        cached = cache.get(self.csv_path, ['value1', 'value2'], mmap_mode='r')
+        self.assertEqual(cached.columns.tolist(), ['value1', 'value2'])
+        for name in ['value1', 'value2']:
+            np.testing.assert_array_equal(cached[name].to_numpy(), df[name].to_numpy())
+
+    def test_categorical_columns(self):
+        """Test that categorical columns are stored as codes and keyed by the parse options."""
+        cache = FrameCache(self.cache_dir)
+        df = pd.read_csv(self.csv_path, usecols=['name', 'value1'], dtype={'name': 'category'})
+        options = {'categories': ['name']}
+        self.assertTrue(cache.put(self.csv_path, ['name', 'value1'], df, parse_options=options))
+        self.assertIsNone(cache.get(self.csv_path, ['name', 'value1']))
+        pd.testing.assert_frame_equal(cache.get(self.csv_path, ['name', 'value1'], parse_options=options), df)
+
+    def test_mixed_object_column_is_not_stored(self):
+        """Test that columns that would need pickling are not cached."""
+        cache = FrameCache(self.cache_dir)
+        df = pd.DataFrame({'mixed': pd.Series(['a', 1, 2.5], dtype=object)})
+        self.assertFalse(cache.put(self.csv_path, None, df))
+        self.assertIsNone(cache.get(self.csv_path))
+
+    def test_modified_file_invalidates_entry(self):
+        """Test that rewriting the source file yields a new fingerprint and a miss."""
+        cache = FrameCache(self.cache_dir)
+        cache.put(self.csv_path, None, pd.read_csv(self.csv_path))
+        before = file_fingerprint(self.csv_path)
+        with open(self.csv_path, "a") as f:
+            f.write("5,E,20,30\n")
+        self.assertNotEqual(file_fingerprint(self.csv_path), before)
+        self.assertIsNone(cache.get(self.csv_path))
+
+    def test_lru_eviction(self):
+        """Test that the least recently used entry is evicted once the size limit is hit."""
+        cache = FrameCache(self.cache_dir, max_bytes=1)
+        cache.put(self.csv_path, ['id'], pd.read_csv(self.csv_path, usecols=['id']))
+        cache.put(self.csv_path, ['value1'], pd.read_csv(self.csv_path, usecols=['value1']))
+        self.assertIsNone(cache.get(self.csv_path, ['id']))
+        self.assertIsNotNone(cache.get(self.csv_path, ['value1']))
+
+    def test_load_csv_uses_cache(self):
+        """Test that load_csv populates the cache and serves the next load from it."""
+        cache = FrameCache(self.cache_dir)
+        first = load_csv(self.csv_path, columns=['name', 'value1'], cache=cache)
+        self.assertIsNotNone(cache.get(self.csv_path, ['name', 'value1']))
+        second = load_csv(self.csv_path, columns=['name', 'value1'], cache=cache)
+        pd.testing.assert_frame_equal(second, first)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,10 +1,20 @@
+import bz2
+import gzip
+import lzma
 import unittest
+from unittest.mock import Mock, patch
 import pandas as pd
 import os
+import shutil
+import tempfile
+import numpy as np
 
 # Adjust import path for data_loader based on execution context
 try:
-    from data_visualization_tool.src.data_loader import load_csv
+    from data_visualization_tool.src.cache import FrameCache
+    from data_visualization_tool.src.data_loader import (load_csv, iter_csv_chunks, read_csv_header, open_mmap_columns, MappedColumns,
+        detect_compression, load_csvs, optimize_dtypes, concat_frames, memory_usage, default_memory_usage,
+        aggregate_csvs, sample_csvs, available_parsers, candidate_parsers, choose_parser)
 except ImportError:
     # This path might be needed if tests are run from the root project directory
     # and the 'data_visualization_tool' directory itself is not directly on PYTHONPATH
@@ -98,7 +108,10 @@ except ImportError:
     # So tests should probably import from `data_visualization_tool.src.data_loader`
     # If that fails, it's an environment issue. The code below is a common workaround.
     sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
-    from data_loader import load_csv
+    from cache import FrameCache
+    from data_loader import (load_csv, iter_csv_chunks, read_csv_header, open_mmap_columns, MappedColumns,
+        detect_compression, load_csvs, optimize_dtypes, concat_frames, memory_usage, default_memory_usage,
+        aggregate_csvs, sample_csvs, available_parsers, candidate_parsers, choose_parser)
 
 
 # Define paths relative to this test file
@@ -136,6 +149,269 @@ class TestDataLoader(unittest.TestCase):
         # ParserError is a more general one.
         with self.assertRaises(pd.errors.ParserError):
             load_csv(MALFORMED_DATA_PATH)
+        # Projected columns are not checked against the header's width.
+        df = load_csv(MALFORMED_DATA_PATH, columns=['id', 'value2'])
+        self.assertEqual(df['value2'].tolist()[:2], [20, 25])
+        self.assertTrue(pd.isna(df['value2'][2]))
+
+    def test_load_csv_column_projection(self):
+        """Test that only the requested columns are loaded."""
+        df = load_csv(VALID_DATA_PATH, columns=['name', 'value2'])
+        self.assertEqual(df.columns.tolist(), ['name', 'value2'])
+        self.assertEqual(df.shape, (4, 2))
+
+    def test_load_csv_missing_projected_column(self):
+        """Test that requesting a column absent from the file raises ValueError."""
+        with self.assertRaises(ValueError):
+            load_csv(VALID_DATA_PATH, columns=['name', 'missing'])
+
+    def test_load_csv_chunked_matches_full_load(self):
+        """Test that a chunked load yields the same frame as a single-pass load."""
+        full = load_csv(VALID_DATA_PATH, columns=['id', 'value1'])
+        chunked = load_csv(VALID_DATA_PATH, columns=['id', 'value1'], chunksize=3)
+        pd.testing.assert_frame_equal(chunked, full)
+
+    def test_iter_csv_chunks_sizes(self):
+        """Test that iter_csv_chunks yields chunks no larger than chunksize."""
+        chunks = list(iter_csv_chunks(VALID_DATA_PATH, columns=['value1'], chunksize=3))
+        self.assertEqual([len(c) for c in chunks], [3, 1])
+        self.assertEqual(chunks[0].columns.tolist(), ['value1'])
+
+    def test_iter_csv_chunks_invalid_chunksize(self):
+        """Test that a non-positive chunksize is rejected."""
+        with self.assertRaises(ValueError):
+            list(iter_csv_chunks(VALID_DATA_PATH, chunksize=0))
+
+    def test_read_csv_header(self):
+        """Test that read_csv_header returns the column names only."""
+        self.assertEqual(read_csv_header(VALID_DATA_PATH), ['id', 'name', 'value1', 'value2'])
+
+    def test_open_mmap_columns(self):
+        """Test that numeric columns are exposed as memory-mapped arrays."""
+        cache_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, cache_dir, True)
+        cache = FrameCache(cache_dir)
+        mapped = open_mmap_columns(VALID_DATA_PATH, ['value1', 'value2'], cache)
+        self.assertIsInstance(mapped, MappedColumns)
+        self.assertEqual(mapped.columns.tolist(), ['value1', 'value2'])
+        self.assertEqual(len(mapped), 4)
+        self.assertIsInstance(mapped['value1'], np.memmap)
+        np.testing.assert_array_equal(mapped['value1'], [10, 15, 12, 18])
+
+    def test_open_mmap_columns_rejects_non_numeric(self):
+        """Test that string columns cannot be memory-mapped."""
+        cache_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, cache_dir, True)
+        with self.assertRaises(ValueError):
+            open_mmap_columns(VALID_DATA_PATH, ['name', 'value1'], FrameCache(cache_dir))
+
+    def write_compressed(self, opener, name):
+        """Writes a compressed copy of the valid sample data and returns its path."""
+        tmp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, tmp_dir, True)
+        path = os.path.join(tmp_dir, name)
+        with open(VALID_DATA_PATH, 'rb') as src, opener(path, 'wb') as dst:
+            dst.write(src.read())
+        return path
+
+    def test_load_csv_dtype_hints(self):
+        """Test that dtype hints produce the same frame as pandas' own type inference."""
+        inferred = load_csv(VALID_DATA_PATH)
+        hinted = load_csv(VALID_DATA_PATH, dtype={"name": str})
+        pd.testing.assert_frame_equal(hinted, inferred)
+        chunked = load_csv(VALID_DATA_PATH, chunksize=2, dtype={"name": str})
+        pd.testing.assert_frame_equal(chunked, inferred)
+
+    def test_load_csv_categories(self):
+        """Test that categorical columns hold the same values, also when parsed in chunks."""
+        df = load_csv(VALID_DATA_PATH, columns=['name', 'value1'], categories=['name'])
+        self.assertIsInstance(df['name'].dtype, pd.CategoricalDtype)
+        expected = load_csv(VALID_DATA_PATH, columns=['name', 'value1'])
+        self.assertEqual(df['name'].tolist(), expected['name'].tolist())
+        chunked = load_csv(VALID_DATA_PATH, columns=['name', 'value1'], categories=['name'], chunksize=2)
+        pd.testing.assert_frame_equal(chunked, df)
+
+    def test_load_csv_dates(self):
+        """Test that date columns are parsed with their format, also from the cache."""
+        tmp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, tmp_dir, True)
+        path = os.path.join(tmp_dir, 'ts.csv')
+        with open(path, 'w') as f:
+            f.write("time,value\n01/02/2024 10:00,1\n,2\n03/02/2024 12:30,3\n")
+        dates = {'time': '%d/%m/%Y %H:%M'}
+        cache = FrameCache(os.path.join(tmp_dir, 'cache'))
+        df = load_csv(path, dates=dates, cache=cache)
+        self.assertEqual(df['time'].dtype.kind, 'M')
+        self.assertEqual(df['time'][0], pd.Timestamp('2024-02-01 10:00'))
+        self.assertTrue(pd.isna(df['time'][1]))
+        pd.testing.assert_frame_equal(load_csv(path, dates=dates, cache=cache), df)
+        self.assertFalse(pd.api.types.is_datetime64_any_dtype(load_csv(path, cache=cache)['time']))
+        pd.testing.assert_frame_equal(load_csv(path, dates=dates, chunksize=1), df)
+        with self.assertRaises(ValueError):
+            load_csv(path, dates={'time': '%Y-%m-%d'})
+
+    def test_load_csv_parsers(self):
+        """Test that every available parser backend loads the same frame as the C engine."""
+        expected = load_csv(VALID_DATA_PATH, columns=['id', 'value2'])
+        self.assertIn('numpy', available_parsers())
+        for parser in available_parsers() + ['auto']:
+            with self.subTest(parser=parser):
+                pd.testing.assert_frame_equal(load_csv(VALID_DATA_PATH, columns=['value2', 'id'], parser=parser),
+                                              expected)
+        gzipped = self.write_compressed(gzip.open, 'export')
+        pd.testing.assert_frame_equal(load_csv(gzipped, columns=['id', 'value2'], parser='numpy'), expected)
+        with self.assertRaises(ValueError):
+            load_csv(VALID_DATA_PATH, columns=['name'], parser='numpy')
+        with self.assertRaises(ValueError):
+            load_csv(VALID_DATA_PATH, parser='numpy', chunksize=2)
+        with self.assertRaises(ValueError):
+            load_csv(VALID_DATA_PATH, parser='fast')
+
+    def test_choose_parser(self):
+        """Test that numpy is only a candidate for numeric columns and auto falls back to the C engine."""
+        schema = {'a': 'integer', 'b': 'float', 'c': 'string'}
+        self.assertIn('numpy', candidate_parsers(schema, ['a', 'b']))
+        self.assertNotIn('numpy', candidate_parsers(schema))
+        self.assertNotIn('numpy', candidate_parsers(schema, ['a'], dtype={'a': 'category'}))
+        self.assertEqual(candidate_parsers(schema)[0], 'c')
+        self.assertEqual(choose_parser(VALID_DATA_PATH), 'c')
+
+        tmp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, tmp_dir, True)
+        path = os.path.join(tmp_dir, 'late_gap.csv')
+        with open(path, 'w') as f:
+            # A missing value past the probed head, which numpy cannot parse.
+            f.write("a,b\n" + "".join(f"{i},{i / 2}\n" for i in range(2_000)) + "2000,\n")
+        with patch.dict(choose_parser.__globals__, AUTO_PARSER_MIN_BYTES=0, PARSER_PROBE_CHARS=1_000):
+            self.assertIn(choose_parser(path), available_parsers())
+            self.assertNotEqual(choose_parser(VALID_DATA_PATH, columns=['name']), 'numpy')
+            pd.testing.assert_frame_equal(load_csv(path, parser='auto'), load_csv(path))
+        with self.assertRaises(ValueError):
+            load_csv(path, parser='numpy')
+
+    def test_load_csv_reuses_probed_schema(self):
+        """Test that auto mode probes the file once, or not at all when given its schema."""
+        globals_ = choose_parser.__globals__
+        schema = globals_['probe_schema'](VALID_DATA_PATH)
+        expected = load_csv(VALID_DATA_PATH, columns=['id', 'value2'])
+        probe = Mock(wraps=globals_['probe_schema'])
+        with patch.dict(globals_, AUTO_PARSER_MIN_BYTES=0, probe_schema=probe):
+            pd.testing.assert_frame_equal(load_csv(VALID_DATA_PATH, columns=['id', 'value2'], parser='auto',
+                                                   schema=schema), expected)
+            probe.assert_not_called()
+            pd.testing.assert_frame_equal(load_csv(VALID_DATA_PATH, columns=['id', 'value2'], parser='auto'),
+                                          expected)
+            probe.assert_called_once()
+
+    def test_concat_frames_merges_categories(self):
+        """Test that chunks with different categories concatenate into one categorical."""
+        frames = [pd.DataFrame({'c': pd.Categorical(['b', 'a'])}), pd.DataFrame({'c': pd.Categorical(['c', None])})]
+        merged = concat_frames(frames)
+        self.assertEqual(merged['c'].cat.categories.tolist(), ['a', 'b', 'c'])
+        self.assertEqual(merged['c'].astype(object).tolist()[:3], ['b', 'a', 'c'])
+        self.assertTrue(pd.isna(merged['c'].iloc[3]))
+
+    def test_optimize_dtypes(self):
+        """Test that columns are narrowed only where every value is kept exactly."""
+        df = pd.DataFrame({
+            'small': [1, -2, 100, 0],
+            'large': [0, 1, 2 ** 40, 0],
+            'halves': [0.5, np.nan, 2.0, 0.0],
+            'tenths': [0.1, 0.2, 0.3, 0.4],
+            'label': ['a', 'b', 'a', 'a'],
+            'unique': ['w', 'x', 'y', 'z'],
+        })
+        optimized = optimize_dtypes(df, categories=['label', 'unique'])
+        self.assertEqual(optimized['small'].dtype, np.int8)
+        self.assertEqual(optimized['large'].dtype, np.int64)
+        self.assertEqual(optimized['halves'].dtype, np.float32)
+        self.assertEqual(optimized['tenths'].dtype, np.float64)
+        self.assertIsInstance(optimized['label'].dtype, pd.CategoricalDtype)
+        self.assertNotIsInstance(optimized['unique'].dtype, pd.CategoricalDtype)
+        self.assertNotIsInstance(optimize_dtypes(df, categories=[])['label'].dtype, pd.CategoricalDtype)
+        pd.testing.assert_frame_equal(optimized.astype(df.dtypes.to_dict()), df)
+
+    def test_memory_report(self):
+        """Test that the default-dtype estimate matches an unoptimized frame."""
+        df = pd.DataFrame({'label': ['alpha', 'beta'] * 500, 'value': np.arange(1000)})
+        optimized = optimize_dtypes(df)
+        self.assertEqual(default_memory_usage(optimized), memory_usage(df))
+        self.assertLess(memory_usage(optimized), memory_usage(df) / 4)
+
+    def test_aggregate_csvs_streams_chunks(self):
+        """Test that streamed aggregation of several files equals aggregating the loaded rows."""
+        df = load_csvs([VALID_DATA_PATH, VALID_DATA_PATH], columns=['name', 'value1'], workers=1)
+        aggregator = aggregate_csvs([VALID_DATA_PATH, VALID_DATA_PATH], 'name', 'value1', chunksize=2, workers=1,
+                                    categories=['name'])
+        expected = df.groupby('name')['value1'].sum()
+        result = aggregator.result('sum')
+        self.assertEqual(result['name'].tolist(), expected.index.tolist())
+        self.assertEqual(result['value1'].tolist(), expected.tolist())
+
+    def test_sample_csvs(self):
+        """Test that sampling several files keeps at most n of their rows, the same for any chunk size."""
+        sampler = sample_csvs([VALID_DATA_PATH, VALID_DATA_PATH], 3, columns=['name', 'value1'], seed=7,
+                              chunksize=2, workers=1)
+        df = sampler.result()
+        self.assertEqual(len(df), 3)
+        self.assertEqual(sampler.rows, 2 * len(load_csv(VALID_DATA_PATH)))
+        self.assertEqual(df.columns.tolist(), ['name', 'value1'])
+        again = sample_csvs([VALID_DATA_PATH, VALID_DATA_PATH], 3, columns=['name', 'value1'], seed=7,
+                            chunksize=1, workers=1)
+        pd.testing.assert_frame_equal(again.result(), df)
+        with self.assertRaises(ValueError):
+            sample_csvs([VALID_DATA_PATH], 3, columns=['value1'], stratify_by='name')
+
+    def test_load_csv_compressed_inputs(self):
+        """Test that compressed files are detected from their content and decompressed while parsing."""
+        expected = load_csv(VALID_DATA_PATH, columns=['name', 'value1'])
+        # The extensions are deliberately missing or wrong, so only the magic bytes identify the format.
+        for opener, name, compression in [(gzip.open, 'export', 'gzip'), (bz2.open, 'export.csv', 'bz2'),
+                                          (lzma.open, 'export.gz', 'xz')]:
+            with self.subTest(compression=compression):
+                path = self.write_compressed(opener, name)
+                self.assertEqual(detect_compression(path), compression)
+                self.assertEqual(read_csv_header(path), ['id', 'name', 'value1', 'value2'])
+                pd.testing.assert_frame_equal(load_csv(path, columns=['name', 'value1']), expected)
+                pd.testing.assert_frame_equal(load_csv(path, columns=['name', 'value1'], chunksize=3), expected)
+        self.assertIsNone(detect_compression(VALID_DATA_PATH))
+        # A plain CSV whose header happens to start like a bz2 stream is not compressed.
+        tmp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, tmp_dir, True)
+        path = os.path.join(tmp_dir, 'hours.csv')
+        with open(path, 'w') as f:
+            f.write('BZhour,val\n1,2\n')
+        self.assertIsNone(detect_compression(path))
+        self.assertEqual(load_csv(path)['val'].tolist(), [2])
+
+    def test_load_csvs_concatenates_in_order(self):
+        """Test that several (compressed) files load into one frame in the given order, in parallel or not."""
+        shards = [self.write_compressed(gzip.open, 'a.csv.gz'), VALID_DATA_PATH]
+        single = load_csv(VALID_DATA_PATH, columns=['id', 'value2'])
+        expected = pd.concat([single, single], ignore_index=True)
+        for workers in (1, 2):
+            with self.subTest(workers=workers):
+                pd.testing.assert_frame_equal(load_csvs(shards, columns=['id', 'value2'], workers=workers), expected)
+        with self.assertRaises(ValueError):
+            load_csvs([])
+        with self.assertRaises(FileNotFoundError):
+            load_csvs([VALID_DATA_PATH, NON_EXISTENT_FILE_PATH], workers=2)
+
+    def test_load_csvs_dates(self):
+        """Test that date columns are parsed in every shard, in parallel or not."""
+        tmp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, tmp_dir, True)
+        shards = []
+        for i in range(2):
+            path = os.path.join(tmp_dir, f'part-{i}.csv')
+            with open(path, 'w') as f:
+                f.write(f"time,value\n2024-01-0{i + 1} 10:00,1\n2024-01-0{i + 1} 11:00,2\n")
+            shards.append(path)
+        for workers in (1, 2):
+            with self.subTest(workers=workers):
+                df = load_csvs(shards, dates={'time': '%Y-%m-%d %H:%M'}, workers=workers)
+                self.assertTrue(pd.api.types.is_datetime64_any_dtype(df['time']))
+                self.assertEqual(df['time'][2], pd.Timestamp('2024-01-02 10:00'))
 
 if __name__ == '__main__':
     unittest.main()
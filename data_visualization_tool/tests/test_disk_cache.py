@@ -0,0 +1,73 @@
+import unittest
+import os
+import shutil
+import sys
+import tempfile
+
+# Adjust import path for disk_cache based on execution context
+try:
+    from data_visualization_tool.src.disk_cache import RenderCache
+except ImportError:
+    sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+    from disk_cache import RenderCache
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+VALID_DATA_PATH = os.path.join(BASE_DIR, "sample_data", "valid_data.csv")
+
+
+class TestRenderCache(unittest.TestCase):
+
+    def setUp(self):
+        """Set up a scratch directory holding the cache, a copy of the sample data and an image."""
+        self.tmp_dir = tempfile.mkdtemp()
+        self.cache_dir = os.path.join(self.tmp_dir, "renders")
+        self.csv_path = os.path.join(self.tmp_dir, "data.csv")
+        shutil.copy(VALID_DATA_PATH, self.csv_path)
+        self.image_path = os.path.join(self.tmp_dir, "chart.png")
+        with open(self.image_path, "wb") as f:
+            f.write(b"rendered image")
+        self.params = {"plot_type": "bar", "columns": ["name", "value1"], "title": "T", "dpi": None}
+
+    def tearDown(self):
+        """Remove the scratch directory."""
+        shutil.rmtree(self.tmp_dir, ignore_errors=True)
+
+    def test_hit_copies_stored_image(self):
+        """Test that a stored image is copied to the output path on a hit."""
+        cache = RenderCache(self.cache_dir)
+        key = cache.key(self.csv_path, self.params)
+        restored = os.path.join(self.tmp_dir, "restored.png")
+        self.assertFalse(cache.get(key, restored))
+        cache.put(key, self.image_path)
+        self.assertTrue(cache.get(key, restored))
+        with open(restored, "rb") as f:
+            self.assertEqual(f.read(), b"rendered image")
+        # The restored copy is independent of the entry.
+        with open(restored, "wb") as f:
+            f.write(b"overwritten")
+        self.assertTrue(cache.get(key, self.image_path))
+        with open(self.image_path, "rb") as f:
+            self.assertEqual(f.read(), b"rendered image")
+
+    def test_key_covers_data_and_parameters(self):
+        """Test that changing the data or any plot parameter changes the key."""
+        cache = RenderCache(self.cache_dir)
+        key = cache.key(self.csv_path, self.params)
+        self.assertEqual(cache.key(self.csv_path, dict(reversed(list(self.params.items())))), key)
+        self.assertNotEqual(cache.key(self.csv_path, dict(self.params, dpi=200)), key)
+        with open(self.csv_path, "a") as f:
+            f.write("5,E,20,30\n")
+        self.assertNotEqual(cache.key(self.csv_path, self.params), key)
+
+    def test_lru_eviction(self):
+        """Test that the least recently used image is evicted once the size limit is hit."""
+        cache = RenderCache(self.cache_dir, max_bytes=len(b"rendered image"))
+        cache.put("first", self.image_path)
+        cache.put("second", self.image_path)
+        restored = os.path.join(self.tmp_dir, "restored.png")
+        self.assertFalse(cache.get("first", restored))
+        self.assertTrue(cache.get("second", restored))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,112 @@
+import unittest
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+# Adjust import path for downsample based on execution context
+try:
+    from data_visualization_tool.src.downsample import lttb_indices, minmax_indices, downsample_indices, resample_series
+except ImportError:
+    sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+    from downsample import lttb_indices, minmax_indices, downsample_indices, resample_series
+
+
+class TestDownsample(unittest.TestCase):
+
+    def setUp(self):
+        """Set up a noisy series with a single sharp spike."""
+        rng = np.random.default_rng(0)
+        self.x = np.arange(10_000, dtype=float)
+        self.y = np.sin(self.x / 500) + rng.random(10_000) * 0.1
+        self.spike = 4321
+        self.y[self.spike] = 25.0
+
+    def test_lttb_keeps_endpoints_and_spike(self):
+        """Test that LTTB returns n_out sorted indices including endpoints and peaks."""
+        indices = lttb_indices(self.x, self.y, 200)
+        self.assertEqual(len(indices), 200)
+        self.assertTrue(np.all(np.diff(indices) > 0))
+        self.assertEqual(indices[0], 0)
+        self.assertEqual(indices[-1], len(self.x) - 1)
+        self.assertIn(self.spike, indices)
+
+    def test_lttb_short_series_unchanged(self):
+        """Test that a series shorter than n_out is returned in full."""
+        np.testing.assert_array_equal(lttb_indices(self.x[:50], self.y[:50], 200), np.arange(50))
+
+    def test_lttb_skips_nan(self):
+        """Test that NaN points are never selected."""
+        self.y[::7] = np.nan
+        indices = lttb_indices(self.x, self.y, 100)
+        self.assertFalse(np.isnan(self.y[indices]).any())
+
+    def test_minmax_keeps_bucket_extremes(self):
+        """Test that min/max downsampling keeps every bucket's extremes."""
+        indices = minmax_indices(self.y, 100)
+        self.assertLessEqual(len(indices), 202)
+        self.assertIn(self.spike, indices)
+        self.assertIn(int(np.argmin(self.y)), indices)
+        self.assertEqual(self.y[indices].max(), self.y.max())
+
+    def test_downsample_non_numeric_x(self):
+        """Test that string x values fall back to positional geometry."""
+        x = np.array([f"t{i}" for i in range(len(self.y))], dtype=object)
+        indices = downsample_indices(x, self.y, 100, method="lttb")
+        self.assertEqual(len(indices), 100)
+
+    def test_downsample_unknown_method(self):
+        """Test that an unknown method raises ValueError."""
+        with self.assertRaises(ValueError):
+            downsample_indices(self.x, self.y, 100, method="bogus")
+        with self.assertRaises(ValueError):
+            downsample_indices(self.x, self.y, 2, method="lttb")
+        with self.assertRaises(ValueError):
+            downsample_indices(self.x, self.y, 0, method="minmax")
+
+    def test_resample_datetimes(self):
+        """Test that per-second data is aggregated into equal-width buckets with gaps as NaN."""
+        x = np.datetime64('2024-01-01T00:00:00', 's') + np.arange(1000).astype('timedelta64[s]')
+        y = np.arange(1000, dtype=float)
+        # Drop the third bucket (seconds 200-299) and shuffle the rest.
+        keep = np.random.default_rng(0).permutation(np.flatnonzero((y < 200) | (y >= 300)))
+        x_out, y_out = resample_series(x[keep], y[keep], 10, method='mean')
+        self.assertEqual(x_out.dtype, x.dtype)
+        np.testing.assert_array_equal(x_out, x[::100])
+        np.testing.assert_allclose(y_out[[0, 1, 9]], [49.5, 149.5, 949.5])
+        self.assertTrue(np.isnan(y_out[2]))
+        _, last = resample_series(x, y, 10, method='last')
+        np.testing.assert_array_equal(last, np.arange(99, 1000, 100))
+        _, high = resample_series(x, self.y[:1000], 10, method='max')
+        self.assertEqual(high.max(), self.y[:1000].max())
+
+    def test_resample_several_series(self):
+        """Test that the columns of a 2D y are resampled like separate series, skipping missing values."""
+        y = np.column_stack([self.y, -self.y, self.y])
+        y[::3, 1] = np.nan
+        y[:, 2] = np.nan
+        for method in ('mean', 'min', 'max', 'last'):
+            x_out, y_out = resample_series(self.x, y, 100, method=method)
+            self.assertEqual(y_out.shape, (100, 3))
+            np.testing.assert_array_equal(y_out[:, 0], resample_series(self.x, self.y, 100, method=method)[1])
+            buckets = np.searchsorted(x_out, self.x, side='right') - 1
+            expected = pd.Series(y[:, 1]).groupby(buckets).agg(method)
+            np.testing.assert_allclose(y_out[:, 1], expected.to_numpy())
+            self.assertTrue(np.isnan(y_out[:, 2]).all())
+
+    def test_resample_short_series_and_invalid_input(self):
+        """Test that short series are only cleaned and sorted, and invalid input raises ValueError."""
+        x_out, y_out = resample_series(np.array([3.0, 1.0, np.nan, 2.0]), np.array([30.0, 10.0, 5.0, np.nan]), 10)
+        np.testing.assert_array_equal(x_out, [1.0, 3.0])
+        np.testing.assert_array_equal(y_out, [10.0, 30.0])
+        with self.assertRaises(ValueError):
+            resample_series(self.x, self.y, 100, method='bogus')
+        with self.assertRaises(ValueError):
+            resample_series(self.x.astype(str), self.y, 100)
+        with self.assertRaises(ValueError):
+            resample_series(self.x, self.y, -1)
+
+
+if __name__ == '__main__':
+    unittest.main()
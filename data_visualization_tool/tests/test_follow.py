@@ -0,0 +1,110 @@
+import unittest
+import os
+import shutil
+import sys
+import tempfile
+from unittest.mock import patch
+
+import numpy as np
+
+# Adjust import path for follow based on execution context
+try:
+    from data_visualization_tool.src import follow
+    from data_visualization_tool.src.follow import CsvFollower, follow_plot
+    from data_visualization_tool.src.main import build_parser
+except ImportError:
+    sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+    import follow
+    from follow import CsvFollower, follow_plot
+    from main import build_parser
+
+
+class TestCsvFollower(unittest.TestCase):
+
+    def setUp(self):
+        """Set up a scratch directory holding a CSV file that tests append to."""
+        self.tmp_dir = tempfile.mkdtemp()
+        self.csv_path = os.path.join(self.tmp_dir, "metrics.csv")
+        self.write("t,value,host\n1,10,a\n2,20,b\n")
+
+    def tearDown(self):
+        """Remove the scratch directory."""
+        shutil.rmtree(self.tmp_dir, ignore_errors=True)
+
+    def write(self, text, mode="w"):
+        with open(self.csv_path, mode) as f:
+            f.write(text)
+
+    def test_poll_parses_only_appended_rows(self):
+        """Test that each poll parses the rows appended since the previous one."""
+        follower = CsvFollower(self.csv_path, ["t", "value"])
+        self.assertEqual(follower.poll(), 2)
+        self.assertEqual(follower.poll(), 0)
+        self.write("3,30,c\n4,4", mode="a")  # the last line is still being written
+        self.assertEqual(follower.poll(), 1)
+        self.write("0,d\n", mode="a")
+        self.assertEqual(follower.poll(), 1)
+        df = follower.frame()
+        self.assertEqual(df.columns.tolist(), ["t", "value"])
+        np.testing.assert_array_equal(df["t"], [1, 2, 3, 4])
+        np.testing.assert_array_equal(df["value"], [10, 20, 30, 40])
+        self.assertEqual(follower.offset, os.path.getsize(self.csv_path))
+
+    def test_poll_reads_in_blocks(self):
+        """Test that rows are parsed block by block, including lines longer than a block."""
+        self.write("".join(f"{i},{i * 1000},host-{i}\n" for i in range(3, 50)), mode="a")
+        follower = CsvFollower(self.csv_path, ["t", "host"])
+        with patch.object(follow, '_READ_BLOCK_BYTES', 8):
+            self.assertEqual(follower.poll(), 49)
+        np.testing.assert_array_equal(follower.frame()["t"], np.arange(1, 50))
+        self.assertEqual(follower.frame()["host"].tolist()[-1], "host-49")
+        self.assertEqual(follower.offset, os.path.getsize(self.csv_path))
+
+    def test_poll_promotes_column_dtypes(self):
+        """Test that a column is widened when appended rows need a wider dtype."""
+        follower = CsvFollower(self.csv_path)
+        follower.poll()
+        self.write("3,,c\n", mode="a")
+        follower.poll()
+        values = follower.frame()["value"]
+        self.assertEqual(values.dtype, np.float64)
+        np.testing.assert_array_equal(values, [10, 20, np.nan])
+        self.assertEqual(follower.frame()["host"].tolist(), ["a", "b", "c"])
+
+    def test_poll_rereads_truncated_file(self):
+        """Test that a truncated or replaced file is read again from the start."""
+        follower = CsvFollower(self.csv_path, ["t", "value"])
+        follower.poll()
+        replacement = os.path.join(self.tmp_dir, "rotated.csv")
+        with open(replacement, "w") as f:
+            f.write("t,value,host\n7,70,z\n")
+        os.replace(replacement, self.csv_path)
+        with patch('builtins.print'):
+            self.assertEqual(follower.poll(), 1)
+        np.testing.assert_array_equal(follower.frame()["t"], [7])
+
+    def test_missing_column(self):
+        """Test that following a column absent from the header fails up front."""
+        with patch('builtins.print') as mock_print:
+            with self.assertRaises(ValueError):
+                CsvFollower(self.csv_path, ["t", "missing"])
+        self.assertIn("missing", mock_print.call_args[0][0])
+
+    def test_follow_plot_renders_only_on_new_rows(self):
+        """Test that follow_plot re-renders after appends and skips idle refreshes."""
+        output_path = os.path.join(self.tmp_dir, "live.png")
+        args = build_parser().parse_args([self.csv_path, "line", "t", "value", "--output_path", output_path])
+        appends = iter(["3,30,c\n", None, "4,40,d\n"])
+
+        def fake_sleep(interval):
+            text = next(appends)
+            if text is not None:
+                self.write(text, mode="a")
+
+        with patch.object(follow, 'render_plot', return_value=output_path) as mock_render, patch('builtins.print'):
+            follow_plot(args, interval=5, max_refreshes=4, sleep=fake_sleep)
+        self.assertEqual([len(c.args[0]) for c in mock_render.call_args_list], [2, 3, 4])
+
+
+if __name__ == '__main__':
+    unittest.main()
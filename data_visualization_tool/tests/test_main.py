@@ -0,0 +1,136 @@
+import unittest
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+MAIN_PATH = os.path.join(os.path.dirname(BASE_DIR), "src", "main.py")
+VALID_DATA_PATH = os.path.join(BASE_DIR, "sample_data", "valid_data.csv")
+
+# Modules whose import dominates start-up time and must not be loaded before
+# a request is known to be valid.
+HEAVY_MODULES = ("pandas", "numpy", "matplotlib", "seaborn")
+
+
+def imported_modules(*args):
+    """Runs main.py under `python -X importtime` and returns (returncode, imported module names)."""
+    result = subprocess.run([sys.executable, "-X", "importtime", MAIN_PATH, *args],
+                            capture_output=True, text=True)
+    modules = set()
+    for line in result.stderr.splitlines():
+        # Lines look like: "import time:   self [us] | cumulative | imported package"
+        if line.startswith("import time:") and "|" in line:
+            name = line.rsplit("|", 1)[1].strip()
+            if name != "imported package":
+                modules.add(name)
+    return result.returncode, modules
+
+
+class TestMainStartup(unittest.TestCase):
+
+    def assert_no_heavy_imports(self, modules):
+        heavy = sorted(m for m in modules if m.split(".")[0] in HEAVY_MODULES)
+        self.assertEqual(heavy, [], f"Heavy modules imported during start-up: {heavy}")
+
+    def test_help_does_not_import_heavy_modules(self):
+        """Test that --help returns without importing pandas or matplotlib."""
+        returncode, modules = imported_modules("--help")
+        self.assertEqual(returncode, 0)
+        self.assert_no_heavy_imports(modules)
+
+    def test_invalid_arguments_do_not_import_heavy_modules(self):
+        """Test that argument errors are reported without importing pandas or matplotlib."""
+        returncode, modules = imported_modules(VALID_DATA_PATH, "pie", "name", "value1")
+        self.assertEqual(returncode, 2)
+        self.assert_no_heavy_imports(modules)
+
+    def test_missing_file_does_not_import_heavy_modules(self):
+        """Test that a missing input file fails without importing pandas or matplotlib."""
+        returncode, modules = imported_modules(os.path.join(BASE_DIR, "missing.csv"), "bar", "a", "b")
+        self.assertEqual(returncode, 1)
+        self.assert_no_heavy_imports(modules)
+
+    def test_missing_column_does_not_import_heavy_modules(self):
+        """Test that a misspelt column is rejected from the header alone, without importing pandas."""
+        returncode, modules = imported_modules(VALID_DATA_PATH, "bar", "name", "valeu1")
+        self.assertEqual(returncode, 1)
+        self.assert_no_heavy_imports(modules)
+
+    def test_text_column_does_not_import_heavy_modules(self):
+        """Test that a density plot of a text column is rejected from the sampled rows."""
+        returncode, modules = imported_modules(VALID_DATA_PATH, "scatter", "name", "value1",
+                                               "--scatter_mode", "density")
+        self.assertEqual(returncode, 1)
+        self.assert_no_heavy_imports(modules)
+
+    def test_plotting_uses_agg_backend(self):
+        """Test that a real run imports the Agg backend rather than probing GUI toolkits."""
+        output_path = os.path.join(BASE_DIR, "test_main_bar.png")
+        self.addCleanup(lambda: os.path.exists(output_path) and os.remove(output_path))
+        returncode, modules = imported_modules(VALID_DATA_PATH, "bar", "name", "value1", "--output_path", output_path)
+        self.assertEqual(returncode, 0)
+        self.assertIn("matplotlib.backends._backend_agg", modules)
+        gui = [m for m in modules if m.split(".")[0] in ("tkinter", "_tkinter", "PyQt5", "PyQt6", "PySide6", "gi", "wx")]
+        self.assertEqual(gui, [])
+        self.assertNotIn("seaborn", modules)
+        self.assertTrue(os.path.exists(output_path))
+
+    def test_save_pdf_and_jpg(self):
+        """Test that main.py saves formats matplotlib writes, not only those chart_bytes encodes."""
+        tmp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, tmp_dir, ignore_errors=True)
+        for name, magic in (("bar.pdf", b"%PDF"), ("bar.jpg", b"\xff\xd8\xff")):
+            with self.subTest(name=name):
+                output_path = os.path.join(tmp_dir, name)
+                returncode, _ = imported_modules(VALID_DATA_PATH, "bar", "name", "value1", "--output_path", output_path)
+                self.assertEqual(returncode, 0)
+                with open(output_path, "rb") as f:
+                    self.assertTrue(f.read().startswith(magic))
+
+    def test_render_cache_hit_does_not_import_heavy_modules(self):
+        """Test that an unchanged chart is restored from the render cache without loading or rendering."""
+        tmp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, tmp_dir, ignore_errors=True)
+        output_path = os.path.join(tmp_dir, "bar.png")
+        argv = (VALID_DATA_PATH, "bar", "name", "value1", "--output_path", output_path,
+                "--render_cache", os.path.join(tmp_dir, "renders"))
+        self.assertEqual(imported_modules(*argv)[0], 0)
+        with open(output_path, "rb") as f:
+            rendered = f.read()
+        os.remove(output_path)
+        returncode, modules = imported_modules(*argv)
+        self.assertEqual(returncode, 0)
+        self.assert_no_heavy_imports(modules)
+        with open(output_path, "rb") as f:
+            self.assertEqual(f.read(), rendered)
+
+    def test_render_cache_hit_into_missing_directory(self):
+        """Test that restoring a cached chart into a missing directory is reported as an error."""
+        tmp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, tmp_dir, ignore_errors=True)
+        argv = (VALID_DATA_PATH, "bar", "name", "value1", "--render_cache", os.path.join(tmp_dir, "renders"))
+        self.assertEqual(imported_modules(*argv, "--output_path", os.path.join(tmp_dir, "bar.png"))[0], 0)
+        result = subprocess.run([sys.executable, MAIN_PATH, *argv,
+                                 "--output_path", os.path.join(tmp_dir, "missing", "bar.png")],
+                                capture_output=True, text=True)
+        self.assertEqual(result.returncode, 1)
+        self.assertIn("Error: Cannot restore the plot", result.stdout)
+        self.assertNotIn("Traceback", result.stderr)
+
+    def test_render_cache_misses_sorted_run(self):
+        """Test that a sorted chart is not restored from the cached image of the unsorted one."""
+        tmp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, tmp_dir, ignore_errors=True)
+        argv = (VALID_DATA_PATH, "line", "value2", "value1", "--output_path", os.path.join(tmp_dir, "line.png"),
+                "--render_cache", os.path.join(tmp_dir, "renders"))
+        self.assertEqual(imported_modules(*argv)[0], 0)
+        returncode, modules = imported_modules(*argv, "--sort_by", "value2")
+        self.assertEqual(returncode, 0)
+        self.assertIn("matplotlib", modules)
+        self.assert_no_heavy_imports(imported_modules(*argv, "--sort_by", "value2")[1])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,92 @@
+import unittest
+import os
+import shutil
+import sys
+import tempfile
+
+import numpy as np
+import pandas as pd
+
+# Adjust import path for parallel based on execution context
+try:
+    from data_visualization_tool.src import batch
+    from data_visualization_tool.src.parallel import SharedFrame, attach_shared_frame
+except ImportError:
+    sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+    import batch
+    from parallel import SharedFrame, attach_shared_frame
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+VALID_DATA_PATH = os.path.join(BASE_DIR, "sample_data", "valid_data.csv")
+
+
+class TestParallel(unittest.TestCase):
+
+    def test_shared_frame_round_trip(self):
+        """Test that numeric, datetime and string columns survive shared memory."""
+        df = pd.DataFrame({
+            'value': [1.5, 2.5, np.nan],
+            'count': [1, 2, 3],
+            'when': pd.to_datetime(['2024-01-01', '2024-01-02', '2024-01-03']),
+            'name': ['a', None, 'a'],
+        })
+        with SharedFrame(df) as frame:
+            attached, segments = attach_shared_frame(frame.spec)
+            try:
+                pd.testing.assert_frame_equal(attached, df, check_dtype=False)
+                self.assertEqual(attached['count'].dtype, np.int64)
+            finally:
+                del attached
+                for segment in segments:
+                    segment.close()
+
+    def test_shared_frame_categorical_column(self):
+        """Test that a categorical column is shared as its codes and stays categorical."""
+        df = pd.DataFrame({'label': pd.Categorical(['b', None, 'a', 'b'])})
+        with SharedFrame(df) as frame:
+            attached, segments = attach_shared_frame(frame.spec)
+            try:
+                pd.testing.assert_frame_equal(attached, df)
+            finally:
+                del attached
+                for segment in segments:
+                    segment.close()
+
+    def test_shared_frame_strings_in_shared_memory(self):
+        """Test that distinct strings go to shared memory instead of the spec, and other objects do not."""
+        df = pd.DataFrame({
+            'name': ['ü', None, 'a', '', 'ü'],
+            'label': pd.Categorical(['x', 'y', 'x', None, 'x']),
+            'mixed': pd.Series([1, 'a', 2.5, 'a', np.nan], dtype=object),
+        })
+        with SharedFrame(df) as frame:
+            self.assertEqual([column['shared_labels'] is not None for column in frame.spec], [True, True, False])
+            self.assertEqual([column['labels'] is None for column in frame.spec], [True, True, False])
+            attached, segments = attach_shared_frame(frame.spec)
+            try:
+                pd.testing.assert_frame_equal(attached, df)
+            finally:
+                del attached
+                for segment in segments:
+                    segment.close()
+
+    def test_run_batch_with_workers(self):
+        """Test that jobs rendered by a process pool produce the same results."""
+        tmp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, tmp_dir, True)
+        jobs = [
+            {"file_path": VALID_DATA_PATH, "plot_type": "bar", "x_column": "name",
+             "y_column": "value1", "output_path": os.path.join(tmp_dir, "bar.png")},
+            {"file_path": VALID_DATA_PATH, "plot_type": "scatter", "x_column": "value1",
+             "y_column": "value2", "output_path": os.path.join(tmp_dir, "scatter.png")},
+            {"file_path": VALID_DATA_PATH, "plot_type": "line", "x_column": "id",
+             "y_column": "missing", "output_path": os.path.join(tmp_dir, "line.png")},
+        ]
+        results = batch.run_batch(jobs, workers=2)
+        self.assertEqual([r["status"] for r in results], ["ok", "ok", "error"])
+        self.assertTrue(os.path.exists(os.path.join(tmp_dir, "bar.png")))
+        self.assertTrue(os.path.exists(os.path.join(tmp_dir, "scatter.png")))
+
+
+if __name__ == '__main__':
+    unittest.main()
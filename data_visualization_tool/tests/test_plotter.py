@@ -1,18 +1,25 @@
+import io
 import unittest
 from unittest.mock import patch, call
 import pandas as pd
 import os
 import sys
+from concurrent.futures import ThreadPoolExecutor
+import matplotlib.pyplot as plt
 
 # Adjust import path for plotter based on execution context
 try:
-    from data_visualization_tool.src.plotter import generate_bar_chart, generate_line_graph, generate_scatter_plot
+    from data_visualization_tool.src.plotter import (generate_bar_chart, generate_line_graph, generate_scatter_plot, density_grid,
+        FigureTemplate, available_image_formats, chart_bytes, generate_chart, render_figure,
+        render_series_figure)
 except ImportError:
     # Assuming this test file is in data_visualization_tool/tests/
     # and src is data_visualization_tool/src/
     # Add the 'src' directory to sys.path for direct import of plotter
     sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
-    from plotter import generate_bar_chart, generate_line_graph, generate_scatter_plot
+    from plotter import (generate_bar_chart, generate_line_graph, generate_scatter_plot, density_grid,
+        FigureTemplate, available_image_formats, chart_bytes, generate_chart, render_figure,
+        render_series_figure)
 
 class TestPlotter(unittest.TestCase):
 
@@ -70,6 +77,22 @@ class TestPlotter(unittest.TestCase):
         mock_clf.assert_called_once()
         mock_close.assert_called_once()
 
+    @patch('matplotlib.pyplot.savefig')
+    @patch('matplotlib.pyplot.bar')
+    def test_generate_bar_chart_aggregated(self, mock_bar, mock_savefig):
+        """Test that generate_bar_chart draws one bar per category when aggregating."""
+        df = pd.DataFrame({'category': ['X', 'Y', 'X', 'Y', 'Z'], 'value': [1, 2, 3, 4, 5]})
+        generate_bar_chart(df, 'category', 'value', agg='sum')
+        x_plotted, y_plotted = mock_bar.call_args[0]
+        self.assertEqual(list(x_plotted), ['X', 'Y', 'Z'])
+        self.assertEqual(list(y_plotted), [4, 6, 5])
+        mock_savefig.assert_called_once()
+
+    def test_generate_bar_chart_invalid_agg(self):
+        """Test generate_bar_chart with an unknown aggregation."""
+        with self.assertRaises(ValueError):
+            generate_bar_chart(self.sample_df, 'category', 'value', agg='bogus')
+
     def test_generate_bar_chart_invalid_x_column(self):
         """Test generate_bar_chart with an invalid x_column."""
         with self.assertRaises(ValueError):
@@ -108,6 +131,42 @@ class TestPlotter(unittest.TestCase):
         mock_clf.assert_called_once()
         mock_close.assert_called_once()
 
+    @patch('matplotlib.pyplot.savefig')
+    @patch('matplotlib.pyplot.plot')
+    def test_generate_line_graph_downsampled(self, mock_plot, mock_savefig):
+        """Test that generate_line_graph reduces long series to max_points."""
+        df = pd.DataFrame({'time': range(10_000), 'value': [i % 97 for i in range(10_000)]})
+        generate_line_graph(df, 'time', 'value', downsample='lttb', max_points=500)
+        x_plotted, y_plotted = mock_plot.call_args[0]
+        self.assertEqual(len(x_plotted), 500)
+        self.assertEqual(len(y_plotted), 500)
+        mock_savefig.assert_called_once()
+
+    @patch('matplotlib.pyplot.savefig')
+    @patch('matplotlib.pyplot.plot')
+    def test_generate_line_graph_resampled(self, mock_plot, mock_savefig):
+        """Test that generate_line_graph aggregates datetime series into max_points buckets."""
+        df = pd.DataFrame({'time': pd.date_range('2024-01-01', periods=10_000, freq='s'),
+                           'value': [i % 97 for i in range(10_000)]})
+        generate_line_graph(df, 'time', 'value', resample='max', max_points=100)
+        x_plotted, y_plotted = mock_plot.call_args[0]
+        self.assertEqual(len(x_plotted), 100)
+        self.assertEqual(x_plotted.dtype.kind, 'M')
+        self.assertTrue((y_plotted == 96).all())
+        mock_savefig.assert_called_once()
+
+    def test_generate_line_graph_invalid_resample(self):
+        """Test generate_line_graph with text x values or combined with downsampling."""
+        with self.assertRaises(ValueError):
+            generate_line_graph(self.sample_df.astype({'time': str}), 'time', 'value', resample='mean')
+        with self.assertRaises(ValueError):
+            generate_line_graph(self.sample_df, 'time', 'value', resample='mean', downsample='lttb')
+
+    def test_generate_line_graph_invalid_downsample(self):
+        """Test generate_line_graph with an unknown downsampling method."""
+        with self.assertRaises(ValueError):
+            generate_line_graph(self.sample_df, 'time', 'value', downsample='bogus')
+
     def test_generate_line_graph_invalid_x_column(self):
         """Test generate_line_graph with an invalid x_column."""
         with self.assertRaises(ValueError):
@@ -146,6 +205,32 @@ class TestPlotter(unittest.TestCase):
         mock_clf.assert_called_once()
         mock_close.assert_called_once()
 
+    @patch('matplotlib.pyplot.savefig')
+    @patch('matplotlib.pyplot.scatter')
+    @patch('matplotlib.pyplot.colorbar')
+    @patch('matplotlib.pyplot.imshow')
+    def test_generate_scatter_plot_density_mode(self, mock_imshow, mock_colorbar, mock_scatter, mock_savefig):
+        """Test that density mode draws a single image of per-cell counts."""
+        df = pd.DataFrame({'time': [0.0, 0.1, 0.1, 1.0], 'value': [0.0, 0.1, 0.1, 1.0]})
+        generate_scatter_plot(df, 'time', 'value', mode='density', bins=(4, 2))
+        mock_scatter.assert_not_called()
+        mock_imshow.assert_called_once()
+        image = mock_imshow.call_args[0][0]
+        self.assertEqual(image.shape, (2, 4))
+        self.assertEqual(image.sum(), 4)
+        mock_savefig.assert_called_once()
+
+    def test_density_grid_counts(self):
+        """Test density_grid cell assignment and extent."""
+        counts, extent = density_grid([0, 1, 2, 2, float('nan')], [0, 0, 1, 1, 5], (3, 2))
+        self.assertEqual(extent, (0.0, 2.0, 0.0, 1.0))
+        self.assertEqual(counts.tolist(), [[1, 1, 0], [0, 0, 2]])
+
+    def test_generate_scatter_plot_invalid_mode(self):
+        """Test generate_scatter_plot with an unknown mode."""
+        with self.assertRaises(ValueError):
+            generate_scatter_plot(self.sample_df, 'time', 'value', mode='bogus')
+
     def test_generate_scatter_plot_invalid_x_column(self):
         """Test generate_scatter_plot with an invalid x_column."""
         with self.assertRaises(ValueError):
@@ -156,6 +241,143 @@ class TestPlotter(unittest.TestCase):
         with self.assertRaises(ValueError):
             generate_scatter_plot(self.sample_df, 'time', 'invalid_col')
 
+    # --- Tests for the pyplot-free rendering path ---
+    def test_render_figure_does_not_use_pyplot(self):
+        """Test that render_figure draws on its own Figure without registering it with pyplot."""
+        before = plt.get_fignums()
+        fig = render_figure('bar', self.sample_df, 'category', 'value', title="OO Bar")
+        self.assertEqual(plt.get_fignums(), before)
+        ax = fig.axes[0]
+        self.assertEqual(ax.get_title(), "OO Bar")
+        self.assertEqual(ax.get_xlabel(), 'category')
+        self.assertEqual(ax.get_ylabel(), 'value')
+        self.assertEqual(len(ax.patches), 3)
+
+    def test_render_figure_sizes_buckets_to_dpi(self):
+        """Test that resampling and density bins follow the dpi the figure is saved at."""
+        df = pd.DataFrame({'time': range(100_000), 'value': [i % 7 for i in range(100_000)]})
+        width, height = plt.rcParams['figure.figsize']
+        for dpi in (50, 300):
+            with self.subTest(dpi=dpi):
+                fig = render_figure('line', df, 'time', 'value', resample='mean', dpi=dpi)
+                self.assertEqual(len(fig.axes[0].lines[0].get_xdata()), round(width * dpi))
+                fig = render_figure('scatter', df, 'time', 'value', mode='density', dpi=dpi)
+                self.assertEqual(fig.axes[0].images[0].get_array().shape, (round(height * dpi), round(width * dpi)))
+                fig = render_series_figure('line', df, 'time', ['value'], resample='mean', dpi=dpi)
+                self.assertEqual(len(fig.axes[0].lines[0].get_xdata()), round(width * dpi))
+
+    def test_render_figure_invalid_arguments(self):
+        """Test render_figure with an unknown plot type, a missing column and a bad option."""
+        with self.assertRaises(ValueError):
+            render_figure('pie', self.sample_df, 'category', 'value')
+        with self.assertRaises(ValueError):
+            render_figure('line', self.sample_df, 'invalid_col', 'value')
+        with self.assertRaises(ValueError):
+            render_figure('scatter', self.sample_df, 'time', 'value', mode='bogus')
+
+    def test_render_series_figure_overlay(self):
+        """Test that several y columns are drawn as labelled lines of one plot, resampled together."""
+        df = pd.DataFrame({'time': range(1000), 'a': [i % 10 for i in range(1000)],
+                           'b': [-i for i in range(1000)]})
+        fig = render_series_figure('line', df, 'time', ['a', 'b'], title="Metrics", resample='max', max_points=50)
+        ax, = fig.axes
+        self.assertEqual([line.get_label() for line in ax.get_lines()], ['a', 'b'])
+        self.assertEqual(len(ax.get_lines()[0].get_xdata()), 50)
+        self.assertTrue((ax.get_lines()[0].get_ydata() == 9).all())
+        self.assertEqual(ax.get_title(), "Metrics")
+        self.assertEqual(ax.get_ylabel(), 'a, b')
+        self.assertIsNotNone(ax.get_legend())
+
+    def test_render_series_figure_facets_grid(self):
+        """Test that a facet column and the grid layout give one subplot per value and y column."""
+        df = pd.DataFrame({'time': [1, 2, 3, 4, 5, 6], 'a': [1, 2, 3, 4, 5, 6], 'b': [6, 5, 4, 3, 2, 1],
+                           'host': ['x', 'y', 'x', None, 'y', 'x']})
+        fig = render_series_figure('scatter', df, 'time', ['a', 'b'], facet_column='host', layout='grid')
+        titles = [ax.get_title() for ax in fig.axes]
+        self.assertEqual(titles, ['host = x, a', 'host = x, b', 'host = y, a', 'host = y, b'])
+        self.assertEqual(len(fig.axes[0].collections[0].get_offsets()), 3)
+        self.assertEqual(fig.get_suptitle(), "Scatter Plot")
+
+    def test_render_series_figure_invalid_arguments(self):
+        """Test render_series_figure with a bar chart, text y values and too many facets."""
+        with self.assertRaises(ValueError):
+            render_series_figure('bar', self.sample_df, 'category', ['value', 'time'])
+        with self.assertRaises(ValueError):
+            render_series_figure('line', self.sample_df, 'time', ['value', 'category'])
+        with self.assertRaises(ValueError):
+            render_series_figure('line', self.sample_df, 'time', ['value', 'missing'])
+        df = pd.DataFrame({'time': range(100), 'value': range(100)})
+        with self.assertRaises(ValueError):
+            render_series_figure('line', df, 'time', ['value'], facet_column='time')
+
+    def test_figure_template_reuses_figure_per_thread(self):
+        """Test that a template reuses and clears the calling thread's figure."""
+        template = FigureTemplate(figsize=(4, 3), dpi=50)
+        first = render_figure('scatter', self.sample_df, 'time', 'value', template=template, mode='density', bins=(4, 4))
+        self.assertEqual(len(first.axes), 2)  # plot and colorbar
+        second = render_figure('line', self.sample_df, 'time', 'value', template=template)
+        self.assertIs(first, second)
+        self.assertEqual(len(second.axes), 1)
+        self.assertEqual(len(second.axes[0].lines), 1)
+        self.assertEqual(tuple(second.get_size_inches()), (4.0, 3.0))
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            other = executor.submit(render_figure, 'line', self.sample_df, 'time', 'value', template=template).result()
+        self.assertIsNot(other, first)
+
+    def test_generate_chart_concurrently(self):
+        """Test that charts rendered from a thread pool match sequentially rendered ones."""
+        template = FigureTemplate()
+        jobs = [('bar', 'category', 'value'), ('line', 'time', 'value'), ('scatter', 'time', 'value')] * 4
+
+        def render(i, job, prefix):
+            output_path = os.path.join(self.output_dir, f"{prefix}_{i}.png")
+            self.test_output_files.append(output_path)
+            return generate_chart(job[0], self.sample_df, job[1], job[2], title=str(i),
+                                  output_path=output_path, template=template)
+
+        sequential = [render(i, job, "seq") for i, job in enumerate(jobs)]
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            threaded = list(executor.map(lambda item: render(item[0], item[1], "thr"), enumerate(jobs)))
+        for seq_path, thr_path in zip(sequential, threaded):
+            with open(seq_path, 'rb') as seq_file, open(thr_path, 'rb') as thr_file:
+                self.assertEqual(seq_file.read(), thr_file.read())
+
+    # --- Tests for the in-memory output API ---
+    def test_chart_bytes_formats(self):
+        """Test that chart_bytes returns encoded PNG, SVG and (if available) WebP images."""
+        png = chart_bytes('bar', self.sample_df, 'category', 'value')
+        self.assertTrue(png.startswith(b'\x89PNG\r\n\x1a\n'))
+        svg = chart_bytes('line', self.sample_df, 'time', 'value', fmt='svg')
+        self.assertIn(b'<svg', svg)
+        if 'webp' in available_image_formats():
+            webp = chart_bytes('scatter', self.sample_df, 'time', 'value', fmt='webp', quality=50)
+            self.assertEqual((webp[:4], webp[8:12]), (b'RIFF', b'WEBP'))
+
+    def test_chart_bytes_dpi_and_compression(self):
+        """Test that dpi changes the image size and compress_level the encoding."""
+        small = chart_bytes('bar', self.sample_df, 'category', 'value', dpi=50)
+        large = chart_bytes('bar', self.sample_df, 'category', 'value', dpi=100)
+        # The PNG width is stored big-endian at bytes 16-20 of the IHDR chunk.
+        self.assertEqual(int.from_bytes(large[16:20], 'big'), 2 * int.from_bytes(small[16:20], 'big'))
+        fast = chart_bytes('bar', self.sample_df, 'category', 'value', compress_level=0)
+        best = chart_bytes('bar', self.sample_df, 'category', 'value', compress_level=9)
+        self.assertGreater(len(fast), len(best))
+
+    def test_generate_chart_to_file_object(self):
+        """Test that generate_chart writes into a caller-supplied file-like object."""
+        buffer = io.BytesIO()
+        self.assertIs(generate_chart('line', self.sample_df, 'time', 'value', output_path=buffer, fmt='svg'), buffer)
+        self.assertIn(b'<svg', buffer.getvalue())
+
+    def test_chart_bytes_invalid_options(self):
+        """Test chart_bytes with an unsupported format and options that do not apply."""
+        with self.assertRaises(ValueError):
+            chart_bytes('bar', self.sample_df, 'category', 'value', fmt='gif')
+        with self.assertRaises(ValueError):
+            chart_bytes('bar', self.sample_df, 'category', 'value', compress_level=10)
+        with self.assertRaises(ValueError):
+            chart_bytes('bar', self.sample_df, 'category', 'value', fmt='svg', quality=80)
+
 if __name__ == '__main__':
     # This allows running the tests directly from this file
     # For discovery, use `python -m unittest discover data_visualization_tool/tests`
@@ -0,0 +1,91 @@
+import unittest
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+
+# Adjust import path for profiling based on execution context
+try:
+    from data_visualization_tool.src.profiling import Profiler
+except ImportError:
+    sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+    from profiling import Profiler
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+MAIN_PATH = os.path.join(os.path.dirname(BASE_DIR), "src", "main.py")
+VALID_DATA_PATH = os.path.join(BASE_DIR, "sample_data", "valid_data.csv")
+
+
+class TestProfiler(unittest.TestCase):
+
+    def setUp(self):
+        """Set up a scratch directory for profile outputs."""
+        self.tmp_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        """Remove the scratch directory."""
+        shutil.rmtree(self.tmp_dir, ignore_errors=True)
+
+    def test_stages_are_recorded(self):
+        """Test that stages record their duration, memory and extra fields, including failed ones."""
+        profiler = Profiler(metadata={"argv": ["a"]})
+        with profiler.stage("parse", files=1) as record:
+            record["rows"] = 10
+        with self.assertRaises(ValueError):
+            with profiler.stage("render"):
+                raise ValueError("boom")
+        profiler.finish("error")
+        profile = profiler.to_dict()
+        self.assertEqual(profile["status"], "error")
+        self.assertEqual([s["name"] for s in profile["stages"]], ["parse", "render"])
+        parse = profile["stages"][0]
+        self.assertEqual((parse["files"], parse["rows"]), (1, 10))
+        self.assertGreaterEqual(parse["seconds"], 0)
+        self.assertGreater(parse["peak_rss_mb"], 0)
+        self.assertTrue(profile["stages"][1]["failed"])
+
+    def test_disabled_profiler_records_nothing(self):
+        """Test that a disabled profiler still yields a record but keeps no stages."""
+        profiler = Profiler(enabled=False)
+        with profiler.stage("parse") as record:
+            record["rows"] = 10
+        self.assertEqual(profiler.stages, [])
+
+    def test_main_writes_profiles(self):
+        """Test that main.py --profile writes JSON and Chrome trace files and --cprofile writes stats."""
+        output_path = os.path.join(self.tmp_dir, "bar.png")
+        json_path = os.path.join(self.tmp_dir, "profile.json")
+        trace_path = os.path.join(self.tmp_dir, "trace.json")
+        stats_path = os.path.join(self.tmp_dir, "run.prof")
+        base = [sys.executable, MAIN_PATH, VALID_DATA_PATH, "bar", "name", "value1", "--output_path", output_path]
+        subprocess.run(base + ["--profile", json_path, "--cprofile", stats_path], check=True, capture_output=True)
+        subprocess.run(base + ["--profile", trace_path, "--profile_format", "chrome"], check=True,
+                       capture_output=True)
+        with open(json_path) as f:
+            profile = json.load(f)
+        self.assertEqual(profile["status"], "ok")
+        names = [s["name"] for s in profile["stages"]]
+        for stage in ("parse", "validate", "render", "encode"):
+            self.assertIn(stage, names)
+        self.assertEqual(next(s for s in profile["stages"] if s["name"] == "parse")["rows"], 4)
+        with open(trace_path) as f:
+            trace = json.load(f)
+        events = [e for e in trace["traceEvents"] if e["ph"] == "X"]
+        self.assertIn("encode", [e["name"] for e in events])
+        self.assertTrue(all(e["dur"] >= 0 and "peak_rss_mb" in e["args"] for e in events))
+        self.assertGreater(os.path.getsize(stats_path), 0)
+
+    def test_main_profiles_failed_runs(self):
+        """Test that a failing run still writes its profile, marked as an error."""
+        json_path = os.path.join(self.tmp_dir, "profile.json")
+        result = subprocess.run([sys.executable, MAIN_PATH, VALID_DATA_PATH, "bar", "name", "missing",
+                                 "--profile", json_path], capture_output=True)
+        self.assertEqual(result.returncode, 1)
+        with open(json_path) as f:
+            self.assertEqual(json.load(f)["status"], "error")
+
+
+if __name__ == '__main__':
+    unittest.main()
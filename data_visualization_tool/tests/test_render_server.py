@@ -0,0 +1,73 @@
+import unittest
+import os
+import shutil
+import sys
+import tempfile
+import threading
+
+# Adjust import path for render_server based on execution context
+try:
+    from data_visualization_tool.src.render_client import render, send_request
+    from data_visualization_tool.src.render_server import RenderServer
+except ImportError:
+    sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+    from render_client import render, send_request
+    from render_server import RenderServer
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+VALID_DATA_PATH = os.path.join(BASE_DIR, "sample_data", "valid_data.csv")
+
+
+class TestRenderServer(unittest.TestCase):
+
+    def setUp(self):
+        """Start a render server on a private socket in a background thread."""
+        self.tmp_dir = tempfile.mkdtemp()
+        self.socket_path = os.path.join(self.tmp_dir, "render.sock")
+        self.server = RenderServer(self.socket_path)
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+
+    def tearDown(self):
+        """Shut the server down and remove the scratch directory."""
+        send_request({"command": "shutdown"}, self.socket_path)
+        self.thread.join(timeout=10)
+        self.server.server_close()
+        shutil.rmtree(self.tmp_dir, ignore_errors=True)
+
+    def test_render_and_reuse_dataset(self):
+        """Test that requests render plots and reuse the already loaded dataset."""
+        output_path = os.path.join(self.tmp_dir, "bar.png")
+        argv = [VALID_DATA_PATH, "bar", "name", "value1", "--output_path", output_path]
+        first = render(argv, self.socket_path)
+        second = render(argv, self.socket_path)
+        self.assertEqual(first["status"], "ok")
+        self.assertEqual(second["status"], "ok")
+        self.assertEqual(first["output_path"], output_path)
+        self.assertTrue(os.path.exists(output_path))
+        self.assertEqual((self.server.datasets.misses, self.server.datasets.hits), (1, 1))
+
+    def test_relative_paths_resolve_against_client_cwd(self):
+        """Test that relative paths are resolved against the client's working directory."""
+        response = send_request({"argv": [os.path.relpath(VALID_DATA_PATH, BASE_DIR), "line", "id", "value2"],
+                                 "cwd": BASE_DIR}, self.socket_path)
+        expected = os.path.join(BASE_DIR, "line_chart.png")
+        self.addCleanup(lambda: os.path.exists(expected) and os.remove(expected))
+        self.assertEqual(response["status"], "ok")
+        self.assertEqual(response["output_path"], expected)
+
+    def test_errors_are_reported(self):
+        """Test that invalid arguments and missing columns produce error responses."""
+        bad_column = render([VALID_DATA_PATH, "bar", "name", "missing"], self.socket_path)
+        self.assertEqual(bad_column["status"], "error")
+        self.assertIn("missing", bad_column["output"])
+        bad_args = render([VALID_DATA_PATH, "pie"], self.socket_path)
+        self.assertEqual(bad_args["status"], "error")
+        self.assertIn("invalid choice", bad_args["output"])
+        conflicting = render([VALID_DATA_PATH, "line", "id", "value2", "--stratify_by", "name"], self.socket_path)
+        self.assertEqual(conflicting["status"], "error")
+        self.assertIn("--stratify_by requires --sample", conflicting["error"])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,74 @@
+import unittest
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+# Adjust import path for sampling based on execution context
+try:
+    from data_visualization_tool.src.sampling import ReservoirSampler
+except ImportError:
+    sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+    from sampling import ReservoirSampler
+
+
+def _sample(df, n, chunksize, seed=0, stratify_by=None):
+    sampler = ReservoirSampler(n, seed=seed, stratify_by=stratify_by)
+    for start in range(0, len(df), chunksize):
+        sampler.update(df.iloc[start:start + chunksize])
+    return sampler
+
+
+class TestReservoirSampler(unittest.TestCase):
+
+    def setUp(self):
+        """Set up 10,000 rows with a frequent and a rare group."""
+        self.df = pd.DataFrame({'id': np.arange(10_000), 'group': ['common'] * 9_900 + ['rare'] * 100})
+
+    def test_sample_is_bounded_ordered_and_seeded(self):
+        """Test that at most n distinct rows are kept in stream order, the same for any chunk size."""
+        sampler = _sample(self.df, 500, chunksize=1_000)
+        result = sampler.result()
+        self.assertEqual(len(result), 500)
+        self.assertEqual(sampler.rows, 10_000)
+        self.assertTrue(result['id'].is_monotonic_increasing)
+        self.assertTrue(result['id'].is_unique)
+        pd.testing.assert_frame_equal(_sample(self.df, 500, chunksize=37).result(), result)
+        self.assertFalse(_sample(self.df, 500, chunksize=1_000, seed=1).result().equals(result))
+        # A uniform sample spreads over the whole stream.
+        self.assertLess(abs(result['id'].mean() - 5_000), 500)
+
+    def test_short_stream_is_kept_whole(self):
+        """Test that a stream with fewer than n rows is returned unchanged."""
+        pd.testing.assert_frame_equal(_sample(self.df.head(50), 100, chunksize=7).result(), self.df.head(50))
+
+    def test_merge_equals_sampling_the_concatenation(self):
+        """Test that merged samplers of two halves hold the rows with the smallest keys overall."""
+        first, second = self.df.iloc[:5_000], self.df.iloc[5_000:]
+        merged = _sample(first, 300, chunksize=999, seed=(0, 0))
+        merged.merge(_sample(second, 300, chunksize=999, seed=(0, 1)))
+        result = merged.result()
+        self.assertEqual(len(result), 300)
+        self.assertEqual(merged.rows, 10_000)
+        self.assertTrue(result['id'].is_monotonic_increasing)
+        self.assertTrue(0.3 < (result['id'] < 5_000).mean() < 0.7)
+
+    def test_stratified_shares(self):
+        """Test that every stratum gets an equal share, independent of the chunk size."""
+        result = _sample(self.df, 400, chunksize=1_000, stratify_by='group').result()
+        self.assertEqual(result['group'].value_counts().to_dict(), {'common': 200, 'rare': 100})
+        pd.testing.assert_frame_equal(_sample(self.df, 400, chunksize=123, stratify_by='group').result(), result)
+        with self.assertRaises(ValueError):
+            _sample(self.df[['id']], 400, chunksize=1_000, stratify_by='group')
+
+    def test_more_strata_than_rows(self):
+        """Test that at most n rows are returned when each row is its own stratum."""
+        result = _sample(self.df, 10, chunksize=1_000, stratify_by='id').result()
+        self.assertEqual(len(result), 10)
+        with self.assertRaises(ValueError):
+            ReservoirSampler(0)
+
+
+if __name__ == '__main__':
+    unittest.main()
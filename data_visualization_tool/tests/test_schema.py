@@ -0,0 +1,110 @@
+import unittest
+import gzip
+import os
+import shutil
+import sys
+import tempfile
+from unittest.mock import patch
+
+import pandas as pd
+
+# Adjust import path for schema based on execution context
+try:
+    from data_visualization_tool.src.schema import category_columns, check_schema, dtype_hints, probe_schema
+except ImportError:
+    sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+    from schema import category_columns, check_schema, dtype_hints, probe_schema
+
+
+class TestSchema(unittest.TestCase):
+
+    def setUp(self):
+        """Set up a scratch directory for the CSV files under test."""
+        self.tmp_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        """Remove the scratch directory."""
+        shutil.rmtree(self.tmp_dir, ignore_errors=True)
+
+    def write(self, name, text, opener=open):
+        path = os.path.join(self.tmp_dir, name)
+        with opener(path, "wt") as f:
+            f.write(text)
+        return path
+
+    def test_probe_infers_column_kinds(self):
+        """Test that the sampled kinds agree with how pandas parses the columns."""
+        path = self.write("data.csv", "i,f,b,s,e,mixed\n1,1.5,True,a,,1\n2,NaN,false,2,NA,x\n3,3,TRUE,c,,2.5\n")
+        schema = probe_schema(path)
+        self.assertEqual(schema, {"i": "integer", "f": "float", "b": "boolean", "s": "string",
+                                  "e": "empty", "mixed": "string"})
+        dtypes = pd.read_csv(path).dtypes
+        for column in ("i", "f", "b"):
+            self.assertIn(dtypes[column].kind, "biuf")
+        self.assertNotIn(dtypes["s"].kind, "biuf")
+
+    def test_probe_numbers_like_pandas(self):
+        """Test that only values pandas' C parser reads as numbers are numeric."""
+        values = {"1_000": "string", " 7 ": "integer", "+1": "integer", "0x10": "string", "\u0661\u0662": "string",
+                  "1e5": "float", ".5": "float", "-Infinity": "float", "1.5e": "string", str(2 ** 64): "string"}
+        path = self.write("data.csv", ",".join(f"c{i}" for i in range(len(values))) + "\n"
+                          + ",".join(f'"{value}"' for value in values) + "\n")
+        schema = probe_schema(path)
+        dtypes = pd.read_csv(path).dtypes
+        for (column, kind), (value, expected) in zip(schema.items(), values.items()):
+            with self.subTest(value=value):
+                self.assertEqual(kind, expected)
+                self.assertEqual(dtypes[column].kind in "iuf", expected != "string")
+
+    def test_probe_reads_only_the_sample(self):
+        """Test that rows past the sample do not change the inferred kinds."""
+        path = self.write("data.csv", "v\n" + "1\n" * 10 + "text\n")
+        self.assertEqual(probe_schema(path, sample_rows=10), {"v": "integer"})
+        self.assertEqual(probe_schema(path, sample_rows=11), {"v": "string"})
+
+    def test_probe_names_columns_like_pandas(self):
+        """Test that unnamed and repeated header fields are named as pandas names them."""
+        path = self.write("data.csv", "a,,a,b\n1,2,3,4\n")
+        self.assertEqual(list(probe_schema(path)), pd.read_csv(path).columns.tolist())
+
+    def test_probe_compressed_file(self):
+        """Test that a compressed file is probed through its decompressed text."""
+        path = self.write("data.csv.gz", "x,y\n1,a\n", opener=gzip.open)
+        self.assertEqual(probe_schema(path), {"x": "integer", "y": "string"})
+
+    def test_probe_empty_file(self):
+        """Test that probing an empty file prints an error and raises ValueError."""
+        path = self.write("empty.csv", "")
+        with patch('builtins.print') as mock_print:
+            with self.assertRaises(ValueError):
+                probe_schema(path)
+        self.assertIn("empty", mock_print.call_args[0][0])
+
+    def test_category_columns(self):
+        """Test that only text columns with few distinct sampled values are picked."""
+        path = self.write("data.csv", "city,id,code\n" + "".join(f"{'ab'[i % 2]},{i},c{i}\n" for i in range(10)))
+        self.assertEqual(category_columns(path), ["city"])
+        self.assertEqual(category_columns(path, ["id", "city", "missing"]), ["city"])
+        self.assertEqual(category_columns(path, max_ratio=1.0), ["city", "code"])
+
+    def test_check_schema(self):
+        """Test that missing columns and text in numeric columns are rejected."""
+        schema = {"x": "integer", "label": "string", "blank": "empty"}
+        check_schema(schema, "data.csv", ["x", "label"], numeric_columns=["x", "blank"])
+        with patch('builtins.print') as mock_print:
+            with self.assertRaises(ValueError):
+                check_schema(schema, "data.csv", ["x", "typo"])
+            self.assertIn("typo", mock_print.call_args[0][0])
+            with self.assertRaises(ValueError):
+                check_schema(schema, "data.csv", ["x", "label"], numeric_columns=["label"])
+            self.assertIn("label", mock_print.call_args[0][0])
+
+    def test_dtype_hints(self):
+        """Test that only columns known to hold text are given a dtype."""
+        schema = {"x": "integer", "label": "string", "other": "string"}
+        self.assertEqual(dtype_hints(schema, ["x", "label"]), {"label": str})
+        self.assertEqual(dtype_hints(schema), {"label": str, "other": str})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,75 @@
+import unittest
+import gzip
+import os
+import shutil
+import sys
+import tempfile
+
+# Adjust import path for shards based on execution context
+try:
+    from data_visualization_tool.src.shards import expand_input_paths, is_sharded_input
+    from data_visualization_tool.src.main import AGGREGATED_ATTR, build_parser, load_data
+except ImportError:
+    sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+    from shards import expand_input_paths, is_sharded_input
+    from main import AGGREGATED_ATTR, build_parser, load_data
+
+
+class TestShards(unittest.TestCase):
+
+    def setUp(self):
+        """Set up a directory of daily shards, one of them compressed, with unordered timestamps."""
+        self.tmp_dir = tempfile.mkdtemp()
+        self.shard_dir = os.path.join(self.tmp_dir, "daily")
+        os.makedirs(self.shard_dir)
+        self.write("day-1.csv", "t,host,value,unused\n3,a,1,x\n1,b,2,x\n")
+        self.write("day-2.csv", "t,host,value,unused\n2,a,4,x\n5,c,8,x\n")
+        with gzip.open(os.path.join(self.shard_dir, "day-3.csv.gz"), "wt") as f:
+            f.write("t,host,value,unused\n4,b,16,x\n")
+        self.write(".partial.csv", "t,host,value,unused\n0,z,0,x\n")  # hidden files are skipped
+
+    def tearDown(self):
+        """Remove the scratch directory."""
+        shutil.rmtree(self.tmp_dir, ignore_errors=True)
+
+    def write(self, name, text):
+        with open(os.path.join(self.shard_dir, name), "w") as f:
+            f.write(text)
+
+    def args(self, *argv):
+        return build_parser().parse_args(list(argv))
+
+    def test_expand_input_paths(self):
+        """Test that directories and glob patterns expand to sorted file lists."""
+        names = ["day-1.csv", "day-2.csv", "day-3.csv.gz"]
+        self.assertEqual(expand_input_paths(self.shard_dir), [os.path.join(self.shard_dir, n) for n in names])
+        pattern = os.path.join(self.tmp_dir, "**", "day-[12].csv")
+        self.assertTrue(is_sharded_input(pattern))
+        self.assertEqual(expand_input_paths(pattern), [os.path.join(self.shard_dir, n) for n in names[:2]])
+        single = os.path.join(self.shard_dir, "day-1.csv")
+        self.assertFalse(is_sharded_input(single))
+        self.assertEqual(expand_input_paths(single), [single])
+        with self.assertRaises(FileNotFoundError):
+            expand_input_paths(os.path.join(self.tmp_dir, "*.parquet"))
+
+    def test_load_data_sorts_sharded_rows(self):
+        """Test that shards load in parallel, projected onto the needed columns and sorted by key."""
+        args = self.args(self.shard_dir, "line", "t", "value", "--sort_by", "t", "--workers", "2")
+        df = load_data(args)
+        self.assertEqual(df.columns.tolist(), ["t", "value"])
+        self.assertEqual(df["t"].tolist(), [1, 2, 3, 4, 5])
+        self.assertEqual(df["value"].tolist(), [2, 4, 1, 16, 8])
+
+    def test_load_data_aggregates_per_shard(self):
+        """Test that aggregated bar charts of shards are reduced per shard and merged."""
+        args = self.args(self.shard_dir, "bar", "host", "value", "--agg", "mean", "--workers", "2")
+        df = load_data(args, pre_aggregate=True)
+        self.assertTrue(df.attrs[AGGREGATED_ATTR])
+        self.assertEqual(df["host"].tolist(), ["a", "b", "c"])
+        self.assertEqual(df["value"].tolist(), [2.5, 9.0, 8.0])
+        # Without pre-aggregation (e.g. for a load shared by several jobs) the rows are returned.
+        self.assertEqual(len(load_data(args)), 5)
+
+
+if __name__ == '__main__':
+    unittest.main()